@@ -0,0 +1,37 @@
+from fastapi import HTTPException, Query, status
+
+from core.config import settings
+
+
+# Lê "ids=1,2,3" mantendo a ordem e as repetições pedidas pelo cliente.
+def ids_do_batch(ids: str = Query(..., description="Ids separados por vírgula")):
+    try:
+        lista = [int(valor) for valor in ids.split(",") if valor.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids deve ser uma lista de inteiros separados por vírgula.",
+        )
+    if not lista:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Informe ao menos um id."
+        )
+    if len(lista) > settings.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo de {settings.BATCH_MAX_IDS} ids por requisição.",
+        )
+    return lista
+
+
+# Devolve um item por id pedido, na ordem do pedido; ids sem registro vêm com
+# status "nao_encontrado".
+def montar_batch(ids: list, por_id: dict, chave: str) -> list:
+    return [
+        (
+            {"id": id_, "status": "ok", chave: por_id[id_]}
+            if id_ in por_id
+            else {"id": id_, "status": "nao_encontrado", chave: None}
+        )
+        for id_ in ids
+    ]
@@ -0,0 +1,41 @@
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+
+from core.config import settings
+from schemas.bulk import BulkItemResultado, BulkResultado
+
+
+def verificar_tamanho(itens: list):
+    if len(itens) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo de {settings.BULK_MAX_ITEMS} itens por requisição.",
+        )
+
+
+# Valida todos os itens numa passada; os inválidos viram resultados de erro
+# e não impedem a inserção dos demais.
+def validar_itens(itens: list, schema):
+    validos, resultados = [], []
+    for indice, item in enumerate(itens):
+        try:
+            validos.append((indice, schema.model_validate(item)))
+        except ValidationError as e:
+            resultados.append(
+                BulkItemResultado(
+                    indice=indice,
+                    status="erro",
+                    erro=e.errors(
+                        include_url=False, include_context=False, include_input=False
+                    ),
+                )
+            )
+    return validos, resultados
+
+
+def montar_resultado(resultados: list) -> BulkResultado:
+    resultados.sort(key=lambda r: r.indice)
+    criados = sum(1 for r in resultados if r.status == "criado")
+    return BulkResultado(
+        criados=criados, erros=len(resultados) - criados, resultados=resultados
+    )
@@ -0,0 +1,208 @@
+import asyncio
+import heapq
+import sys
+import unicodedata
+
+from sqlalchemy import func, literal, select
+
+from core.cache import cache
+from db.session import mesmo_snapshot, session_scope
+from models.exclusao import Exclusao
+from models.praia import Praia
+from models.quiosque import Quiosque
+
+# Busca por trigramas dos nomes, normalizados (sem acento, minúsculos), o que
+# dá tolerância a erros de digitação. Com pg_trgm e unaccent instalados (a
+# migração 0007 os instala onde estiverem disponíveis), a busca vai ao banco,
+# pelos índices GIN sobre catalogo_normalizar(nome). Sem eles, um índice
+# invertido em memória, com os trigramas no formato do pg_trgm (palavras com
+# dois espaços antes e um depois): cada trigrama aponta para os registros que
+# o contêm.
+
+SIMILARIDADE_MINIMA = 0.4
+
+
+def normalizar(texto: str) -> str:
+    texto = unicodedata.normalize("NFKD", texto or "")
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).lower()
+    return " ".join("".join(c if c.isalnum() else " " for c in texto).split())
+
+
+def trigramas(texto: str) -> set:
+    resultado = set()
+    for palavra in normalizar(texto).split():
+        palavra = f"  {palavra} "
+        resultado.update(palavra[i : i + 3] for i in range(len(palavra) - 2))
+    return resultado
+
+
+# Linhas (cobertura, similaridade, (tipo, id), nome): as mais relevantes,
+# desempatadas pela similaridade do nome inteiro.
+def ordenar(linhas, limit: int) -> list:
+    melhores = heapq.nsmallest(limit, linhas, key=lambda r: (-r[0], -r[1], r[2]))
+    return [
+        {
+            "tipo": chave[0],
+            "id": chave[1],
+            "nome": nome,
+            "relevancia": round(cobertura, 3),
+        }
+        for cobertura, _, chave, nome in melhores
+    ]
+
+
+# Os trigramas de cada nome ficam numa tupla de strings internadas: com mais de
+# um milhão de nomes, um set e uma cópia de cada trigrama por nome custariam
+# gigabytes.
+class IndiceTrigramas:
+    def __init__(self):
+        self.postings = {}
+        self.documentos = {}
+
+    def adicionar(self, chave, nome: str):
+        self.remover(chave)
+        termos = tuple(sys.intern(termo) for termo in trigramas(nome))
+        self.documentos[chave] = (nome, termos)
+        for termo in termos:
+            self.postings.setdefault(termo, set()).add(chave)
+
+    def remover(self, chave):
+        documento = self.documentos.pop(chave, None)
+        if documento is None:
+            return
+        for termo in documento[1]:
+            chaves = self.postings[termo]
+            chaves.discard(chave)
+            if not chaves:
+                del self.postings[termo]
+
+    # Relevância: fração dos trigramas da busca presentes no nome (acha termos
+    # parciais como "sancho"). Um nome com pelo menos `minimo` deles contém
+    # algum dos len(termos) - minimo + 1 mais raros, então só as listas desses
+    # geram candidatos; os trigramas comuns ("pra", "ia "), com listas do
+    # tamanho do catálogo, só são conferidos nos trigramas de cada candidato.
+    def buscar(self, texto: str, limit: int, tipo=None):
+        termos = trigramas(texto)
+        if not termos:
+            return []
+        minimo = max(1, int(SIMILARIDADE_MINIMA * len(termos)))
+        raros = sorted(termos, key=lambda termo: len(self.postings.get(termo, ())))
+        raros = raros[: len(termos) - minimo + 1]
+        candidatos = set().union(*(self.postings.get(termo, ()) for termo in raros))
+
+        linhas = []
+        for chave in candidatos:
+            if tipo is not None and chave[0] != tipo:
+                continue
+            nome, termos_nome = self.documentos[chave]
+            quantidade = sum(termo in termos for termo in termos_nome)
+            cobertura = quantidade / len(termos)
+            if cobertura < SIMILARIDADE_MINIMA:
+                continue
+            similaridade = quantidade / (len(termos) + len(termos_nome) - quantidade)
+            linhas.append((cobertura, similaridade, chave, nome))
+        return ordenar(linhas, limit)
+
+
+# Carregado por inteiro uma vez; depois, a cada mudança nas versões de cache,
+# aplica só o que mudou desde a última versao de catálogo vista (criados,
+# alterados e excluídos, como no /sync). As versões ficam visíveis em ordem de
+# commit (catalogo_nova_versao) e as três fontes são lidas num só snapshot,
+# então nenhuma confirmada depois aparece abaixo da última vista.
+_indice = None
+_versoes = None
+_ultima_versao = 0
+_lock = asyncio.Lock()
+
+_TABELAS = {"praias": "praia", "quiosques": "quiosque"}
+
+
+async def _aplicar_mudancas(db, indice: IndiceTrigramas, desde: int) -> int:
+    await mesmo_snapshot(db)
+    ultima = desde
+    for tipo, modelo in (("praia", Praia), ("quiosque", Quiosque)):
+        linhas = await db.execute(
+            select(modelo.id, modelo.nome, modelo.versao).where(modelo.versao > desde)
+        )
+        for id_, nome, versao in linhas:
+            indice.adicionar((tipo, id_), nome)
+            ultima = max(ultima, versao)
+    exclusoes = await db.execute(
+        select(Exclusao.tabela, Exclusao.registro_id, Exclusao.versao).where(
+            Exclusao.versao > desde
+        )
+    )
+    for tabela, registro_id, versao in exclusoes:
+        indice.remover((_TABELAS[tabela], registro_id))
+        ultima = max(ultima, versao)
+    return ultima
+
+
+# As mudanças são lidas sempre do primário: numa réplica atrasada o índice
+# ficaria sem elas, marcado com as versões novas.
+async def obter_indice() -> IndiceTrigramas:
+    global _indice, _versoes, _ultima_versao
+    versoes = (await cache.versao("praias"), await cache.versao("quiosques"))
+    if _indice is not None and _versoes == versoes:
+        return _indice
+    async with _lock, session_scope() as db:
+        if _indice is None:
+            indice = IndiceTrigramas()
+            _ultima_versao = await _aplicar_mudancas(db, indice, 0)
+            _indice = indice
+            _versoes = versoes
+        elif _versoes != versoes:
+            _ultima_versao = await _aplicar_mudancas(db, _indice, _ultima_versao)
+            _versoes = versoes
+    return _indice
+
+
+# No banco, word_similarity faz o papel da cobertura (a melhor fração dos
+# trigramas da busca num trecho do nome) e o operador <% usa o índice GIN.
+def _select_no_banco(modelo, texto: str, limit: int):
+    nome = func.catalogo_normalizar(modelo.nome)
+    cobertura = func.word_similarity(texto, nome).label("cobertura")
+    similaridade = func.similarity(texto, nome).label("similaridade")
+    return (
+        select(modelo.id, modelo.nome, cobertura, similaridade)
+        .where(literal(texto).op("<%")(nome))
+        .order_by(cobertura.desc(), similaridade.desc(), modelo.id)
+        .limit(limit)
+    )
+
+
+async def _buscar_no_banco(db, texto: str, limit: int, tipo=None) -> list:
+    limiar = func.set_config(
+        "pg_trgm.word_similarity_threshold", str(SIMILARIDADE_MINIMA), True
+    )
+    await db.execute(select(limiar))
+    linhas = []
+    for tipo_modelo, modelo in (("praia", Praia), ("quiosque", Quiosque)):
+        if tipo is not None and tipo != tipo_modelo:
+            continue
+        resultado = await db.execute(_select_no_banco(modelo, texto, limit))
+        linhas.extend(
+            (cobertura, similaridade, (tipo_modelo, id_), nome)
+            for id_, nome, cobertura, similaridade in resultado
+        )
+    return ordenar(linhas, limit)
+
+
+# Descoberto uma vez por processo: a função de normalização só existe onde a
+# migração conseguiu instalar pg_trgm e unaccent.
+_no_banco = None
+
+
+async def buscar(texto: str, limit: int, tipo=None) -> list:
+    global _no_banco
+    if not trigramas(texto):
+        return []
+    if _no_banco is None:
+        async with session_scope() as db:
+            funcao = func.to_regprocedure("catalogo_normalizar(text)")
+            _no_banco = (await db.execute(select(funcao.isnot(None)))).scalar_one()
+    if _no_banco:
+        async with session_scope(leitura=True) as db:
+            return await _buscar_no_banco(db, normalizar(texto), limit, tipo)
+    indice = await obter_indice()
+    return indice.buscar(texto, limit, tipo)
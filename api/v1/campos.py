@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from schemas.praia import PraiaInfo
+from schemas.quiosque import QuiosqueInfo
+
+
+# Sparse fieldsets (?fields=id,nome,latitude) e embutir a relação
+# (?include=quiosques / ?include=praia). Sem nenhum dos dois a resposta é a
+# completa de sempre; com algum deles a rota segue o caminho rápido, que
+# seleciona só essas colunas e só consulta a relação quando pedida.
+class _Campos:
+    schema = None
+    relacao = None
+
+    @property
+    def esparso(self) -> bool:
+        return self.fields is not None or self.include is not None
+
+    @property
+    def incluir(self) -> bool:
+        if not self.esparso:
+            return True
+        return self.relacao in _lista(self.include)
+
+    def selecionados(self) -> Optional[list]:
+        if self.fields is None:
+            return None
+        nomes = _lista(self.fields)
+        invalidos = [nome for nome in nomes if nome not in self.schema.model_fields]
+        if invalidos:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Campos inválidos em fields: {', '.join(invalidos)}",
+            )
+        # O id sempre vai junto: identifica o item e alimenta o cursor.
+        return ["id"] + [nome for nome in dict.fromkeys(nomes) if nome != "id"]
+
+    def normalizados(self) -> dict:
+        if not self.esparso:
+            return {}
+        return {
+            "fields": ",".join(self.selecionados() or []),
+            "include": self.incluir,
+        }
+
+    # Recorta uma resposta completa (ex.: vinda do cache) nos campos pedidos.
+    def projetar(self, dados: dict) -> dict:
+        nomes = self.selecionados() or list(self.schema.model_fields)
+        projetado = {nome: dados[nome] for nome in nomes}
+        if self.incluir:
+            projetado[self.relacao] = dados[self.relacao]
+        return projetado
+
+
+def _lista(valor: Optional[str]) -> list:
+    if not valor:
+        return []
+    return [parte.strip() for parte in valor.split(",") if parte.strip()]
+
+
+@dataclass
+class CamposPraia(_Campos):
+    fields: Optional[str] = None
+    include: Optional[str] = None
+
+    schema = PraiaInfo
+    relacao = "quiosques"
+
+
+@dataclass
+class CamposQuiosque(_Campos):
+    fields: Optional[str] = None
+    include: Optional[str] = None
+
+    schema = QuiosqueInfo
+    relacao = "praia"
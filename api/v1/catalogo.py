@@ -0,0 +1,243 @@
+import asyncio
+
+import numpy as np
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+
+from api.v1 import listagem_rapida
+from api.v1.pagination import next_cursor
+from core.cache import cache
+from db.session import session_scope
+from models.praia import Praia
+from models.quiosque import Quiosque
+
+# Réplica colunar do catálogo em memória (CATALOG_SNAPSHOT): as listagens
+# avaliam os filtros como máscaras booleanas do NumPy, sem SQL. Os nulos viram
+# NaN (numéricos) ou -1 (booleanos), de modo que toda comparação com eles é
+# falsa, como no SQL. estado, município e nome são codificados em dicionário.
+
+
+def _float(valores):
+    return np.array([np.nan if v is None else v for v in valores], dtype=np.float64)
+
+
+def _bool(valores):
+    return np.array([-1 if v is None else int(v) for v in valores], dtype=np.int8)
+
+
+class _Dicionario:
+    def __init__(self, valores):
+        self.codigos = {}
+        self.array = np.array(
+            [self.codigos.setdefault(v, len(self.codigos)) for v in valores],
+            dtype=np.int32,
+        )
+
+    def igual(self, valor):
+        codigo = self.codigos.get(valor)
+        if codigo is None:
+            return np.zeros(len(self.array), dtype=bool)
+        return self.array == codigo
+
+
+def _aplicar_range(mascara, filtros_range):
+    for valor, coluna, op in filtros_range:
+        if valor is not None:
+            if op == ">=":
+                mascara &= coluna >= valor
+            else:
+                mascara &= coluna <= valor
+    return mascara
+
+
+def _paginar(ids, mascara, skip: int, limit: int, cursor_id):
+    indices = np.flatnonzero(mascara)
+    if cursor_id is not None:
+        indices = indices[ids[indices] > cursor_id]
+    else:
+        indices = indices[skip:]
+    return indices[:limit]
+
+
+class CatalogoColunar:
+    # praias e quiosques vêm ordenados por id, no formato do caminho rápido.
+    def __init__(self, praias: list, quiosques: list):
+        self.praias = praias
+        self.quiosques = quiosques
+
+        self.praia_id = np.array([p["id"] for p in praias], dtype=np.int64)
+        self.praia_estado = _Dicionario([p["estado"] for p in praias])
+        self.praia_municipio = _Dicionario([p["municipio"] for p in praias])
+        self.praia_latitude = _float([p["latitude"] for p in praias])
+        self.praia_longitude = _float([p["longitude"] for p in praias])
+        self.praia_rating = _float([p["rating"] for p in praias])
+        self.praia_comprimento = _float([p["comprimento"] for p in praias])
+        self.praia_largura = _float([p["largura"] for p in praias])
+        self.praia_tem_salvavida = _bool([p["tem_salvavida"] for p in praias])
+        self.praia_propria_banho = _bool([p["propria_banho"] for p in praias])
+        self.praia_tem_quiosque = np.array([bool(p["quiosques"]) for p in praias])
+        self.praia_indice = {p["id"]: i for i, p in enumerate(praias)}
+
+        self.quiosque_id = np.array([q["id"] for q in quiosques], dtype=np.int64)
+        self.quiosque_nome = _Dicionario([q["nome"] for q in quiosques])
+        self.quiosque_nota = _float([q["nota"] for q in quiosques])
+        self.quiosque_valor = _float([q["valor"] for q in quiosques])
+        self.quiosque_latitude = _float([q["latitude"] for q in quiosques])
+        self.quiosque_longitude = _float([q["longitude"] for q in quiosques])
+        self.quiosque_tem_acessibilidade = _bool(
+            [q["tem_acessibilidade"] for q in quiosques]
+        )
+        self.quiosque_tem_banheiro = _bool([q["tem_banheiro"] for q in quiosques])
+        self.quiosque_praia_id = np.array(
+            [q["praia_id"] for q in quiosques], dtype=np.int64
+        )
+        # Linha da praia de cada quiosque: estado/município saem dos arrays dela.
+        self.quiosque_praia = np.array(
+            [self.praia_indice[q["praia_id"]] for q in quiosques], dtype=np.int64
+        )
+        self.quiosque_praia_de = dict(
+            zip(self.quiosque_id.tolist(), self.quiosque_praia_id.tolist())
+        )
+
+    def _mascara_praias(self, filtros):
+        mascara = np.ones(len(self.praias), dtype=bool)
+        if filtros.municipio is not None:
+            mascara &= self.praia_municipio.igual(filtros.municipio)
+        if filtros.estado is not None:
+            mascara &= self.praia_estado.igual(filtros.estado)
+        if filtros.tem_salvavida is not None:
+            mascara &= self.praia_tem_salvavida == int(filtros.tem_salvavida)
+        if filtros.propria_banho is not None:
+            mascara &= self.praia_propria_banho == int(filtros.propria_banho)
+
+        mascara = _aplicar_range(
+            mascara,
+            [
+                (filtros.min_rating, self.praia_rating, ">="),
+                (filtros.max_rating, self.praia_rating, "<="),
+                (filtros.min_latitude, self.praia_latitude, ">="),
+                (filtros.max_latitude, self.praia_latitude, "<="),
+                (filtros.min_longitude, self.praia_longitude, ">="),
+                (filtros.max_longitude, self.praia_longitude, "<="),
+                (filtros.min_comprimento, self.praia_comprimento, ">="),
+                (filtros.max_comprimento, self.praia_comprimento, "<="),
+                (filtros.min_largura, self.praia_largura, ">="),
+                (filtros.max_largura, self.praia_largura, "<="),
+            ],
+        )
+
+        if filtros.tem_quiosque is True:
+            mascara &= self.praia_tem_quiosque
+        elif filtros.tem_quiosque is False:
+            mascara &= ~self.praia_tem_quiosque
+
+        if filtros.quiosque:
+            mascara &= self.praia_id == self.quiosque_praia_de.get(filtros.quiosque, -1)
+        return mascara
+
+    def _mascara_quiosques(self, filtros):
+        mascara = np.ones(len(self.quiosques), dtype=bool)
+        if filtros.nome is not None:
+            mascara &= self.quiosque_nome.igual(filtros.nome)
+        if filtros.tem_acessibilidade is not None:
+            mascara &= self.quiosque_tem_acessibilidade == int(
+                filtros.tem_acessibilidade
+            )
+        if filtros.tem_banheiro is not None:
+            mascara &= self.quiosque_tem_banheiro == int(filtros.tem_banheiro)
+        if filtros.praia_id is not None:
+            mascara &= self.quiosque_praia_id == filtros.praia_id
+
+        mascara = _aplicar_range(
+            mascara,
+            [
+                (filtros.min_nota, self.quiosque_nota, ">="),
+                (filtros.max_nota, self.quiosque_nota, "<="),
+                (filtros.min_valor, self.quiosque_valor, ">="),
+                (filtros.max_valor, self.quiosque_valor, "<="),
+                (filtros.min_latitude, self.quiosque_latitude, ">="),
+                (filtros.max_latitude, self.quiosque_latitude, "<="),
+                (filtros.min_longitude, self.quiosque_longitude, ">="),
+                (filtros.max_longitude, self.quiosque_longitude, "<="),
+            ],
+        )
+
+        if filtros.estado:
+            mascara &= self.praia_estado.igual(filtros.estado)[self.quiosque_praia]
+        if filtros.municipio:
+            mascara &= self.praia_municipio.igual(filtros.municipio)[
+                self.quiosque_praia
+            ]
+        return mascara
+
+    def listar_praias(self, filtros, campos, skip: int, limit: int, cursor_id):
+        indices = _paginar(
+            self.praia_id, self._mascara_praias(filtros), skip, limit, cursor_id
+        )
+        praias = [self.praias[i] for i in indices.tolist()]
+        if campos.esparso:
+            praias = [campos.projetar(praia) for praia in praias]
+        return {"praias": praias, "next_cursor": next_cursor(praias, limit)}
+
+    def listar_quiosques(self, filtros, campos, skip: int, limit: int, cursor_id):
+        indices = _paginar(
+            self.quiosque_id, self._mascara_quiosques(filtros), skip, limit, cursor_id
+        )
+        quiosques = [self.quiosques[i] for i in indices.tolist()]
+        if campos.esparso:
+            quiosques = [campos.projetar(quiosque) for quiosque in quiosques]
+        return {"quiosques": quiosques, "next_cursor": next_cursor(quiosques, limit)}
+
+
+# Dicts no formato do caminho rápido a partir das linhas das duas consultas:
+# praias com os quiosques embutidos e quiosques com a praia embutida. Um
+# quiosque cuja praia não veio (escrita entre as duas consultas) fica de fora;
+# essa escrita muda as versões e o próximo acesso reconstrói o snapshot.
+def montar_catalogo(linhas_praias, linhas_quiosques) -> CatalogoColunar:
+    praias = []
+    por_id = {}
+    for linha in linhas_praias.mappings():
+        info = dict(linha)
+        praia = {**info, "quiosques": []}
+        praias.append(praia)
+        por_id[info["id"]] = (info, praia)
+
+    quiosques = []
+    for linha in linhas_quiosques.mappings():
+        quiosque = dict(linha)
+        info, praia = por_id.get(quiosque["praia_id"], (None, None))
+        if praia is None:
+            continue
+        praia["quiosques"].append(quiosque)
+        quiosques.append({**quiosque, "praia": info})
+    return CatalogoColunar(praias, quiosques)
+
+
+# Toda escrita incrementa as versões de praias e quiosques; o snapshot é
+# reconstruído na primeira leitura que encontra versões diferentes das suas,
+# sempre a partir do primário (uma réplica atrasada deixaria o snapshot velho
+# marcado com as versões novas). Montá-lo (dicts e arrays de todo o catálogo)
+# custa segundos de CPU, então roda no threadpool, fora do event loop; o
+# snapshot novo entra numa única atribuição, junto com as suas versões.
+_snapshot = None
+_lock = asyncio.Lock()
+
+
+async def obter_catalogo() -> CatalogoColunar:
+    global _snapshot
+    versoes = (await cache.versao("praias"), await cache.versao("quiosques"))
+    snapshot = _snapshot
+    if snapshot is not None and snapshot[0] == versoes:
+        return snapshot[1]
+    async with _lock:
+        if _snapshot is None or _snapshot[0] != versoes:
+            async with session_scope() as db:
+                praias = await db.execute(
+                    listagem_rapida.select_praias().order_by(Praia.id)
+                )
+                quiosques = await db.execute(
+                    select(*listagem_rapida.COLUNAS_QUIOSQUE_INFO).order_by(Quiosque.id)
+                )
+            catalogo = await run_in_threadpool(montar_catalogo, praias, quiosques)
+            _snapshot = (versoes, catalogo)
+    return _snapshot[1]
@@ -0,0 +1,155 @@
+import json
+from dataclasses import dataclass
+
+from sqlalchemy import Integer, cast, func, select, text, tuple_
+from sqlalchemy.dialects import postgresql
+
+from core.cache import cache, list_key
+from core.config import settings
+from db.session import da_replica
+from models.praia import Praia
+from models.quiosque import Quiosque
+
+
+# Total e facetas das listagens (?with_total=true / ?with_facets=true), para o
+# conjunto filtrado inteiro e não só a página. As facetas e o total saem de uma
+# única consulta com GROUPING SETS, e ficam em cache pela chave dos filtros,
+# compartilhada por todas as páginas (só as lidas do primário, ver da_replica).
+# Só o total, em conjuntos acima de COUNT_APPROX_MIN linhas, usa a estimativa do
+# planner (total_aproximado).
+class _Contagens:
+    namespace = None
+    tabela = None
+    coluna_contada = None
+    facetas = {}
+
+    @property
+    def pedidas(self) -> bool:
+        return self.with_total or self.with_facets
+
+    def normalizados(self) -> dict:
+        return {
+            "with_total": self.with_total or None,
+            "with_facets": self.with_facets or None,
+        }
+
+    def _base(self, *colunas):
+        raise NotImplementedError
+
+    async def adicionar(self, db, dados: dict, filtros) -> dict:
+        if not self.pedidas:
+            return dados
+        versao = await cache.versao(self.tabela)
+        if self.with_facets:
+            chave = list_key(
+                self.namespace + "_facetas", versao, filtros.normalizados()
+            )
+            contagens = await cache.get(chave)
+            if contagens is None:
+                contagens = await self._agregar(db, filtros)
+                if not da_replica(db):
+                    await cache.set(chave, contagens)
+            dados["facetas"] = contagens["facetas"]
+            dados["total"] = contagens["total"]
+            dados["total_aproximado"] = False
+        else:
+            chave = list_key(self.namespace + "_total", versao, filtros.normalizados())
+            contagens = await cache.get(chave)
+            if contagens is None:
+                contagens = await self._contar(db, filtros)
+                if not da_replica(db):
+                    await cache.set(chave, contagens)
+            dados.update(contagens)
+        return dados
+
+    def consulta_facetas(self, filtros):
+        colunas = [coluna.label(nome) for nome, coluna in self.facetas.items()]
+        agrupamentos = [
+            func.grouping(coluna).label("g_" + nome)
+            for nome, coluna in self.facetas.items()
+        ]
+        return filtros.aplicar(
+            self._base(*colunas, *agrupamentos, func.count().label("total"))
+        ).group_by(
+            func.grouping_sets(
+                *[tuple_(coluna) for coluna in self.facetas.values()], tuple_()
+            )
+        )
+
+    def consulta_total(self, filtros):
+        return filtros.aplicar(self._base(self.coluna_contada))
+
+    async def _agregar(self, db, filtros) -> dict:
+        query = self.consulta_facetas(filtros)
+        total = 0
+        facetas = {nome: [] for nome in self.facetas}
+        for linha in (await db.execute(query)).mappings():
+            agrupadas = [nome for nome in self.facetas if linha["g_" + nome] == 0]
+            if not agrupadas:
+                total = linha["total"]
+            else:
+                nome = agrupadas[0]
+                facetas[nome].append({"valor": linha[nome], "total": linha["total"]})
+        for valores in facetas.values():
+            valores.sort(key=lambda v: (-v["total"], str(v["valor"])))
+        return {"total": total, "facetas": facetas}
+
+    async def _contar(self, db, filtros) -> dict:
+        query = self.consulta_total(filtros)
+        if settings.COUNT_APPROX_MIN:
+            sql = query.compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+            plano = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar()
+            if isinstance(plano, str):
+                plano = json.loads(plano)
+            estimativa = int(plano[0]["Plan"]["Plan Rows"])
+            if estimativa >= settings.COUNT_APPROX_MIN:
+                return {"total": estimativa, "total_aproximado": True}
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        return {"total": total, "total_aproximado": False}
+
+
+@dataclass
+class ContagensPraia(_Contagens):
+    with_total: bool = False
+    with_facets: bool = False
+
+    namespace = "praia_list"
+    tabela = "praias"
+    coluna_contada = Praia.__table__.c.id
+    facetas = {
+        "estado": Praia.estado,
+        "municipio": Praia.municipio,
+        "tem_salvavida": Praia.tem_salvavida,
+        "propria_banho": Praia.propria_banho,
+    }
+
+    def _base(self, *colunas):
+        return select(*colunas).select_from(Praia)
+
+
+@dataclass
+class ContagensQuiosque(_Contagens):
+    with_total: bool = False
+    with_facets: bool = False
+
+    namespace = "quiosque_list"
+    tabela = "quiosques"
+    # A FK (não nula pelo join) em vez do id: o total sai só do índice
+    # ix_quiosques_praia_id_banheiro_valor, sem ler a tabela.
+    coluna_contada = Quiosque.__table__.c.praia_id
+    facetas = {
+        "estado": Praia.estado,
+        "municipio": Praia.municipio,
+        "tem_banheiro": Quiosque.tem_banheiro,
+        "valor": cast(Quiosque.valor, Integer),
+    }
+
+    # O join com Praia atende às facetas e aos filtros de estado/município.
+    def _base(self, *colunas):
+        return (
+            select(*colunas)
+            .select_from(Quiosque)
+            .join(Praia, Quiosque.praia_id == Praia.id)
+        )
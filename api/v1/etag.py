@@ -0,0 +1,47 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+from core.cache import cache
+from db.session import da_replica
+
+
+# ETag forte derivado da chave de cache, que já inclui a versão da tabela:
+# não é preciso carregar nem serializar nada para respondê-lo.
+def etag_de(chave: str) -> str:
+    return '"' + hashlib.sha1(chave.encode()).hexdigest() + '"'
+
+
+def etag_corresponde(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*" or candidato.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def nao_modificado(request: Request, response: Response, etag: str):
+    if etag_corresponde(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+    response.headers["ETag"] = etag
+    return None
+
+
+# Para respostas lidas de uma réplica (db.session.da_replica): o ETag da chave
+# afirmaria a versão atual, que a réplica pode ainda não ter.
+def sem_etag(response: Response):
+    if "etag" in response.headers:
+        del response.headers["etag"]
+
+
+# Fim do caminho sem cache das rotas com ETag: o que veio do primário vai para o
+# cache; o que veio de uma réplica não é guardado e sai sem ETag.
+async def guardar_resposta(db, response: Response, chave: str, dados):
+    if da_replica(db):
+        sem_etag(response)
+    else:
+        await cache.set(chave, dados)
@@ -0,0 +1,67 @@
+import csv
+import io
+import zlib
+
+from fastapi.responses import StreamingResponse
+
+from core.instrumentacao import cronometro
+from db.session import session_scope, stream_scalars
+
+TAMANHO_LOTE = 500
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+# Abre a própria sessão: o gerador roda depois que as dependências da rota
+# já foram finalizadas.
+async def _gerar(statement, formato: str, schema, colunas_csv, leitura: bool):
+    async with session_scope(leitura=leitura) as db:
+        if formato == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(colunas_csv)
+            yield buffer.getvalue().encode()
+
+        async for lote in stream_scalars(db, statement, TAMANHO_LOTE):
+            buffer = io.StringIO()
+            if formato == "csv":
+                writer = csv.writer(buffer)
+                for obj in lote:
+                    writer.writerow([getattr(obj, coluna) for coluna in colunas_csv])
+            else:
+                with cronometro("serializacao"):
+                    for obj in lote:
+                        buffer.write(schema.model_validate(obj).model_dump_json())
+                        buffer.write("\n")
+            # Solta os objetos já enviados para manter a memória constante. Um a
+            # um: expunge_all trocaria o identity map usado pelo yield_per.
+            for obj in lote:
+                db.expunge(obj)
+            yield buffer.getvalue().encode()
+
+
+async def _gzip(chunks):
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        comprimido = compressor.compress(chunk)
+        if comprimido:
+            yield comprimido
+    yield compressor.flush()
+
+
+def exportar(
+    statement,
+    formato: str,
+    schema,
+    colunas_csv,
+    nome: str,
+    gzip: bool,
+    leitura: bool = False,
+):
+    conteudo = _gerar(statement, formato, schema, colunas_csv, leitura)
+    headers = {"Content-Disposition": f'attachment; filename="{nome}.{formato}"'}
+    if gzip:
+        conteudo = _gzip(conteudo)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        conteudo, media_type=MEDIA_TYPES[formato], headers=headers
+    )
@@ -0,0 +1,128 @@
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from models.praia import Praia
+from models.quiosque import Quiosque
+
+
+def _aplicar_range(query, filtros_range):
+    for value, column, op in filtros_range:
+        if value is not None:
+            if op == ">=":
+                query = query.where(column >= value)
+            else:
+                query = query.where(column <= value)
+    return query
+
+
+# Filtros das listagens, usados como dependência (query params) pelas rotas.
+@dataclass
+class FiltrosPraia:
+    municipio: Optional[str] = None
+    estado: Optional[str] = None
+    min_rating: Optional[float] = None
+    max_rating: Optional[float] = None
+    tem_quiosque: Optional[bool] = None
+    quiosque: Optional[int] = None
+    tem_salvavida: Optional[bool] = None
+    min_latitude: Optional[float] = None
+    max_latitude: Optional[float] = None
+    min_longitude: Optional[float] = None
+    max_longitude: Optional[float] = None
+    min_comprimento: Optional[int] = None
+    max_comprimento: Optional[int] = None
+    min_largura: Optional[int] = None
+    max_largura: Optional[int] = None
+    propria_banho: Optional[bool] = None
+
+    def normalizados(self) -> dict:
+        return {k: v for k, v in sorted(asdict(self).items()) if v is not None}
+
+    def aplicar(self, query):
+        filtros_igualdade = {
+            "municipio": self.municipio,
+            "estado": self.estado,
+            "tem_salvavida": self.tem_salvavida,
+            "propria_banho": self.propria_banho,
+        }
+        for attr, value in filtros_igualdade.items():
+            if value is not None:
+                query = query.where(getattr(Praia, attr) == value)
+
+        query = _aplicar_range(
+            query,
+            [
+                (self.min_rating, Praia.rating, ">="),
+                (self.max_rating, Praia.rating, "<="),
+                (self.min_latitude, Praia.latitude, ">="),
+                (self.max_latitude, Praia.latitude, "<="),
+                (self.min_longitude, Praia.longitude, ">="),
+                (self.max_longitude, Praia.longitude, "<="),
+                (self.min_comprimento, Praia.comprimento, ">="),
+                (self.max_comprimento, Praia.comprimento, "<="),
+                (self.min_largura, Praia.largura, ">="),
+                (self.max_largura, Praia.largura, "<="),
+            ],
+        )
+
+        if self.tem_quiosque is True:
+            query = query.where(Praia.quiosques.any())
+        elif self.tem_quiosque is False:
+            query = query.where(~Praia.quiosques.any())
+
+        if self.quiosque:
+            query = query.where(Praia.quiosques.any(Quiosque.id == self.quiosque))
+        return query
+
+
+@dataclass
+class FiltrosQuiosque:
+    nome: Optional[str] = None
+    min_nota: Optional[float] = None
+    max_nota: Optional[float] = None
+    tem_acessibilidade: Optional[bool] = None
+    tem_banheiro: Optional[bool] = None
+    praia_id: Optional[int] = None
+    min_valor: Optional[float] = None
+    max_valor: Optional[float] = None
+    min_latitude: Optional[float] = None
+    max_latitude: Optional[float] = None
+    min_longitude: Optional[float] = None
+    max_longitude: Optional[float] = None
+    estado: Optional[str] = None
+    municipio: Optional[str] = None
+
+    def normalizados(self) -> dict:
+        return {k: v for k, v in sorted(asdict(self).items()) if v is not None}
+
+    # A query precisa ter o join com Praia para os filtros de estado/município.
+    def aplicar(self, query):
+        eq_filters = {
+            "nome": self.nome,
+            "tem_acessibilidade": self.tem_acessibilidade,
+            "tem_banheiro": self.tem_banheiro,
+            "praia_id": self.praia_id,
+        }
+        for attr, value in eq_filters.items():
+            if value is not None:
+                query = query.where(getattr(Quiosque, attr) == value)
+
+        query = _aplicar_range(
+            query,
+            [
+                (self.min_nota, Quiosque.nota, ">="),
+                (self.max_nota, Quiosque.nota, "<="),
+                (self.min_valor, Quiosque.valor, ">="),
+                (self.max_valor, Quiosque.valor, "<="),
+                (self.min_latitude, Quiosque.latitude, ">="),
+                (self.max_latitude, Quiosque.latitude, "<="),
+                (self.min_longitude, Quiosque.longitude, ">="),
+                (self.max_longitude, Quiosque.longitude, "<="),
+            ],
+        )
+
+        if self.estado:
+            query = query.where(Praia.estado == self.estado)
+        if self.municipio:
+            query = query.where(Praia.municipio == self.municipio)
+        return query
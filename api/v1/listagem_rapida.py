@@ -0,0 +1,105 @@
+import typing
+
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import Float, Integer, Numeric, cast, select
+
+from api.v1.pagination import next_cursor
+from models.praia import Praia
+from models.quiosque import Quiosque
+from schemas.praia import PraiaInfo
+from schemas.quiosque import QuiosqueInfo
+
+# Caminho rápido das listagens (LIST_FAST_PATH ou fields/include): seleciona só
+# as colunas dos schemas com Core, monta os dicts direto das linhas e codifica
+# com orjson, sem passar pelo ORM nem revalidar no pydantic. Os schemas
+# continuam sendo o contrato: as colunas saem dos seus campos, já convertidas no
+# banco para o tipo declarado (Numeric -> float/int), como o pydantic faria.
+
+
+def _tipo_base(annotation):
+    tipos = [t for t in typing.get_args(annotation) if t is not type(None)]
+    return tipos[0] if tipos else annotation
+
+
+def _colunas(schema, modelo, nomes=None, prefixo: str = ""):
+    colunas = []
+    for nome in nomes or schema.model_fields:
+        coluna = getattr(modelo, nome)
+        tipo = _tipo_base(schema.model_fields[nome].annotation)
+        if tipo is float:
+            coluna = cast(coluna, Float)
+        elif tipo is int and isinstance(coluna.type, Numeric):
+            coluna = cast(coluna, Integer)
+        colunas.append(coluna.label(prefixo + nome))
+    return colunas
+
+
+# PraiaInfo/QuiosqueInfo são PraiaOut/QuiosqueOut sem a relação embutida.
+COLUNAS_QUIOSQUE_INFO = _colunas(QuiosqueInfo, Quiosque)
+COLUNAS_PRAIA_DO_QUIOSQUE = _colunas(PraiaInfo, Praia, prefixo="praia__")
+
+_CAMPOS_PRAIA_INFO = list(PraiaInfo.model_fields)
+
+
+def select_praias(nomes=None):
+    return select(*_colunas(PraiaInfo, Praia, nomes))
+
+
+# O join com Praia fica mesmo sem a praia embutida: os filtros de estado e
+# município dependem dele.
+def select_quiosques(nomes=None, incluir_praia: bool = True):
+    colunas = _colunas(QuiosqueInfo, Quiosque, nomes)
+    if incluir_praia:
+        colunas += COLUNAS_PRAIA_DO_QUIOSQUE
+    return (
+        select(*colunas)
+        .select_from(Quiosque)
+        .join(Praia, Quiosque.praia_id == Praia.id)
+    )
+
+
+async def listar_praias(db, query, limit: int, incluir_quiosques: bool = True) -> dict:
+    praias = [dict(linha) for linha in (await db.execute(query)).mappings()]
+    if incluir_quiosques:
+        for praia in praias:
+            praia["quiosques"] = []
+    if incluir_quiosques and praias:
+        por_id = {praia["id"]: praia for praia in praias}
+        quiosques = await db.execute(
+            select(*COLUNAS_QUIOSQUE_INFO)
+            .where(Quiosque.praia_id.in_(por_id))
+            .order_by(Quiosque.id)
+        )
+        for quiosque in quiosques.mappings():
+            por_id[quiosque["praia_id"]]["quiosques"].append(dict(quiosque))
+    return {"praias": praias, "next_cursor": next_cursor(praias, limit)}
+
+
+async def listar_quiosques(db, query, limit: int, incluir_praia: bool = True) -> dict:
+    quiosques = []
+    for linha in (await db.execute(query)).mappings():
+        quiosque = {}
+        for chave, valor in linha.items():
+            if not chave.startswith("praia__"):
+                quiosque[chave] = valor
+        if incluir_praia:
+            quiosque["praia"] = {c: linha["praia__" + c] for c in _CAMPOS_PRAIA_INFO}
+        quiosques.append(quiosque)
+    return {"quiosques": quiosques, "next_cursor": next_cursor(quiosques, limit)}
+
+
+async def buscar_praia(db, praia_id: int, nomes=None, incluir_quiosques=True):
+    query = select_praias(nomes).where(Praia.id == praia_id)
+    praias = (await listar_praias(db, query, 0, incluir_quiosques))["praias"]
+    return praias[0] if praias else None
+
+
+async def buscar_quiosque(db, quiosque_id: int, nomes=None, incluir_praia=True):
+    query = select_quiosques(nomes, incluir_praia).where(Quiosque.id == quiosque_id)
+    quiosques = (await listar_quiosques(db, query, 0, incluir_praia))["quiosques"]
+    return quiosques[0] if quiosques else None
+
+
+# Devolve a resposta já codificada, levando os headers definidos na rota (ETag).
+def resposta_json(dados, response) -> ORJSONResponse:
+    return ORJSONResponse(dados, headers=dict(response.headers))
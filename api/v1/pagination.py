@@ -0,0 +1,30 @@
+import base64
+import json
+
+from fastapi import HTTPException, status
+
+
+# Cursor opaco para paginação por chave (keyset): guarda o último id da página.
+def encode_cursor(ultimo_id: int) -> str:
+    raw = json.dumps({"id": ultimo_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        return int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido.",
+        )
+
+
+# Aceita objetos do ORM ou dicts (caminho rápido das listagens).
+def next_cursor(items: list, limit: int):
+    if limit > 0 and len(items) == limit:
+        ultimo = items[-1]
+        return encode_cursor(ultimo["id"] if isinstance(ultimo, dict) else ultimo.id)
+    return None
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+
+from core.cache import cache
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_cache_stats():
+    return cache.estatisticas()
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from core.metricas import gerar_metricas
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metricas():
+    return Response(gerar_metricas(), media_type=CONTENT_TYPE_LATEST)
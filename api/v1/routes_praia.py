@@ -1,173 +1,417 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, selectinload
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from auth.deps import get_current_user
-from models.user import User
+from auth.deps import UsuarioAutenticado, get_current_user
 
 
-from db.session import SessionLocal
+from db.session import da_replica, get_db, get_db_leitura, ler_da_replica
 from models.praia import Praia
-from schemas.praia import PraiaCreate, PraiaOut, PraiaPatch, PraiaList
-from models.quiosque import Quiosque
+from models.estatistica import somar_praias
+from schemas.praia import (
+    PraiaCreate,
+    PraiaOut,
+    PraiaPatch,
+    PraiaBatch,
+    PraiaList,
+    PraiaProximaList,
+)
+from api.v1.pagination import decode_cursor, next_cursor
+from core.geo import geohash_cobertura, geohash_encode, haversine_km
+from core.instrumentacao import cronometro
+from core.cache import cache, list_key, praia_key, quiosque_key
+from api.v1.filtros import FiltrosPraia
+from api.v1.campos import CamposPraia
+from api.v1.contagens import ContagensPraia
+from api.v1.etag import etag_de, guardar_resposta, nao_modificado, sem_etag
+from api.v1.bulk import montar_resultado, validar_itens, verificar_tamanho
+from api.v1.batch import ids_do_batch, montar_batch
+from schemas.bulk import BulkItemResultado, BulkResultado
+from api.v1.export import exportar
+from api.v1 import listagem_rapida
+from api.v1.catalogo import obter_catalogo
+from api.v1.tiles import invalidar_tiles
+from core.config import settings
 
 router = APIRouter()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+async def _carregar_praia(db: AsyncSession, praia_id: int):
+    result = await db.execute(
+        select(Praia)
+        .options(selectinload(Praia.quiosques))
+        .where(Praia.id == praia_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+# O quiosque embute os dados da praia, então ele também sai do cache; as
+# listagens das duas tabelas são invalidadas pela versão. Os tiles saem pela
+# posição da praia e pelos pontos extras (posição anterior, quiosques
+# excluídos em cascata).
+async def _invalidar_cache(praia: Praia, *pontos):
+    await cache.delete(
+        praia_key(praia.id), *[quiosque_key(q.id) for q in praia.quiosques]
+    )
+    await invalidar_tiles((praia.latitude, praia.longitude), *pontos)
+    await cache.incrementar_versao("praias", "quiosques")
 
 
 # GET GERAL
 @router.get("/", response_model=PraiaList)
-def get_todas_as_praias(
+async def get_todas_as_praias(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
-    municipio: Optional[str] = None,
-    estado: Optional[str] = None,
-    min_rating: Optional[float] = None,
-    max_rating: Optional[float] = None,
-    tem_quiosque: Optional[bool] = None,
-    quiosque: Optional[int] = None,
-    tem_salvavida: Optional[bool] = None,
-    min_latitude: Optional[float] = None,
-    max_latitude: Optional[float] = None,
-    min_longitude: Optional[float] = None,
-    max_longitude: Optional[float] = None,
-    min_comprimento: Optional[int] = None,
-    max_comprimento: Optional[int] = None,
-    min_largura: Optional[int] = None,
-    max_largura: Optional[int] = None,
-    propria_banho: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    filtros: FiltrosPraia = Depends(),
+    campos: CamposPraia = Depends(),
+    contagens: ContagensPraia = Depends(),
+    db: AsyncSession = Depends(get_db_leitura),
 ):
-    query = db.query(Praia).options(selectinload(Praia.quiosques))
-
-    filtros_igualdade = {
-        "municipio": municipio,
-        "estado": estado,
-        "tem_salvavida": tem_salvavida,
-        "propria_banho": propria_banho,
-    }
-    for attr, value in filtros_igualdade.items():
-        if value is not None:
-            query = query.filter(getattr(Praia, attr) == value)
-
-    filtros_range = [
-        (min_rating, Praia.rating, ">="),
-        (max_rating, Praia.rating, "<="),
-        (min_latitude, Praia.latitude, ">="),
-        (max_latitude, Praia.latitude, "<="),
-        (min_longitude, Praia.longitude, ">="),
-        (max_longitude, Praia.longitude, "<="),
-        (min_comprimento, Praia.comprimento, ">="),
-        (max_comprimento, Praia.comprimento, "<="),
-        (min_largura, Praia.largura, ">="),
-        (max_largura, Praia.largura, "<="),
-    ]
-    for value, column, op in filtros_range:
-        if value is not None:
-            if op == ">=":
-                query = query.filter(column >= value)
-            else:
-                query = query.filter(column <= value)
-
-    if tem_quiosque is True:
-        query = query.filter(Praia.quiosques.any())
-    elif tem_quiosque is False:
-        query = query.filter(~Praia.quiosques.any())
-
-    if quiosque:
-        query = query.filter(Praia.quiosques.any(Quiosque.id == quiosque))
-
-    praias = query.offset(skip).limit(limit).all()
+    chave = list_key(
+        "praia_list",
+        await cache.versao("praias"),
+        {
+            **filtros.normalizados(),
+            **campos.normalizados(),
+            **contagens.normalizados(),
+            "skip": skip,
+            "limit": limit,
+            "cursor": cursor,
+        },
+    )
+    resposta_304 = nao_modificado(request, response, etag_de(chave))
+    if resposta_304 is not None:
+        return resposta_304
+
+    # Com o snapshot colunar os filtros rodam em memória, sem SQL.
+    if settings.CATALOG_SNAPSHOT:
+        cursor_id = decode_cursor(cursor) if cursor is not None else None
+        catalogo = await obter_catalogo()
+        dados = catalogo.listar_praias(filtros, campos, skip, limit, cursor_id)
+        await contagens.adicionar(db, dados, filtros)
+        # O snapshot vem do primário; as contagens, não necessariamente.
+        if contagens.pedidas and da_replica(db):
+            sem_etag(response)
+        with cronometro("serializacao"):
+            return listagem_rapida.resposta_json(dados, response)
+
+    # Respostas esparsas não seguem o PraiaList e sempre vão pelo caminho rápido.
+    rapido = settings.LIST_FAST_PATH or campos.esparso
+    em_cache = await cache.get(chave)
+    if em_cache is not None:
+        if rapido:
+            return listagem_rapida.resposta_json(em_cache, response)
+        return em_cache
+
+    if rapido:
+        query = listagem_rapida.select_praias(campos.selecionados())
+    else:
+        query = select(Praia).options(selectinload(Praia.quiosques))
+    query = filtros.aplicar(query)
+
+    # Com cursor, pagina por id (keyset) em vez de OFFSET; skip é ignorado.
+    query = query.order_by(Praia.id)
+    if cursor is not None:
+        query = query.where(Praia.id > decode_cursor(cursor))
+    else:
+        query = query.offset(skip)
+
+    if rapido:
+        dados = await listagem_rapida.listar_praias(
+            db, query.limit(limit), limit, campos.incluir
+        )
+        await contagens.adicionar(db, dados, filtros)
+        await guardar_resposta(db, response, chave, dados)
+        with cronometro("serializacao"):
+            return listagem_rapida.resposta_json(dados, response)
+
+    praias = (await db.execute(query.limit(limit))).scalars().all()
+    with cronometro("serializacao"):
+        dados = PraiaList.model_validate(
+            {"praias": praias, "next_cursor": next_cursor(praias, limit)},
+            from_attributes=True,
+        ).model_dump(mode="json")
+    await contagens.adicionar(db, dados, filtros)
+    await guardar_resposta(db, response, chave, dados)
+    return dados
+
+
+# EXPORTACAO
+COLUNAS_CSV = [
+    "id",
+    "nome",
+    "estado",
+    "municipio",
+    "latitude",
+    "longitude",
+    "comprimento",
+    "largura",
+    "propria_banho",
+    "tem_salvavida",
+    "rating",
+]
+
+
+@router.get("/export")
+async def exportar_praias(
+    request: Request,
+    formato: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    filtros: FiltrosPraia = Depends(),
+):
+    # NDJSON leva os quiosques de cada praia; o CSV é plano e não os carrega.
+    query = select(Praia)
+    if formato == "ndjson":
+        query = query.options(selectinload(Praia.quiosques))
+    query = filtros.aplicar(query).order_by(Praia.id)
+    return exportar(
+        query,
+        formato,
+        PraiaOut,
+        COLUNAS_CSV,
+        "praias",
+        gzip,
+        leitura=ler_da_replica(request),
+    )
+
+
+# GET PROXIMAS
+@router.get("/near", response_model=PraiaProximaList)
+async def get_praias_proximas(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=500),
+    k: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db_leitura),
+):
+    # Candidatos pelos prefixos geohash (range no índice), distância exata em Python.
+    prefixos = geohash_cobertura(lat, lon, radius_km)
+    candidatos = await db.execute(
+        select(Praia.id, Praia.latitude, Praia.longitude).where(
+            or_(*[Praia.geohash.startswith(p) for p in prefixos])
+        )
+    )
+    distancias = {}
+    for praia_id, latitude, longitude in candidatos:
+        distancia = haversine_km(lat, lon, latitude, longitude)
+        if distancia <= radius_km:
+            distancias[praia_id] = distancia
+    mais_proximas = sorted(distancias, key=distancias.get)[:k]
+    if not mais_proximas:
+        return {"praias": []}
+
+    result = await db.execute(
+        select(Praia)
+        .options(selectinload(Praia.quiosques))
+        .where(Praia.id.in_(mais_proximas))
+    )
+    por_id = {praia.id: praia for praia in result.scalars()}
+    with cronometro("serializacao"):
+        praias = [
+            {
+                **PraiaOut.model_validate(por_id[praia_id]).model_dump(),
+                "distancia_km": round(distancias[praia_id], 3),
+            }
+            for praia_id in mais_proximas
+        ]
     return {"praias": praias}
 
 
+# GET EM LOTE
+@router.get("/batch", response_model=PraiaBatch)
+async def get_praias_em_lote(
+    ids: List[int] = Depends(ids_do_batch),
+    db: AsyncSession = Depends(get_db_leitura),
+):
+    # Um IN para as praias e um para os quiosques (selectinload).
+    result = await db.execute(
+        select(Praia)
+        .options(selectinload(Praia.quiosques))
+        .where(Praia.id.in_(set(ids)))
+    )
+    with cronometro("serializacao"):
+        por_id = {
+            praia.id: PraiaOut.model_validate(praia, from_attributes=True).model_dump(
+                mode="json"
+            )
+            for praia in result.scalars()
+        }
+    return {"praias": montar_batch(ids, por_id, "praia")}
+
+
 # GET POR ID
 @router.get("/{praia_id}", response_model=PraiaOut)
-def get_praia_por_id(praia_id: int, db: Session = Depends(get_db)):
-    praia_encontrada = (
-        db.query(Praia)
-        .options(selectinload(Praia.quiosques))
-        .filter(Praia.id == praia_id)
-        .first()
+async def get_praia_por_id(
+    praia_id: int,
+    request: Request,
+    response: Response,
+    campos: CamposPraia = Depends(),
+    db: AsyncSession = Depends(get_db_leitura),
+):
+    etag = etag_de(
+        list_key(
+            praia_key(praia_id), await cache.versao("praias"), campos.normalizados()
+        )
     )
+    resposta_304 = nao_modificado(request, response, etag)
+    if resposta_304 is not None:
+        return resposta_304
+
+    # O cache guarda a praia completa; pedidos esparsos recortam dela e, sem
+    # ela, consultam só as colunas (e a relação) pedidas.
+    em_cache = await cache.get(praia_key(praia_id))
+    if em_cache is not None:
+        if campos.esparso:
+            return listagem_rapida.resposta_json(campos.projetar(em_cache), response)
+        return em_cache
+
+    if campos.esparso:
+        dados = await listagem_rapida.buscar_praia(
+            db, praia_id, campos.selecionados(), campos.incluir
+        )
+        if dados is None:
+            raise HTTPException(status_code=404, detail="Praia nao registrada")
+        if da_replica(db):
+            sem_etag(response)
+        return listagem_rapida.resposta_json(dados, response)
+
+    praia_encontrada = await _carregar_praia(db, praia_id)
     if praia_encontrada is None:
         raise HTTPException(status_code=404, detail="Praia nao registrada")
-    return praia_encontrada
+    with cronometro("serializacao"):
+        dados = PraiaOut.model_validate(praia_encontrada).model_dump(mode="json")
+    await guardar_resposta(db, response, praia_key(praia_id), dados)
+    return dados
 
 
 # POST
 @router.post("/", response_model=PraiaOut, status_code=status.HTTP_201_CREATED)
-def create_praia(
+async def create_praia(
     praia: PraiaCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: UsuarioAutenticado = Depends(get_current_user),
 ):
     try:
         db_praia = Praia(**praia.model_dump())
         db.add(db_praia)
-        db.commit()
-        db.refresh(db_praia)
+        await db.commit()
+        db_praia = await _carregar_praia(db, db_praia.id)
+        await _invalidar_cache(db_praia)
         return db_praia
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Erro ao criar a praia. Verifique se os dados estão corretos e se o nome não está duplicado.",
         )
 
 
+# POST EM LOTE
+@router.post("/bulk", response_model=BulkResultado)
+async def create_praias_bulk(
+    itens: List[Dict[str, Any]] = Body(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: UsuarioAutenticado = Depends(get_current_user),
+):
+    verificar_tamanho(itens)
+    validos, resultados = validar_itens(itens, PraiaCreate)
+    if not validos:
+        return montar_resultado(resultados)
+
+    # INSERT em lote (executemany/insertmanyvalues); eventos do mapper não
+    # rodam nesse caminho, então o geohash e o delta das estatísticas são
+    # calculados aqui.
+    linhas = []
+    for _, praia in validos:
+        linha = praia.model_dump(mode="json")
+        linha["geohash"] = geohash_encode(linha["latitude"], linha["longitude"])
+        linhas.append(linha)
+    try:
+        result = await db.execute(
+            insert(Praia).returning(Praia.id, sort_by_parameter_order=True), linhas
+        )
+        ids = result.scalars().all()
+        await db.execute(somar_praias(ids))
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Erro ao criar as praias. Verifique se os dados estão corretos.",
+        )
+    await invalidar_tiles(
+        *[(linha["latitude"], linha["longitude"]) for linha in linhas]
+    )
+    await cache.incrementar_versao("praias", "quiosques")
+
+    resultados += [
+        BulkItemResultado(indice=indice, status="criado", id=praia_id)
+        for (indice, _), praia_id in zip(validos, ids)
+    ]
+    return montar_resultado(resultados)
+
+
 # DELETE
 @router.delete("/{praia_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_praia(
+async def delete_praia(
     praia_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: UsuarioAutenticado = Depends(get_current_user),
 ):
-    praia_encontrada = (
-        db.query(Praia)
-        .options(selectinload(Praia.quiosques))
-        .filter(Praia.id == praia_id)
-        .first()
-    )
+    praia_encontrada = await _carregar_praia(db, praia_id)
     if praia_encontrada is None:
         raise HTTPException(status_code=404, detail="Praia nao registrada")
-    db.delete(praia_encontrada)
-    db.commit()
+    await db.delete(praia_encontrada)
+    await db.commit()
+    await _invalidar_cache(
+        praia_encontrada,
+        *[(q.latitude, q.longitude) for q in praia_encontrada.quiosques],
+    )
     return {"message": "Praia deletada com sucesso!"}
 
 
 # PUT
 @router.put("/{praia_id}", response_model=PraiaOut)
-def update_praia(
+async def update_praia(
     praia_id: int,
     praia: PraiaPatch,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: UsuarioAutenticado = Depends(get_current_user),
 ):
-    praia_db = db.query(Praia).filter(Praia.id == praia_id).first()
+    praia_db = await db.get(Praia, praia_id)
     if not praia_db:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Praia com id {praia_id} não encontrada.",
         )
+    ponto_anterior = (praia_db.latitude, praia_db.longitude)
     update_data = praia.model_dump()
     for key, value in update_data.items():
         setattr(praia_db, key, value)
 
     try:
-        db.commit()
-        db.refresh(praia_db)
+        await db.commit()
+        praia_db = await _carregar_praia(db, praia_id)
+        await _invalidar_cache(praia_db, ponto_anterior)
         return praia_db
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Erro ao atualizar a praia. O nome pode já estar em uso por outra praia.",
@@ -176,19 +420,20 @@ def update_praia(
 
 # PATCH
 @router.patch("/{praia_id}", response_model=PraiaOut)
-def partial_update_praia(
+async def partial_update_praia(
     praia_id: int,
     praia: PraiaPatch,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: UsuarioAutenticado = Depends(get_current_user),
 ):
-    praia_db = db.query(Praia).filter(Praia.id == praia_id).first()
+    praia_db = await db.get(Praia, praia_id)
 
     if not praia_db:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Praia com id {praia_id} não encontrada.",
         )
+    ponto_anterior = (praia_db.latitude, praia_db.longitude)
 
     update_data = praia.model_dump(exclude_unset=True)
 
@@ -203,11 +448,12 @@ def partial_update_praia(
 
     try:
         db.add(praia_db)
-        db.commit()
-        db.refresh(praia_db)
+        await db.commit()
+        praia_db = await _carregar_praia(db, praia_id)
+        await _invalidar_cache(praia_db, ponto_anterior)
         return praia_db
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Erro ao atualizar a praia. O nome pode já estar em uso por outra praia.",
@@ -1,171 +1,452 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
-from auth.deps import get_current_user
-from models.user import User
+from typing import Any, Dict, List, Optional
+from auth.deps import UsuarioAutenticado, get_current_user
 
-from db.session import SessionLocal
+from db.session import da_replica, get_db, get_db_leitura, ler_da_replica
 from models.quiosque import Quiosque
+from models.estatistica import somar_quiosques
 from schemas.quiosque import (
     QuiosqueCreate,
     QuiosqueUpdate,
     QuiosqueOut,
     QuiosquePatch,
+    QuiosqueBatch,
     QuiosqueList,
+    QuiosqueProximoList,
 )
 from models.praia import Praia
-
+from api.v1.pagination import decode_cursor, next_cursor
+from core.geo import geohash_cobertura, geohash_encode, haversine_km
+from core.instrumentacao import cronometro
+from core.cache import cache, list_key, praia_key, quiosque_key
+from api.v1.filtros import FiltrosQuiosque
+from api.v1.campos import CamposQuiosque
+from api.v1.contagens import ContagensQuiosque
+from api.v1.etag import etag_de, guardar_resposta, nao_modificado, sem_etag
+from api.v1.bulk import montar_resultado, validar_itens, verificar_tamanho
+from api.v1.batch import ids_do_batch, montar_batch
+from schemas.bulk import BulkItemResultado, BulkResultado
+from api.v1.export import exportar
+from api.v1 import listagem_rapida
+from api.v1.catalogo import obter_catalogo
+from api.v1.tiles import invalidar_tiles
+from core.config import settings
 
 router = APIRouter()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+async def _carregar_quiosque(db: AsyncSession, quiosque_id: int):
+    result = await db.execute(
+        select(Quiosque)
+        .options(joinedload(Quiosque.praia))
+        .where(Quiosque.id == quiosque_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+# A praia embute a lista de quiosques, então as praias afetadas também saem do
+# cache; as listagens das duas tabelas são invalidadas pela versão. Os tiles
+# saem pelos pontos (posição atual e anterior do quiosque).
+async def _invalidar_cache(quiosque_id: int, *praia_ids, pontos=()):
+    await cache.delete(
+        quiosque_key(quiosque_id),
+        *[praia_key(praia_id) for praia_id in set(praia_ids) if praia_id is not None],
+    )
+    await invalidar_tiles(*pontos)
+    await cache.incrementar_versao("praias", "quiosques")
 
 
 # GET GERAL
 @router.get("/", response_model=QuiosqueList)
-def get_todos_os_quiosques(
+async def get_todos_os_quiosques(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
-    nome: Optional[str] = None,
-    min_nota: Optional[float] = None,
-    max_nota: Optional[float] = None,
-    tem_acessibilidade: Optional[bool] = None,
-    tem_banheiro: Optional[bool] = None,
-    praia_id: Optional[int] = None,
-    min_valor: Optional[float] = None,
-    max_valor: Optional[float] = None,
-    min_latitude: Optional[float] = None,
-    max_latitude: Optional[float] = None,
-    min_longitude: Optional[float] = None,
-    max_longitude: Optional[float] = None,
-    estado: Optional[str] = None,
-    municipio: Optional[str] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    filtros: FiltrosQuiosque = Depends(),
+    campos: CamposQuiosque = Depends(),
+    contagens: ContagensQuiosque = Depends(),
+    db: AsyncSession = Depends(get_db_leitura),
 ):
-    query = db.query(Quiosque).join(Praia).options(joinedload(Quiosque.praia))
-
-    eq_filters = {
-        "nome": nome,
-        "tem_acessibilidade": tem_acessibilidade,
-        "tem_banheiro": tem_banheiro,
-        "praia_id": praia_id,
-    }
-    for attr, value in eq_filters.items():
-        if value is not None:
-            query = query.filter(getattr(Quiosque, attr) == value)
-
-    range_filters = [
-        (min_nota, Quiosque.nota, ">="),
-        (max_nota, Quiosque.nota, "<="),
-        (min_valor, Quiosque.valor, ">="),
-        (max_valor, Quiosque.valor, "<="),
-        (min_latitude, Quiosque.latitude, ">="),
-        (max_latitude, Quiosque.latitude, "<="),
-        (min_longitude, Quiosque.longitude, ">="),
-        (max_longitude, Quiosque.longitude, "<="),
-    ]
-    for value, column, op in range_filters:
-        if value is not None:
-            if op == ">=":
-                query = query.filter(column >= value)
-            else:
-                query = query.filter(column <= value)
-
-    if estado:
-        query = query.filter(Praia.estado == estado)
-    if municipio:
-        query = query.filter(Praia.municipio == municipio)
-
-    quiosques = query.offset(skip).limit(limit).all()
+    chave = list_key(
+        "quiosque_list",
+        await cache.versao("quiosques"),
+        {
+            **filtros.normalizados(),
+            **campos.normalizados(),
+            **contagens.normalizados(),
+            "skip": skip,
+            "limit": limit,
+            "cursor": cursor,
+        },
+    )
+    resposta_304 = nao_modificado(request, response, etag_de(chave))
+    if resposta_304 is not None:
+        return resposta_304
+
+    # Com o snapshot colunar os filtros rodam em memória, sem SQL.
+    if settings.CATALOG_SNAPSHOT:
+        cursor_id = decode_cursor(cursor) if cursor is not None else None
+        catalogo = await obter_catalogo()
+        dados = catalogo.listar_quiosques(filtros, campos, skip, limit, cursor_id)
+        await contagens.adicionar(db, dados, filtros)
+        # O snapshot vem do primário; as contagens, não necessariamente.
+        if contagens.pedidas and da_replica(db):
+            sem_etag(response)
+        with cronometro("serializacao"):
+            return listagem_rapida.resposta_json(dados, response)
+
+    # Respostas esparsas não seguem o QuiosqueList e sempre vão pelo caminho
+    # rápido; sem include=praia as colunas da praia nem são selecionadas.
+    rapido = settings.LIST_FAST_PATH or campos.esparso
+    em_cache = await cache.get(chave)
+    if em_cache is not None:
+        if rapido:
+            return listagem_rapida.resposta_json(em_cache, response)
+        return em_cache
+
+    if rapido:
+        query = listagem_rapida.select_quiosques(campos.selecionados(), campos.incluir)
+    else:
+        query = select(Quiosque).join(Praia).options(joinedload(Quiosque.praia))
+    query = filtros.aplicar(query)
+
+    # Com cursor, pagina por id (keyset) em vez de OFFSET; skip é ignorado.
+    query = query.order_by(Quiosque.id)
+    if cursor is not None:
+        query = query.where(Quiosque.id > decode_cursor(cursor))
+    else:
+        query = query.offset(skip)
+
+    if rapido:
+        dados = await listagem_rapida.listar_quiosques(
+            db, query.limit(limit), limit, campos.incluir
+        )
+        await contagens.adicionar(db, dados, filtros)
+        await guardar_resposta(db, response, chave, dados)
+        with cronometro("serializacao"):
+            return listagem_rapida.resposta_json(dados, response)
+
+    quiosques = (await db.execute(query.limit(limit))).scalars().all()
+    with cronometro("serializacao"):
+        dados = QuiosqueList.model_validate(
+            {"quiosques": quiosques, "next_cursor": next_cursor(quiosques, limit)},
+            from_attributes=True,
+        ).model_dump(mode="json")
+    await contagens.adicionar(db, dados, filtros)
+    await guardar_resposta(db, response, chave, dados)
+    return dados
+
+
+# EXPORTACAO
+COLUNAS_CSV = [
+    "id",
+    "nome",
+    "descricao",
+    "nota",
+    "latitude",
+    "longitude",
+    "tem_acessibilidade",
+    "tem_banheiro",
+    "valor",
+    "ocupacao_maxima",
+    "praia_id",
+]
+
+
+@router.get("/export")
+async def exportar_quiosques(
+    request: Request,
+    formato: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    filtros: FiltrosQuiosque = Depends(),
+):
+    query = select(Quiosque).join(Praia)
+    if formato == "ndjson":
+        query = query.options(joinedload(Quiosque.praia))
+    query = filtros.aplicar(query).order_by(Quiosque.id)
+    return exportar(
+        query,
+        formato,
+        QuiosqueOut,
+        COLUNAS_CSV,
+        "quiosques",
+        gzip,
+        leitura=ler_da_replica(request),
+    )
+
+
+# GET PROXIMOS
+@router.get("/near", response_model=QuiosqueProximoList)
+async def get_quiosques_proximos(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=500),
+    k: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db_leitura),
+):
+    # Candidatos pelos prefixos geohash (range no índice), distância exata em Python.
+    prefixos = geohash_cobertura(lat, lon, radius_km)
+    candidatos = await db.execute(
+        select(Quiosque.id, Quiosque.latitude, Quiosque.longitude).where(
+            or_(*[Quiosque.geohash.startswith(p) for p in prefixos])
+        )
+    )
+    distancias = {}
+    for quiosque_id, latitude, longitude in candidatos:
+        distancia = haversine_km(lat, lon, latitude, longitude)
+        if distancia <= radius_km:
+            distancias[quiosque_id] = distancia
+    mais_proximos = sorted(distancias, key=distancias.get)[:k]
+    if not mais_proximos:
+        return {"quiosques": []}
+
+    result = await db.execute(
+        select(Quiosque)
+        .options(joinedload(Quiosque.praia))
+        .where(Quiosque.id.in_(mais_proximos))
+    )
+    por_id = {quiosque.id: quiosque for quiosque in result.scalars()}
+    with cronometro("serializacao"):
+        quiosques = [
+            {
+                **QuiosqueOut.model_validate(por_id[quiosque_id]).model_dump(),
+                "distancia_km": round(distancias[quiosque_id], 3),
+            }
+            for quiosque_id in mais_proximos
+        ]
     return {"quiosques": quiosques}
 
 
+# GET EM LOTE
+@router.get("/batch", response_model=QuiosqueBatch)
+async def get_quiosques_em_lote(
+    ids: List[int] = Depends(ids_do_batch),
+    db: AsyncSession = Depends(get_db_leitura),
+):
+    # A praia vem no mesmo SELECT (joinedload), numa única consulta.
+    result = await db.execute(
+        select(Quiosque)
+        .options(joinedload(Quiosque.praia))
+        .where(Quiosque.id.in_(set(ids)))
+    )
+    with cronometro("serializacao"):
+        por_id = {
+            quiosque.id: QuiosqueOut.model_validate(
+                quiosque, from_attributes=True
+            ).model_dump(mode="json")
+            for quiosque in result.scalars()
+        }
+    return {"quiosques": montar_batch(ids, por_id, "quiosque")}
+
+
 # GET POR ID
 @router.get("/{quiosque_id}", response_model=QuiosqueOut)
-def get_quiosque_por_id(quiosque_id: int, db: Session = Depends(get_db)):
-    quiosque_encontrada = (
-        db.query(Quiosque)
-        .filter(Quiosque.id == quiosque_id)
-        .options(joinedload(Quiosque.praia))
-        .first()
+async def get_quiosque_por_id(
+    quiosque_id: int,
+    request: Request,
+    response: Response,
+    campos: CamposQuiosque = Depends(),
+    db: AsyncSession = Depends(get_db_leitura),
+):
+    etag = etag_de(
+        list_key(
+            quiosque_key(quiosque_id),
+            await cache.versao("quiosques"),
+            campos.normalizados(),
+        )
     )
+    resposta_304 = nao_modificado(request, response, etag)
+    if resposta_304 is not None:
+        return resposta_304
+
+    # O cache guarda o quiosque completo; pedidos esparsos recortam dele e, sem
+    # ele, consultam só as colunas (e a praia) pedidas.
+    em_cache = await cache.get(quiosque_key(quiosque_id))
+    if em_cache is not None:
+        if campos.esparso:
+            return listagem_rapida.resposta_json(campos.projetar(em_cache), response)
+        return em_cache
+
+    if campos.esparso:
+        dados = await listagem_rapida.buscar_quiosque(
+            db, quiosque_id, campos.selecionados(), campos.incluir
+        )
+        if dados is None:
+            raise HTTPException(status_code=404, detail="Quiosque nao registrado")
+        if da_replica(db):
+            sem_etag(response)
+        return listagem_rapida.resposta_json(dados, response)
+
+    quiosque_encontrada = await _carregar_quiosque(db, quiosque_id)
     if quiosque_encontrada is None:
         raise HTTPException(status_code=404, detail="Quiosque nao registrado")
-    return quiosque_encontrada
+    with cronometro("serializacao"):
+        dados = QuiosqueOut.model_validate(quiosque_encontrada).model_dump(mode="json")
+    await guardar_resposta(db, response, quiosque_key(quiosque_id), dados)
+    return dados
 
 
 # POST
 @router.post("/", response_model=QuiosqueOut, status_code=status.HTTP_201_CREATED)
-def create_quiosque(
+async def create_quiosque(
     quiosque: QuiosqueCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: UsuarioAutenticado = Depends(get_current_user),
 ):
     try:
         db_quiosque = Quiosque(**quiosque.model_dump())
         db.add(db_quiosque)
-        db.commit()
-        db.refresh(db_quiosque)
-        return db_quiosque
+        await db.commit()
+        await _invalidar_cache(
+            db_quiosque.id,
+            db_quiosque.praia_id,
+            pontos=[(db_quiosque.latitude, db_quiosque.longitude)],
+        )
+        return await _carregar_quiosque(db, db_quiosque.id)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Erro ao criar o quiosque. Verifique se os dados estão corretos e se o nome não está duplicado.",
         )
 
 
+# POST EM LOTE
+@router.post("/bulk", response_model=BulkResultado)
+async def create_quiosques_bulk(
+    itens: List[Dict[str, Any]] = Body(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: UsuarioAutenticado = Depends(get_current_user),
+):
+    verificar_tamanho(itens)
+    validos, resultados = validar_itens(itens, QuiosqueCreate)
+
+    # Uma única consulta confere todas as praias referenciadas.
+    praia_ids = {quiosque.praia_id for _, quiosque in validos}
+    existentes = set()
+    if praia_ids:
+        existentes = set(
+            (await db.execute(select(Praia.id).where(Praia.id.in_(praia_ids))))
+            .scalars()
+            .all()
+        )
+    inseriveis = []
+    for indice, quiosque in validos:
+        if quiosque.praia_id in existentes:
+            inseriveis.append((indice, quiosque))
+        else:
+            resultados.append(
+                BulkItemResultado(
+                    indice=indice,
+                    status="erro",
+                    erro=f"Praia com id {quiosque.praia_id} não encontrada.",
+                )
+            )
+    if not inseriveis:
+        return montar_resultado(resultados)
+
+    # INSERT em lote (executemany/insertmanyvalues); eventos do mapper não
+    # rodam nesse caminho, então o geohash e o delta das estatísticas são
+    # calculados aqui.
+    linhas = []
+    for _, quiosque in inseriveis:
+        linha = quiosque.model_dump(mode="json")
+        linha["geohash"] = geohash_encode(linha["latitude"], linha["longitude"])
+        linhas.append(linha)
+    try:
+        result = await db.execute(
+            insert(Quiosque).returning(Quiosque.id, sort_by_parameter_order=True),
+            linhas,
+        )
+        ids = result.scalars().all()
+        await db.execute(somar_quiosques(ids))
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Erro ao criar os quiosques. Verifique se os dados estão corretos.",
+        )
+    await cache.delete(*[praia_key(praia_id) for praia_id in praia_ids])
+    await invalidar_tiles(
+        *[(linha["latitude"], linha["longitude"]) for linha in linhas]
+    )
+    await cache.incrementar_versao("praias", "quiosques")
+
+    resultados += [
+        BulkItemResultado(indice=indice, status="criado", id=quiosque_id)
+        for (indice, _), quiosque_id in zip(inseriveis, ids)
+    ]
+    return montar_resultado(resultados)
+
+
 # DELETE
 @router.delete("/{quiosque_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_quiosque(
+async def delete_quiosque(
     quiosque_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: UsuarioAutenticado = Depends(get_current_user),
 ):
-    quiosque_encontrado = (
-        db.query(Quiosque)
-        .options(joinedload(Quiosque.praia))
-        .filter(Quiosque.id == quiosque_id)
-        .first()
-    )
+    quiosque_encontrado = await db.get(Quiosque, quiosque_id)
     if quiosque_encontrado is None:
         raise HTTPException(status_code=404, detail="Quiosque nao registrado")
-    db.delete(quiosque_encontrado)
-    db.commit()
+    await db.delete(quiosque_encontrado)
+    await db.commit()
+    await _invalidar_cache(
+        quiosque_id,
+        quiosque_encontrado.praia_id,
+        pontos=[(quiosque_encontrado.latitude, quiosque_encontrado.longitude)],
+    )
     return
 
 
 # PUT
 @router.put("/{quiosque_id}", response_model=QuiosqueOut)
-def update_quiosque(
+async def update_quiosque(
     quiosque_id: int,
     quiosque: QuiosqueUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: UsuarioAutenticado = Depends(get_current_user),
 ):
-    quiosque_db = db.query(Quiosque).filter(Quiosque.id == quiosque_id).first()
+    quiosque_db = await db.get(Quiosque, quiosque_id)
     if not quiosque_db:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Quiosque com id {quiosque_id} não encontrado.",
         )
+    praia_anterior = quiosque_db.praia_id
+    ponto_anterior = (quiosque_db.latitude, quiosque_db.longitude)
     update_data = quiosque.model_dump()
     for key, value in update_data.items():
         setattr(quiosque_db, key, value)
 
     try:
-        db.commit()
-        db.refresh(quiosque_db)
-        return quiosque_db
+        await db.commit()
+        await _invalidar_cache(
+            quiosque_id,
+            praia_anterior,
+            quiosque_db.praia_id,
+            pontos=[ponto_anterior, (quiosque_db.latitude, quiosque_db.longitude)],
+        )
+        return await _carregar_quiosque(db, quiosque_id)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Erro ao atualizar o quiosque. O nome pode já estar em uso por outro quiosque.",
@@ -174,19 +455,21 @@ def update_quiosque(
 
 # PATCH
 @router.patch("/{quiosque_id}", response_model=QuiosqueOut)
-def partial_update_quiosque(
+async def partial_update_quiosque(
     quiosque_id: int,
     quiosque: QuiosquePatch,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: UsuarioAutenticado = Depends(get_current_user),
 ):
-    quiosque_db = db.query(Quiosque).filter(Quiosque.id == quiosque_id).first()
+    quiosque_db = await db.get(Quiosque, quiosque_id)
 
     if not quiosque_db:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Quiosque com id {quiosque_id} não encontrado.",
         )
+    praia_anterior = quiosque_db.praia_id
+    ponto_anterior = (quiosque_db.latitude, quiosque_db.longitude)
 
     update_data = quiosque.model_dump(exclude_unset=True)
 
@@ -201,11 +484,16 @@ def partial_update_quiosque(
 
     try:
         db.add(quiosque_db)
-        db.commit()
-        db.refresh(quiosque_db)
-        return quiosque_db
+        await db.commit()
+        await _invalidar_cache(
+            quiosque_id,
+            praia_anterior,
+            quiosque_db.praia_id,
+            pontos=[ponto_anterior, (quiosque_db.latitude, quiosque_db.longitude)],
+        )
+        return await _carregar_quiosque(db, quiosque_id)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Erro ao atualizar o quiosque. O nome pode já estar em uso por outro quiosque.",
@@ -0,0 +1,18 @@
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+from schemas.busca import BuscaList
+from api.v1 import busca
+
+router = APIRouter()
+
+
+# BUSCA POR NOME
+@router.get("", response_model=BuscaList)
+async def buscar(
+    q: str = Query(..., min_length=1, max_length=100),
+    tipo: Optional[str] = Query(None, pattern="^(praia|quiosque)$"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    return {"resultados": await busca.buscar(q, limit, tipo)}
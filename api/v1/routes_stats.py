@@ -0,0 +1,83 @@
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.session import get_db_leitura
+from models.estatistica import CONTADORES_PRAIA, CONTADORES_QUIOSQUE, Estatistica
+from schemas.estatistica import Estatisticas
+from core.cache import cache, list_key
+from api.v1.etag import etag_de, guardar_resposta, nao_modificado
+
+router = APIRouter()
+
+CONTADORES = CONTADORES_PRAIA + CONTADORES_QUIOSQUE
+
+
+def _razao(numerador, denominador):
+    if not denominador:
+        return None
+    return round(float(numerador) / denominador, 3)
+
+
+def _resumir(somas: dict) -> dict:
+    return {
+        "praias": somas["praias"],
+        "quiosques": somas["quiosques"],
+        "rating_medio": _razao(somas["soma_rating"], somas["praias_com_rating"]),
+        "nota_media": _razao(somas["soma_nota"], somas["quiosques_com_nota"]),
+        "quiosques_por_praia": _razao(somas["quiosques"], somas["praias"]),
+        "taxa_salvavida": _razao(somas["praias_com_salvavida"], somas["praias"]),
+        "taxa_propria_banho": _razao(somas["praias_proprias_banho"], somas["praias"]),
+    }
+
+
+def _acumular(somas: dict, linha) -> dict:
+    for nome in CONTADORES:
+        somas[nome] = somas.get(nome, 0) + linha[nome]
+    return somas
+
+
+# GET ESTATISTICAS
+# Lê o resumo por município (uma linha por município) e agrega estados e total
+# em memória; nunca varre praias e quiosques.
+@router.get("", response_model=Estatisticas)
+async def get_estatisticas(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db_leitura),
+):
+    chave = list_key("stats", await cache.versao("praias"), {})
+    resposta_304 = nao_modificado(request, response, etag_de(chave))
+    if resposta_304 is not None:
+        return resposta_304
+    em_cache = await cache.get(chave)
+    if em_cache is not None:
+        return em_cache
+
+    result = await db.execute(
+        select(Estatistica)
+        .where(or_(Estatistica.praias > 0, Estatistica.quiosques > 0))
+        .order_by(Estatistica.estado, Estatistica.municipio)
+    )
+    total, estados, municipios = {}, {}, []
+    for estatistica in result.scalars():
+        linha = {nome: getattr(estatistica, nome) for nome in CONTADORES}
+        _acumular(total, linha)
+        _acumular(estados.setdefault(estatistica.estado, {}), linha)
+        municipios.append(
+            {
+                "estado": estatistica.estado,
+                "municipio": estatistica.municipio,
+                **_resumir(linha),
+            }
+        )
+
+    dados = {
+        "total": _resumir(_acumular(total, dict.fromkeys(CONTADORES, 0))),
+        "estados": [
+            {"estado": estado, **_resumir(somas)} for estado, somas in estados.items()
+        ],
+        "municipios": municipios,
+    }
+    await guardar_resposta(db, response, chave, dados)
+    return dados
@@ -0,0 +1,72 @@
+import heapq
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import select
+
+from db.session import get_db_leitura
+from models.exclusao import Exclusao
+from models.praia import Praia
+from models.quiosque import Quiosque
+from schemas.sync import SyncResultado
+from api.v1 import listagem_rapida
+
+router = APIRouter()
+
+
+# Sync incremental: devolve o que foi criado, alterado ou excluído depois de
+# "since", em ordem de versão. O cliente guarda a "versao" da resposta e repete
+# enquanto "tem_mais" for verdadeiro. Cada fonte lê no máximo limit + 1 linhas
+# pelo índice de versão; a junção ordenada decide o que entra na página.
+@router.get("", response_model=SyncResultado)
+async def sync(
+    response: Response,
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    db=Depends(get_db_leitura),
+):
+    praias = await db.execute(
+        listagem_rapida.select_praias()
+        .add_columns(Praia.versao)
+        .where(Praia.versao > since)
+        .order_by(Praia.versao)
+        .limit(limit + 1)
+    )
+    quiosques = await db.execute(
+        select(*listagem_rapida.COLUNAS_QUIOSQUE_INFO, Quiosque.versao)
+        .where(Quiosque.versao > since)
+        .order_by(Quiosque.versao)
+        .limit(limit + 1)
+    )
+    exclusoes = await db.execute(
+        select(Exclusao.tabela, Exclusao.registro_id, Exclusao.versao)
+        .where(Exclusao.versao > since)
+        .order_by(Exclusao.versao)
+        .limit(limit + 1)
+    )
+
+    mudancas = heapq.merge(
+        (("praias", dict(linha)) for linha in praias.mappings()),
+        (("quiosques", dict(linha)) for linha in quiosques.mappings()),
+        (("exclusoes", dict(linha)) for linha in exclusoes.mappings()),
+        key=lambda mudanca: mudanca[1]["versao"],
+    )
+
+    resultado = {
+        "versao": since,
+        "tem_mais": False,
+        "praias": [],
+        "quiosques": [],
+        "exclusoes": {"praias": [], "quiosques": []},
+    }
+    for total, (fonte, linha) in enumerate(mudancas):
+        if total == limit:
+            resultado["tem_mais"] = True
+            break
+        if fonte == "exclusoes":
+            resultado["exclusoes"][linha["tabela"]].append(linha["registro_id"])
+        else:
+            resultado[fonte].append(linha)
+        resultado["versao"] = linha["versao"]
+
+    response.headers["Cache-Control"] = "no-store"
+    return listagem_rapida.resposta_json(resultado, response)
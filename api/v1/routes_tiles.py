@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.session import get_db_leitura
+from schemas.tile import Tile
+from api.v1.tiles import obter_tile
+from core.config import settings
+
+router = APIRouter()
+
+
+# GET TILE
+@router.get("/{z}/{x}/{y}", response_model=Tile)
+async def get_tile(
+    z: int = Path(..., ge=0, le=settings.TILE_MAX_ZOOM),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+    db: AsyncSession = Depends(get_db_leitura),
+):
+    if x >= 1 << z or y >= 1 << z:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Tile inexistente no zoom {z}.",
+        )
+    return await obter_tile(db, z, x, y)
@@ -1,35 +1,34 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from db.session import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.session import get_db
 from schemas.user import UserCreate, UserOut, Token, UserLogin, RefreshTokenRequest
 from models.user import User
-from auth.cryptography import verify_password
-from auth.deps import get_current_user
+from auth.cryptography import hash_password_async, verify_password_async
+from auth.deps import UsuarioAutenticado, get_current_user, invalidar_usuario
 from auth.jwt_handler import create_access_and_refresh_tokens, decode_token
 
 router = APIRouter()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.post("/login", response_model=Token)
-def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     username = user_credentials.username
-    user = db.query(User).filter(User.username == username).first()
-
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    user = (
+        await db.execute(select(User).where(User.username == username))
+    ).scalar_one_or_none()
+
+    # Argon2 é CPU-bound: verifica no pool de processos dedicado.
+    if not user or not await verify_password_async(
+        user_credentials.password, user.hashed_password
+    ):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    tokens = create_access_and_refresh_tokens(user.id)
+    tokens = create_access_and_refresh_tokens(user.id, user.username)
 
     user.refresh_token_hash = tokens["refresh_token"]
-    db.commit()
+    await db.commit()
+    invalidar_usuario(user.id)
 
     token = Token(
         access_token=tokens["access_token"],
@@ -40,33 +39,36 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def register(user_credentials: UserCreate, db: Session = Depends(get_db)):
+async def register(user_credentials: UserCreate, db: AsyncSession = Depends(get_db)):
     username = user_credentials.username
-    user = db.query(User).filter(User.username == username).first()
+    user = (
+        await db.execute(select(User).where(User.username == username))
+    ).scalar_one_or_none()
     if user:
         raise HTTPException(status_code=400, detail="User already exists")
 
-    new_user = User(**user_credentials.model_dump())
+    hashed_password = await hash_password_async(user_credentials.password)
+    new_user = User(username=username, hashed_password=hashed_password)
     db.add(new_user)
     try:
-        db.commit()
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Could not create user")
 
-    db.refresh(new_user)
+    await db.refresh(new_user)
     return new_user
 
 
 @router.get("/me", response_model=UserOut)
-def read_user(
-    current_user: User = Depends(get_current_user),
+async def read_user(
+    current_user: UsuarioAutenticado = Depends(get_current_user),
 ):
     return current_user
 
 
 @router.post("/refresh", response_model=Token)
-def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_db)):
+async def refresh_token(request: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
     token_str = request.refresh_token
     try:
         payload = decode_token(token_str)
@@ -79,17 +81,18 @@ def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_db)):
     if not user_id:
         raise HTTPException(status_code=401, detail="Payload do token inválido")
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.get(User, int(user_id))
 
     if not user or user.refresh_token_hash != token_str:
         raise HTTPException(
             status_code=401, detail="Refresh token revogado ou inválido"
         )
 
-    new_tokens = create_access_and_refresh_tokens(user.id)
+    new_tokens = create_access_and_refresh_tokens(user.id, user.username)
 
     user.refresh_token_hash = new_tokens["refresh_token"]
-    db.commit()
+    await db.commit()
+    invalidar_usuario(user.id)
 
     new_token = Token(
         access_token=new_tokens["access_token"],
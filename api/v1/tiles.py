@@ -0,0 +1,117 @@
+import math
+
+from sqlalchemy import Float, cast, func, select
+
+from core.cache import cache, tile_key
+from core.config import settings
+from core.geo import limites_tile, tile_do_ponto
+from db.session import da_replica
+from models.praia import Praia
+from models.quiosque import Quiosque
+
+# Clusters por tile: cada tile é dividido numa grade de 8x8 (os tiles do zoom
+# z + 3) e cada célula com registros vira um cluster com contagem, centroide,
+# bbox e o membro mais bem avaliado. A agregação roda no banco, com funções de
+# janela sobre as linhas do bbox do tile (índice de latitude/longitude).
+NIVEIS_GRADE = 3
+
+
+def _condicoes_tile(modelo, z: int, x: int, y: int):
+    oeste, sul, leste, norte = limites_tile(z, x, y)
+    ultimo = (1 << z) - 1
+    condicoes = []
+    # Nas bordas do mapa o limite fica aberto, como em tile_do_ponto.
+    if x > 0:
+        condicoes.append(modelo.longitude >= oeste)
+    if x < ultimo:
+        condicoes.append(modelo.longitude < leste)
+    if y > 0:
+        condicoes.append(modelo.latitude <= norte)
+    if y < ultimo:
+        condicoes.append(modelo.latitude > sul)
+    return condicoes
+
+
+def _select_clusters(modelo, avaliacao, z: int, x: int, y: int):
+    latitude = cast(modelo.latitude, Float)
+    longitude = cast(modelo.longitude, Float)
+    n = 1 << (z + NIVEIS_GRADE)
+    celula = (
+        func.floor((longitude + 180.0) / 360.0 * n),
+        func.floor(
+            (1 - func.asinh(func.tan(func.radians(latitude))) / math.pi) / 2 * n
+        ),
+    )
+    clusters = (
+        select(
+            modelo.id,
+            modelo.nome,
+            cast(avaliacao, Float).label("avaliacao"),
+            func.count().over(partition_by=celula).label("total"),
+            func.avg(latitude).over(partition_by=celula).label("latitude"),
+            func.avg(longitude).over(partition_by=celula).label("longitude"),
+            func.min(longitude).over(partition_by=celula).label("oeste"),
+            func.min(latitude).over(partition_by=celula).label("sul"),
+            func.max(longitude).over(partition_by=celula).label("leste"),
+            func.max(latitude).over(partition_by=celula).label("norte"),
+            func.row_number()
+            .over(
+                partition_by=celula,
+                order_by=(avaliacao.desc().nulls_last(), modelo.id),
+            )
+            .label("ordem"),
+        )
+        .where(*_condicoes_tile(modelo, z, x, y))
+        .subquery()
+    )
+    return select(clusters).where(clusters.c.ordem == 1)
+
+
+async def _clusters(db, modelo, avaliacao, z: int, x: int, y: int) -> list:
+    linhas = await db.execute(_select_clusters(modelo, avaliacao, z, x, y))
+    return [
+        {
+            "total": linha["total"],
+            "latitude": round(linha["latitude"], 6),
+            "longitude": round(linha["longitude"], 6),
+            "bbox": [linha["oeste"], linha["sul"], linha["leste"], linha["norte"]],
+            "destaque": {
+                "id": linha["id"],
+                "nome": linha["nome"],
+                "avaliacao": linha["avaliacao"],
+            },
+        }
+        for linha in linhas.mappings()
+    ]
+
+
+# O tile fica em cache até uma escrita atingir um ponto dentro dele; os lidos
+# de uma réplica não entram (ver da_replica).
+async def obter_tile(db, z: int, x: int, y: int) -> dict:
+    chave = tile_key(z, x, y)
+    em_cache = await cache.get(chave)
+    if em_cache is not None:
+        return em_cache
+    dados = {
+        "z": z,
+        "x": x,
+        "y": y,
+        "praias": await _clusters(db, Praia, Praia.rating, z, x, y),
+        "quiosques": await _clusters(db, Quiosque, Quiosque.nota, z, x, y),
+    }
+    if not da_replica(db):
+        await cache.set(chave, dados)
+    return dados
+
+
+# Invalida, em todos os zooms, os tiles que contêm os pontos (lat, lon) dados:
+# as posições novas e anteriores dos registros escritos.
+async def invalidar_tiles(*pontos):
+    chaves = {
+        tile_key(z, *tile_do_ponto(latitude, longitude, z))
+        for latitude, longitude in pontos
+        if latitude is not None and longitude is not None
+        for z in range(settings.TILE_MAX_ZOOM + 1)
+    }
+    if chaves:
+        await cache.delete(*chaves)
@@ -1,6 +1,21 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-context = CryptContext(schemes=["argon2"], deprecated="auto")
+from core.config import settings
+from core.metricas import HASH_SENHA, HASH_SENHA_REJEITADOS
+
+context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
 
 
 def hash_password(password: str) -> str:
@@ -9,3 +24,54 @@ def hash_password(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return context.verify(plain_password, hashed_password)
+
+
+# Pool de processos dedicado ao Argon2, para que rajadas de login não ocupem o
+# event loop nem o threadpool das demais rotas. O número de tarefas pendentes
+# é limitado: acima dele a requisição recebe 503 com Retry-After.
+_executor = None
+_pendentes = 0
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _executar(operacao: str, fn, *args):
+    global _pendentes
+    if _pendentes >= settings.PASSWORD_HASH_MAX_PENDING:
+        HASH_SENHA_REJEITADOS.labels(operacao).inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente em instantes.",
+            headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER)},
+        )
+    _pendentes += 1
+    inicio = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), fn, *args)
+    finally:
+        _pendentes -= 1
+        HASH_SENHA.labels(operacao).observe(time.perf_counter() - inicio)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _executar("hash", hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _executar("verify", verify_password, plain_password, hashed_password)
@@ -1,20 +1,45 @@
+import time
+from dataclasses import dataclass
+
 from fastapi import Depends, HTTPException, status, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from .jwt_handler import decode_token
-from db.session import SessionLocal
+from core.cache import LRUCache
+from core.config import settings
+from db.session import get_db_leitura
 from models.user import User
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+oauth2_scheme = HTTPBearer(auto_error=False)
 
+# Tokens já verificados (token -> payload) e usuários já carregados (sub ->
+# usuário), para não decodificar o JWT nem consultar o banco a cada requisição.
+_tokens_verificados = LRUCache(settings.AUTH_CACHE_MAXSIZE, settings.AUTH_CACHE_TTL)
+_usuarios = LRUCache(settings.AUTH_CACHE_MAXSIZE, settings.AUTH_CACHE_TTL)
+
+
+@dataclass(frozen=True)
+class UsuarioAutenticado:
+    id: int
+    username: str
 
-oauth2_scheme = HTTPBearer(auto_error=False)
+
+def invalidar_usuario(user_id: int):
+    _usuarios.delete(str(user_id))
+
+
+def _payload_verificado(token: str) -> dict:
+    payload = _tokens_verificados.get(token)
+    if payload is None:
+        payload = decode_token(token)
+        # Nunca guarda o token além da sua própria expiração.
+        restante = payload.get("exp", 0) - time.time()
+        if restante > 0:
+            _tokens_verificados.set(
+                token, payload, min(settings.AUTH_CACHE_TTL, restante)
+            )
+    return payload
 
 
 def token_extractor(
@@ -29,10 +54,10 @@ def token_extractor(
     return security_data.credentials
 
 
-def get_current_user(
-    token: str = Depends(token_extractor), db: Session = Depends(get_db)
-) -> User:
-    payload = decode_token(token)
+async def get_current_user(
+    token: str = Depends(token_extractor), db: AsyncSession = Depends(get_db_leitura)
+) -> UsuarioAutenticado:
+    payload = _payload_verificado(token)
 
     user_id = payload.get("sub")
     if user_id is None:
@@ -42,7 +67,15 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    # Modo stateless: o access token assinado já traz os claims necessários.
+    if settings.AUTH_STATELESS and payload.get("username"):
+        return UsuarioAutenticado(id=int(user_id), username=payload["username"])
+
+    usuario = _usuarios.get(user_id)
+    if usuario is not None:
+        return usuario
+
+    user = await db.get(User, int(user_id))
 
     if user is None:
         raise HTTPException(
@@ -51,4 +84,6 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    return user
+    usuario = UsuarioAutenticado(id=user.id, username=user.username)
+    _usuarios.set(user_id, usuario)
+    return usuario
@@ -3,7 +3,7 @@ from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
 from fastapi import HTTPException, status
 from fastapi.security import HTTPBearer
-from typing import Dict
+from typing import Dict, Optional
 
 bearer_scheme = HTTPBearer()
 
@@ -30,10 +30,14 @@ def create_token(data: dict, token_type: str) -> str:
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def create_access_and_refresh_tokens(user_id: int) -> Dict[str, str]:
+def create_access_and_refresh_tokens(
+    user_id: int, username: Optional[str] = None
+) -> Dict[str, str]:
     data = {"sub": str(user_id)}
 
-    access_token = create_token(data, "access")
+    # O access token carrega o username para autenticar sem consultar o banco.
+    access_data = {**data, "username": username} if username else data
+    access_token = create_token(access_data, "access")
     refresh_token = create_token(data, "refresh")
 
     return {"access_token": access_token, "refresh_token": refresh_token}
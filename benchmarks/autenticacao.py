@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+
+from benchmarks import comum
+
+# Vazão de requisições autenticadas com a consulta do usuário a cada requisição
+# (AUTH_STATELESS=false, AUTH_CACHE_TTL=0) e com o caminho stateless + cache de
+# tokens (padrão), cada modo num subprocesso. Mede GET /user/me (só a
+# autenticação) e PUT de praias criadas pelo próprio benchmark. No modo
+# "banco" cada PUT segura duas conexões (a da rota e a da consulta do usuário):
+# com concorrência acima da metade do pool (5 + 10) as requisições esgotam o
+# pool e estouram o timeout.
+#   python -m benchmarks.autenticacao --total 3000 --concorrencia 6
+comum.padroes(CACHE_BACKEND="off", TIMING_SAMPLE_RATE=0)
+
+MODOS = {
+    "banco": {"AUTH_STATELESS": "false", "AUTH_CACHE_TTL": "0"},
+    "stateless": {"AUTH_STATELESS": "true", "AUTH_CACHE_TTL": "60"},
+}
+
+
+def _praia(i: int) -> dict:
+    return {
+        "nome": f"Bench auth {i}",
+        "estado": "CE",
+        "municipio": "Fortaleza",
+        "latitude": -3.7,
+        "longitude": -38.5,
+        "rating": 4.0,
+    }
+
+
+async def medir(total: int, concorrencia: int) -> dict:
+    async with comum.cliente() as c:
+        headers = await comum.autenticar(c)
+
+        async def leitura(i):
+            return await c.get("/user/me", headers=headers)
+
+        # Uma praia por trabalhador, para os PUTs não disputarem a mesma linha.
+        ids = []
+        for i in range(concorrencia):
+            resposta = await c.post("/api/v1/praia/", json=_praia(i), headers=headers)
+            resposta.raise_for_status()
+            ids.append(resposta.json()["id"])
+
+        async def escrita(i):
+            praia = {**_praia(i), "rating": round(i % 50 / 10, 1)}
+            url = f"/api/v1/praia/{ids[i % len(ids)]}"
+            return await c.put(url, json=praia, headers=headers)
+
+        resultado = {"me": await comum.carga(leitura, total, concorrencia)}
+        resultado["put"] = await comum.carga(escrita, total, concorrencia)
+        for praia_id in ids:
+            await c.delete(f"/api/v1/praia/{praia_id}", headers=headers)
+        return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Vazão autenticada: banco x stateless."
+    )
+    parser.add_argument("--modo", choices=MODOS)
+    parser.add_argument("--total", type=int, default=3000)
+    parser.add_argument("--concorrencia", type=int, default=6)
+    args = parser.parse_args()
+    if args.modo:
+        comum.publicar(asyncio.run(medir(args.total, args.concorrencia)))
+        return
+
+    argumentos = ["--total", str(args.total), "--concorrencia", str(args.concorrencia)]
+    resultados = comum.executar_modos("benchmarks.autenticacao", MODOS, argumentos)
+    comum.tabela(
+        ["modo", "rota", "req/s", "p50 (ms)", "p99 (ms)"],
+        [
+            [modo, rota, r["req_s"], r["p50_ms"], r["p99_ms"]]
+            for modo, rotas in resultados.items()
+            for rota, r in rotas.items()
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
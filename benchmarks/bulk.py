@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from benchmarks import comum
+
+# Linhas/s inseridas pelo POST unitário e pelo POST /bulk, para praias e
+# quiosques. Insere linhas de verdade no banco configurado.
+#   python -m benchmarks.bulk --linhas 2000 --lote 1000
+comum.padroes(CACHE_BACKEND="off", TIMING_SAMPLE_RATE=0)
+
+
+def _praias(n: int, rng) -> list:
+    prefixo = "Bench " + uuid.uuid4().hex[:8]
+    return [
+        {
+            "nome": f"{prefixo} {i}",
+            "estado": "CE",
+            "municipio": "Fortaleza",
+            "latitude": round(rng.uniform(-3.9, -3.6), 6),
+            "longitude": round(rng.uniform(-38.7, -38.3), 6),
+            "rating": round(rng.uniform(0, 5), 1),
+        }
+        for i in range(n)
+    ]
+
+
+def _quiosques(n: int, praia_ids: list, rng) -> list:
+    return [
+        {
+            "nome": f"Bench {i}",
+            "praia_id": rng.choice(praia_ids),
+            "latitude": round(rng.uniform(-3.9, -3.6), 6),
+            "longitude": round(rng.uniform(-38.7, -38.3), 6),
+            "valor": rng.randint(1, 5),
+        }
+        for i in range(n)
+    ]
+
+
+async def _unitario(c, url: str, itens: list, headers: dict):
+    ids = []
+    inicio = time.perf_counter()
+    for item in itens:
+        resposta = await c.post(url, json=item, headers=headers)
+        resposta.raise_for_status()
+        ids.append(resposta.json()["id"])
+    return ids, len(itens) / (time.perf_counter() - inicio)
+
+
+async def _em_lote(c, url: str, itens: list, lote: int, headers: dict):
+    ids = []
+    inicio = time.perf_counter()
+    for i in range(0, len(itens), lote):
+        resposta = await c.post(url + "bulk", json=itens[i : i + lote], headers=headers)
+        resposta.raise_for_status()
+        ids += [r["id"] for r in resposta.json()["resultados"]]
+    return ids, len(itens) / (time.perf_counter() - inicio)
+
+
+async def medir(linhas: int, lote: int):
+    rng = random.Random(7)
+    async with comum.cliente() as c:
+        headers = await comum.autenticar(c)
+        resultado = []
+        url = "/api/v1/praia/"
+        ids, unitario = await _unitario(c, url, _praias(linhas, rng), headers)
+        _, em_lote = await _em_lote(c, url, _praias(linhas, rng), lote, headers)
+        resultado.append(["praias", round(unitario), round(em_lote)])
+
+        url = "/api/v1/quiosque/"
+        _, unitario = await _unitario(c, url, _quiosques(linhas, ids, rng), headers)
+        _, em_lote = await _em_lote(c, url, _quiosques(linhas, ids, rng), lote, headers)
+        resultado.append(["quiosques", round(unitario), round(em_lote)])
+    comum.tabela(["tabela", "unitário (linhas/s)", "bulk (linhas/s)"], resultado)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Linhas/s: POST unitário x bulk.")
+    parser.add_argument("--linhas", type=int, default=2000)
+    parser.add_argument("--lote", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(medir(args.linhas, args.lote))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import random
+
+from benchmarks import comum
+
+# Latência (p50/p95/p99) das listagens filtradas em alta concorrência, pelo SQL
+# e pelo snapshot colunar (CATALOG_SNAPSHOT), cada modo num subprocesso. Com
+# --escrita-a-cada N, uma em cada N requisições é um PUT, que força a
+# reconstrução do snapshot enquanto as leituras continuam chegando.
+#   python -m benchmarks.catalogo --total 3000 --concorrencia 32
+comum.padroes(CACHE_BACKEND="off", TIMING_SAMPLE_RATE=0, LIST_FAST_PATH="true")
+
+MODOS = {"sql": {"CATALOG_SNAPSHOT": "false"}, "snapshot": {"CATALOG_SNAPSHOT": "true"}}
+ESTADOS = ["BA", "CE", "PE", "RJ", "SC", "SP"]
+PRAIA = {
+    "nome": "Bench catálogo",
+    "estado": "CE",
+    "municipio": "Fortaleza",
+    "latitude": -3.7,
+    "longitude": -38.5,
+}
+
+
+def _params(rng) -> tuple:
+    if rng.random() < 0.5:
+        params = {"estado": rng.choice(ESTADOS), "min_rating": rng.choice([2, 4])}
+        return "/api/v1/praia/", {**params, "limit": 50, "skip": rng.randrange(20)}
+    params = {"estado": rng.choice(ESTADOS), "max_valor": rng.choice([2, 4])}
+    return "/api/v1/quiosque/", {**params, "limit": 50, "skip": rng.randrange(20)}
+
+
+async def medir(total: int, concorrencia: int, escrita_a_cada: int) -> dict:
+    rng = random.Random(42)
+    async with comum.cliente() as c:
+        url_praia = None
+        if escrita_a_cada:
+            headers = await comum.autenticar(c)
+            resposta = await c.post("/api/v1/praia/", json=PRAIA, headers=headers)
+            resposta.raise_for_status()
+            url_praia = f"/api/v1/praia/{resposta.json()['id']}"
+
+        # Aquecimento: a primeira leitura depois do POST reconstrói o snapshot.
+        for url in ["/api/v1/praia/", "/api/v1/quiosque/"]:
+            (await c.get(url, params={"limit": 1})).raise_for_status()
+
+        async def requisicao(i):
+            if escrita_a_cada and i % escrita_a_cada == escrita_a_cada - 1:
+                praia = {**PRAIA, "rating": round(rng.uniform(0, 5), 1)}
+                return await c.put(url_praia, json=praia, headers=headers)
+            url, params = _params(rng)
+            return await c.get(url, params=params)
+
+        try:
+            return await comum.carga(requisicao, total, concorrencia)
+        finally:
+            if url_praia:
+                await c.delete(url_praia, headers=headers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Listagens: SQL x snapshot.")
+    parser.add_argument("--modo", choices=MODOS)
+    parser.add_argument("--total", type=int, default=3000)
+    parser.add_argument("--concorrencia", type=int, default=32)
+    parser.add_argument("--escrita-a-cada", type=int, default=0)
+    args = parser.parse_args()
+    if args.modo:
+        resultado = medir(args.total, args.concorrencia, args.escrita_a_cada)
+        comum.publicar(asyncio.run(resultado))
+        return
+
+    argumentos = [
+        "--total",
+        str(args.total),
+        "--concorrencia",
+        str(args.concorrencia),
+        "--escrita-a-cada",
+        str(args.escrita_a_cada),
+    ]
+    resultados = comum.executar_modos("benchmarks.catalogo", MODOS, argumentos)
+    comum.tabela(
+        ["modo", "req/s", "p50 (ms)", "p95 (ms)", "p99 (ms)"],
+        [
+            [modo, r["req_s"], r["p50_ms"], r["p95_ms"], r["p99_ms"]]
+            for modo, r in resultados.items()
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
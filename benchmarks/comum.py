@@ -0,0 +1,110 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+# Utilitários dos benchmarks. A aplicação roda no próprio processo (ASGI, sem
+# rede) contra o banco de DATABASE_URL; use um banco descartável, populado com
+#   python -m seeds.sintetico --praias 100000 --quiosques 1000000
+# As configurações de cada cenário precisam estar no ambiente antes do import
+# de core.config, por isso cenários diferentes rodam em subprocessos
+# (executar_modos).
+
+MARCADOR = "RESULTADO "
+
+
+def padroes(**variaveis):
+    for nome, valor in variaveis.items():
+        os.environ.setdefault(nome, str(valor))
+
+
+@asynccontextmanager
+async def cliente():
+    import httpx
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transporte, base_url="http://bench", timeout=None
+        ) as c:
+            yield c
+
+
+async def autenticar(c) -> dict:
+    credenciais = {"username": "bench_" + uuid.uuid4().hex[:8], "password": "bench"}
+    (await c.post("/user/register", json=credenciais)).raise_for_status()
+    resposta = await c.post("/user/login", json=credenciais)
+    resposta.raise_for_status()
+    return {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+
+def percentis(amostras: list) -> dict:
+    ordenadas = sorted(amostras)
+
+    def percentil(q):
+        return round(ordenadas[min(len(ordenadas) - 1, int(q * len(ordenadas)))], 2)
+
+    return {
+        "p50_ms": percentil(0.50),
+        "p95_ms": percentil(0.95),
+        "p99_ms": percentil(0.99),
+    }
+
+
+async def cronometrar(requisicao) -> float:
+    inicio = time.perf_counter()
+    resposta = await requisicao()
+    resposta.raise_for_status()
+    return (time.perf_counter() - inicio) * 1000
+
+
+# Dispara `total` chamadas de requisicao(i), com no máximo `concorrencia` em voo.
+async def carga(requisicao, total: int, concorrencia: int) -> dict:
+    latencias = []
+    indices = iter(range(total))
+
+    async def trabalhador():
+        for i in indices:
+            latencias.append(await cronometrar(lambda: requisicao(i)))
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*[trabalhador() for _ in range(concorrencia)])
+    duracao = time.perf_counter() - inicio
+    return {"req_s": round(total / duracao, 1), **percentis(latencias)}
+
+
+def publicar(resultado):
+    print(MARCADOR + json.dumps(resultado), flush=True)
+
+
+# Roda `python -m <modulo> --modo <nome> <argumentos>` com as variáveis de cada
+# modo e devolve o que cada subprocesso publicou.
+def executar_modos(modulo: str, modos: dict, argumentos=()) -> dict:
+    resultados = {}
+    for nome, variaveis in modos.items():
+        saida = subprocess.run(
+            [sys.executable, "-m", modulo, "--modo", nome, *argumentos],
+            env={**os.environ, **variaveis},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        linhas = [l for l in saida.splitlines() if l.startswith(MARCADOR)]
+        resultados[nome] = json.loads(linhas[-1][len(MARCADOR) :])
+    return resultados
+
+
+def tabela(cabecalho: list, linhas: list):
+    linhas = [[str(valor) for valor in linha] for linha in [cabecalho, *linhas]]
+    larguras = [max(len(linha[i]) for linha in linhas) for i in range(len(cabecalho))]
+    for numero, linha in enumerate(linhas):
+        print(
+            "  ".join(valor.rjust(largura) for valor, largura in zip(linha, larguras))
+        )
+        if numero == 0:
+            print("  ".join("-" * largura for largura in larguras))
@@ -0,0 +1,67 @@
+import argparse
+import asyncio
+import statistics
+
+from benchmarks import comum
+
+# Latência da página N da listagem de praias, paginando por offset (skip) e
+# por cursor. Com o cursor a latência fica estável; com offset cresce com N.
+#   python -m benchmarks.paginacao --paginas 1,10,100,1000 --limit 50
+comum.padroes(CACHE_BACKEND="off", TIMING_SAMPLE_RATE=0)
+
+URL = "/api/v1/praia/"
+
+
+async def _mediana(c, params: dict, repeticoes: int) -> float:
+    amostras = [
+        await comum.cronometrar(lambda: c.get(URL, params=params))
+        for _ in range(repeticoes)
+    ]
+    return round(statistics.median(amostras), 2)
+
+
+async def medir(paginas: list, limit: int, repeticoes: int, filtros: dict):
+    linhas = []
+    async with comum.cliente() as c:
+        # Percorre as páginas pelo cursor para obter o cursor de cada página N.
+        cursores = {1: {}}
+        cursor = None
+        for pagina in range(1, max(paginas)):
+            params = {**filtros, "limit": limit, **cursores[pagina]}
+            resposta = await c.get(URL, params=params)
+            resposta.raise_for_status()
+            cursor = resposta.json()["next_cursor"]
+            if cursor is None:
+                break
+            cursores[pagina + 1] = {"cursor": cursor}
+
+        for pagina in paginas:
+            if pagina not in cursores:
+                print(f"o catálogo acaba antes da página {pagina}")
+                break
+            offset = {**filtros, "limit": limit, "skip": (pagina - 1) * limit}
+            por_cursor = {**filtros, "limit": limit, **cursores[pagina]}
+            linhas.append(
+                [
+                    pagina,
+                    await _mediana(c, offset, repeticoes),
+                    await _mediana(c, por_cursor, repeticoes),
+                ]
+            )
+    comum.tabela(["página", "offset (ms)", "cursor (ms)"], linhas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Página N: offset x cursor.")
+    parser.add_argument("--paginas", default="1,10,100,1000")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--estado", default=None)
+    args = parser.parse_args()
+    paginas = sorted(int(p) for p in args.paginas.split(","))
+    filtros = {"estado": args.estado} if args.estado else {}
+    asyncio.run(medir(paginas, args.limit, args.repeticoes, filtros))
+
+
+if __name__ == "__main__":
+    main()
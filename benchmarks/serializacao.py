@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks import comum
+
+# Linhas/s serializadas na listagem de praias (praias + quiosques embutidos)
+# pelo caminho ORM + pydantic (PraiaList) e pelo caminho rápido (Core + orjson),
+# com e sem a consulta. Sem HTTP: chama direto o que a rota chama.
+#   python -m benchmarks.serializacao --limits 50,500 --repeticoes 20
+comum.padroes(CACHE_BACKEND="off", TIMING_SAMPLE_RATE=0)
+
+
+async def _orm(db, limit: int):
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+
+    from api.v1.pagination import next_cursor
+    from db.base import Praia
+    from schemas.praia import PraiaList
+
+    query = select(Praia).options(selectinload(Praia.quiosques)).order_by(Praia.id)
+    praias = (await db.execute(query.limit(limit))).scalars().all()
+    inicio = time.perf_counter()
+    dados = PraiaList.model_validate(
+        {"praias": praias, "next_cursor": next_cursor(praias, limit)},
+        from_attributes=True,
+    ).model_dump(mode="json")
+    # Codificação da JSONResponse padrão do FastAPI.
+    json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode()
+    return dados, time.perf_counter() - inicio
+
+
+async def _rapido(db, limit: int):
+    import orjson
+
+    from api.v1 import listagem_rapida
+    from db.base import Praia
+
+    query = listagem_rapida.select_praias().order_by(Praia.id).limit(limit)
+    dados = await listagem_rapida.listar_praias(db, query, limit)
+    inicio = time.perf_counter()
+    orjson.dumps(dados)
+    return dados, time.perf_counter() - inicio
+
+
+def _linhas(dados: dict) -> int:
+    return sum(1 + len(praia["quiosques"]) for praia in dados["praias"])
+
+
+async def medir(limits: list, repeticoes: int):
+    from db.session import session_scope
+
+    # Uma sessão por execução: o ORM não reaproveita o identity map.
+    async def executar(caminho, limit: int):
+        async with session_scope(leitura=True) as db:
+            return await caminho(db, limit)
+
+    resultado = []
+    for limit in limits:
+        for nome, caminho in [("orm", _orm), ("rápido", _rapido)]:
+            await executar(caminho, limit)  # aquecimento
+            linhas = total = serializacao = 0
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                dados, segundos = await executar(caminho, limit)
+                total += time.perf_counter() - inicio
+                serializacao += segundos
+                linhas += _linhas(dados)
+            resultado.append(
+                [limit, nome, round(linhas / total), round(linhas / serializacao)]
+            )
+    comum.tabela(
+        ["limit", "caminho", "linhas/s (consulta + json)", "linhas/s (só json)"],
+        resultado,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Linhas/s: ORM + pydantic x Core.")
+    parser.add_argument("--limits", default="50,500")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+    limits = [int(limit) for limit in args.limits.split(",")]
+    asyncio.run(medir(limits, args.repeticoes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import asyncio
+import random
+
+from benchmarks import comum
+
+# Carga de leitura com a sessão síncrona no threadpool (DB_ASYNC=false) e com o
+# engine assíncrono (DB_ASYNC=true), cada modo num subprocesso:
+#   python -m benchmarks.sync_async --total 3000 --concorrencia 64
+comum.padroes(CACHE_BACKEND="off", TIMING_SAMPLE_RATE=0)
+
+MODOS = {"sync": {"DB_ASYNC": "false"}, "async": {"DB_ASYNC": "true"}}
+ESTADOS = ["BA", "CE", "PE", "RJ", "SC", "SP"]
+
+
+async def medir(total: int, concorrencia: int) -> dict:
+    rng = random.Random(42)
+    async with comum.cliente() as c:
+        resposta = await c.get("/api/v1/praia/", params={"limit": 500})
+        resposta.raise_for_status()
+        ids = [praia["id"] for praia in resposta.json()["praias"]]
+
+        # Metade por id, metade listagens filtradas de 20 praias.
+        async def requisicao(i):
+            if i % 2:
+                return await c.get(f"/api/v1/praia/{rng.choice(ids)}")
+            params = {"estado": rng.choice(ESTADOS), "limit": 20}
+            return await c.get("/api/v1/praia/", params=params)
+
+        return await comum.carga(requisicao, total, concorrencia)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga: sessão sync x async.")
+    parser.add_argument("--modo", choices=MODOS)
+    parser.add_argument("--total", type=int, default=3000)
+    parser.add_argument("--concorrencia", type=int, default=64)
+    args = parser.parse_args()
+    if args.modo:
+        comum.publicar(asyncio.run(medir(args.total, args.concorrencia)))
+        return
+
+    argumentos = ["--total", str(args.total), "--concorrencia", str(args.concorrencia)]
+    resultados = comum.executar_modos("benchmarks.sync_async", MODOS, argumentos)
+    comum.tabela(
+        ["modo", "req/s", "p50 (ms)", "p95 (ms)", "p99 (ms)"],
+        [
+            [modo, r["req_s"], r["p50_ms"], r["p95_ms"], r["p99_ms"]]
+            for modo, r in resultados.items()
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
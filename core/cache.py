@@ -0,0 +1,184 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from core.config import settings
+
+
+# LRU em memória com TTL por entrada e limite de tamanho (thread-safe).
+class LRUCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expira_em = item
+            if expira_em < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        expira_em = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expira_em)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Versões por tabela no processo. Ficam fora do LRU para nunca serem
+# despejadas e começam no instante de criação para não repetir valores (e
+# ETags) após um restart.
+class _VersoesEmMemoria:
+    def __init__(self):
+        self.versoes = {}
+        self._inicio = time.time_ns()
+
+    async def get_version(self, tabela: str) -> int:
+        return self.versoes.get(tabela, self._inicio)
+
+    async def incr_version(self, tabela: str) -> int:
+        self.versoes[tabela] = self.versoes.get(tabela, self._inicio) + 1
+        return self.versoes[tabela]
+
+
+class MemoryBackend(_VersoesEmMemoria):
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__()
+        self.lru = LRUCache(maxsize, ttl)
+
+    async def get(self, key):
+        return self.lru.get(key)
+
+    async def set(self, key, value, ttl: float = None):
+        self.lru.set(key, value, ttl)
+
+    async def delete(self, *keys):
+        self.lru.delete(*keys)
+
+
+# Aceita qualquer cliente compatível com redis.asyncio (ex.: fakeredis.aioredis).
+class RedisBackend:
+    def __init__(self, client, ttl: float):
+        self.client = client
+        self.ttl = ttl
+
+    async def get(self, key):
+        raw = await self.client.get(key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key, value, ttl: float = None):
+        await self.client.set(key, json.dumps(value), ex=int(ttl or self.ttl))
+
+    async def delete(self, *keys):
+        if keys:
+            await self.client.delete(*keys)
+
+    async def get_version(self, tabela: str) -> int:
+        return int(await self.client.get(f"versao:{tabela}") or 0)
+
+    async def incr_version(self, tabela: str) -> int:
+        return int(await self.client.incr(f"versao:{tabela}"))
+
+
+class NullBackend(_VersoesEmMemoria):
+    async def get(self, key):
+        return None
+
+    async def set(self, key, value, ttl: float = None):
+        pass
+
+    async def delete(self, *keys):
+        pass
+
+
+# Fachada usada pelas rotas: delega ao backend e conta hits/misses por
+# namespace (o prefixo da chave antes do primeiro ":").
+class Cache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.contadores = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+    async def get(self, key):
+        value = await self.backend.get(key)
+        namespace = key.split(":", 1)[0]
+        self.contadores[namespace]["hits" if value is not None else "misses"] += 1
+        return value
+
+    async def set(self, key, value, ttl: float = None):
+        await self.backend.set(key, value, ttl)
+
+    async def delete(self, *keys):
+        await self.backend.delete(*keys)
+
+    # Versão por tabela: toda escrita incrementa, e as chaves das listagens
+    # incluem a versão, então páginas antigas nunca são servidas.
+    async def versao(self, tabela: str) -> int:
+        return await self.backend.get_version(tabela)
+
+    async def incrementar_versao(self, *tabelas: str):
+        for tabela in tabelas:
+            await self.backend.incr_version(tabela)
+
+    def estatisticas(self) -> dict:
+        stats = {}
+        for namespace, contagem in self.contadores.items():
+            total = contagem["hits"] + contagem["misses"]
+            stats[namespace] = {
+                **contagem,
+                "hit_ratio": round(contagem["hits"] / total, 4) if total else 0.0,
+            }
+        return stats
+
+
+def _criar_backend():
+    if settings.CACHE_BACKEND == "redis":
+        import redis.asyncio as redis
+
+        return RedisBackend(redis.from_url(settings.REDIS_URL), settings.CACHE_TTL)
+    if settings.CACHE_BACKEND == "off":
+        return NullBackend()
+    return MemoryBackend(settings.CACHE_MAXSIZE, settings.CACHE_TTL)
+
+
+cache = Cache(_criar_backend())
+
+
+def praia_key(praia_id: int) -> str:
+    return f"praia:{praia_id}"
+
+
+def quiosque_key(quiosque_id: int) -> str:
+    return f"quiosque:{quiosque_id}"
+
+
+def tile_key(z: int, x: int, y: int) -> str:
+    return f"tile:{z}:{x}:{y}"
+
+
+def list_key(namespace: str, versao: int, params: dict) -> str:
+    normalizados = {k: v for k, v in sorted(params.items()) if v is not None}
+    raw = json.dumps(normalizados, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{namespace}:{versao}:{hashlib.sha1(raw.encode()).hexdigest()}"
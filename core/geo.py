@@ -0,0 +1,114 @@
+import math
+
+RAIO_TERRA_KM = 6371.0088
+# Comprimento de um grau de meridiano na mesma esfera do haversine_km.
+KM_POR_GRAU = RAIO_TERRA_KM * math.pi / 180
+GEOHASH_PRECISAO = 9
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(latitude, longitude, precisao: int = GEOHASH_PRECISAO) -> str:
+    lat_min, lat_max = -90.0, 90.0
+    lon_min, lon_max = -180.0, 180.0
+    latitude, longitude = float(latitude), float(longitude)
+    chars = []
+    bit, ch, par = 0, 0, True
+    while len(chars) < precisao:
+        if par:
+            meio = (lon_min + lon_max) / 2
+            if longitude >= meio:
+                ch = (ch << 1) | 1
+                lon_min = meio
+            else:
+                ch <<= 1
+                lon_max = meio
+        else:
+            meio = (lat_min + lat_max) / 2
+            if latitude >= meio:
+                ch = (ch << 1) | 1
+                lat_min = meio
+            else:
+                ch <<= 1
+                lat_max = meio
+        par = not par
+        bit += 1
+        if bit == 5:
+            chars.append(_BASE32[ch])
+            bit, ch = 0, 0
+    return "".join(chars)
+
+
+def _tamanho_celula(precisao: int):
+    # Altura e largura (em graus) de uma célula geohash da precisão dada.
+    bits = precisao * 5
+    bits_lon = (bits + 1) // 2
+    bits_lat = bits // 2
+    return 180.0 / (1 << bits_lat), 360.0 / (1 << bits_lon)
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, map(float, (lat1, lon1, lat2, lon2)))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * RAIO_TERRA_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+def _normalizar_longitude(longitude: float) -> float:
+    return (longitude + 180.0) % 360.0 - 180.0
+
+
+# Prefixos geohash cujas células cobrem o círculo (lat, lon, raio). Escolhe a
+# maior precisão em que uma célula é pelo menos tão grande quanto o raio; assim o
+# círculo cabe nas células atingidas pelos 9 pontos (centro e extremos do
+# bounding box), e cada prefixo vira um range no índice B-tree.
+def geohash_cobertura(latitude: float, longitude: float, raio_km: float) -> list:
+    dlat = raio_km / KM_POR_GRAU
+    cos_lat = math.cos(math.radians(min(90.0, abs(latitude) + dlat)))
+    dlon = 180.0 if cos_lat < 1e-6 else min(180.0, raio_km / (KM_POR_GRAU * cos_lat))
+
+    precisao = 0
+    for p in range(GEOHASH_PRECISAO, 0, -1):
+        altura, largura = _tamanho_celula(p)
+        if altura >= dlat and largura >= dlon:
+            precisao = p
+            break
+
+    prefixos = set()
+    for fator_lat in (-1, 0, 1):
+        lat = max(-90.0, min(90.0, latitude + fator_lat * dlat))
+        for fator_lon in (-1, 0, 1):
+            lon = _normalizar_longitude(longitude + fator_lon * dlon)
+            prefixos.add(geohash_encode(lat, lon, precisao))
+    return sorted(prefixos)
+
+
+# Tiles XYZ (Web Mercator, como nos mapas web). Latitudes além do limite da
+# projeção caem nos tiles da borda.
+LATITUDE_MAX_MERCATOR = 85.05112878
+
+
+def tile_do_ponto(latitude, longitude, z: int):
+    n = 1 << z
+    latitude = max(-LATITUDE_MAX_MERCATOR, min(LATITUDE_MAX_MERCATOR, float(latitude)))
+    x = int((float(longitude) + 180.0) / 360.0 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(latitude))) / math.pi) / 2 * n)
+    return min(n - 1, max(0, x)), min(n - 1, max(0, y))
+
+
+# (oeste, sul, leste, norte) do tile; o tile contém lon em [oeste, leste) e lat
+# em (sul, norte], que é o que tile_do_ponto arredonda para ele.
+def limites_tile(z: int, x: int, y: int):
+    n = 1 << z
+
+    def latitude(linha):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * linha / n))))
+
+    return (
+        x / n * 360.0 - 180.0,
+        latitude(y + 1),
+        (x + 1) / n * 360.0 - 180.0,
+        latitude(y),
+    )
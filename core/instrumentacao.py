@@ -0,0 +1,149 @@
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from core import sql_log
+
+logger = logging.getLogger("api.timing")
+
+
+# Medidas de uma requisição amostrada: consultas SQL e tempos por etapa (ms).
+class MetricasRequisicao:
+    def __init__(self):
+        self.sql_consultas = 0
+        self.tempos = {"db": 0.0, "serializacao": 0.0}
+
+    def adicionar(self, etapa: str, segundos: float):
+        self.tempos[etapa] = self.tempos.get(etapa, 0.0) + segundos * 1000
+
+    def server_timing(self, app_ms: float) -> str:
+        partes = [
+            f'db;dur={self.tempos["db"]:.2f};desc="{self.sql_consultas} consultas"'
+        ]
+        partes += [
+            f"{etapa};dur={ms:.2f}"
+            for etapa, ms in self.tempos.items()
+            if etapa != "db"
+        ]
+        partes.append(f"app;dur={app_ms:.2f}")
+        return ", ".join(partes)
+
+
+# None fora de uma requisição amostrada: os hooks saem sem custo.
+_metricas: ContextVar[Optional[MetricasRequisicao]] = ContextVar(
+    "metricas_requisicao", default=None
+)
+# Scope ASGI da requisição atual, para o log de SQL indicar a rota de origem.
+_scope: ContextVar[Optional[dict]] = ContextVar("scope_requisicao", default=None)
+
+
+def _rota_atual() -> Optional[str]:
+    scope = _scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return getattr(route, "path", scope["path"])
+
+
+@contextmanager
+def cronometro(etapa: str):
+    metricas = _metricas.get()
+    if metricas is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        metricas.adicionar(etapa, time.perf_counter() - inicio)
+
+
+# Registrado na classe Engine: cobre o engine síncrono e o sync_engine do
+# assíncrono. A Session síncrona roda no threadpool, que copia o contexto.
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    if sql_log.ATIVO or _metricas.get() is not None:
+        conn.info.setdefault("inicio_consultas", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("inicio_consultas")
+    if not inicios:
+        return
+    duracao = time.perf_counter() - inicios.pop()
+    metricas = _metricas.get()
+    if metricas is not None:
+        metricas.sql_consultas += 1
+        metricas.adicionar("db", duracao)
+    if sql_log.ATIVO:
+        sql_log.registrar(
+            statement, parameters, executemany, duracao * 1000, _rota_atual()
+        )
+
+
+# Middleware ASGI: amostra uma fração das requisições (TIMING_SAMPLE_RATE),
+# devolve o header Server-Timing e registra uma linha JSON por requisição.
+class InstrumentacaoMiddleware:
+    def __init__(self, app, taxa_amostragem: float = 1.0):
+        self.app = app
+        self.taxa_amostragem = taxa_amostragem
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token_scope = _scope.set(scope)
+        try:
+            await self._instrumentar(scope, receive, send)
+        finally:
+            _scope.reset(token_scope)
+
+    async def _instrumentar(self, scope, receive, send):
+        if random.random() >= self.taxa_amostragem:
+            await self.app(scope, receive, send)
+            return
+
+        metricas = MetricasRequisicao()
+        token = _metricas.set(metricas)
+        inicio = time.perf_counter()
+        resposta = {"status": 500, "app_ms": None}
+
+        async def send_instrumentado(message):
+            if message["type"] == "http.response.start":
+                app_ms = (time.perf_counter() - inicio) * 1000
+                resposta["status"] = message["status"]
+                resposta["app_ms"] = app_ms
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", metricas.server_timing(app_ms))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_instrumentado)
+        finally:
+            _metricas.reset(token)
+            total_ms = (time.perf_counter() - inicio) * 1000
+            logger.info(
+                json.dumps(
+                    {
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": resposta["status"],
+                        "sql_consultas": metricas.sql_consultas,
+                        **{
+                            f"{etapa}_ms": round(ms, 2)
+                            for etapa, ms in metricas.tempos.items()
+                        },
+                        "app_ms": round(resposta["app_ms"] or total_ms, 2),
+                        "total_ms": round(total_ms, 2),
+                    }
+                )
+            )
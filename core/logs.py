@@ -0,0 +1,29 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+_listener = None
+
+
+# Logs da aplicação (namespace "api") no stdout, ao lado dos logs do uvicorn.
+# As rotas só enfileiram o registro; a escrita acontece na thread do
+# QueueListener, então um stdout lento nunca segura uma requisição.
+def configurar_logging(nivel: str = "INFO"):
+    global _listener
+    logger = logging.getLogger("api")
+    if _listener is None:
+        fila = queue.SimpleQueue()
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(levelname)s %(name)s %(message)s"))
+        _listener = QueueListener(fila, handler)
+        _listener.start()
+        logger.addHandler(QueueHandler(fila))
+    logger.setLevel(nivel)
+    logger.propagate = False
+
+
+def encerrar_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,146 @@
+import os
+import time
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Com PROMETHEUS_MULTIPROC_DIR definido, cada worker do uvicorn grava seus
+# valores em arquivos mmap nesse diretório e o /metrics agrega todos. Os gauges
+# usam "livesum" para somar apenas os processos vivos.
+LATENCIA = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota.",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUISICOES = Counter(
+    "http_requests_total",
+    "Requisições HTTP por rota e status.",
+    ["method", "route", "status"],
+)
+EM_ANDAMENTO = Gauge(
+    "http_requests_in_progress",
+    "Requisições HTTP em andamento.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+POOL_EM_USO = Gauge(
+    "db_pool_checked_out",
+    "Conexões do pool em uso.",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Conexões abertas além do pool_size.",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+POOL_ESPERA = Histogram(
+    "db_pool_wait_seconds",
+    "Tempo esperando uma conexão do pool.",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+HASH_SENHA = Histogram(
+    "password_hash_duration_seconds",
+    "Duração do Argon2 (fila do pool de processos incluída).",
+    ["operacao"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+HASH_SENHA_REJEITADOS = Counter(
+    "password_hash_rejected_total",
+    "Operações de hash recusadas com 503 por excesso de pendentes.",
+    ["operacao"],
+)
+
+
+# Pools do SQLAlchemy que medem a espera por conexão e atualizam os gauges a
+# cada checkout/checkin, com um rótulo por engine (primário e cada réplica).
+class _PoolInstrumentado:
+    rotulo = "sync"
+
+    # Subclasse com o rótulo da engine; o pool recriado (dispose) mantém a classe.
+    @classmethod
+    def rotulado(cls, rotulo: str):
+        return type(cls.__name__, (cls,), {"rotulo": rotulo})
+
+    def _atualizar_gauges(self):
+        POOL_EM_USO.labels(self.rotulo).set(self.checkedout())
+        POOL_OVERFLOW.labels(self.rotulo).set(max(0, self.overflow()))
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_ESPERA.labels(self.rotulo).observe(time.perf_counter() - inicio)
+            self._atualizar_gauges()
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._atualizar_gauges()
+
+
+class QueuePoolInstrumentado(_PoolInstrumentado, QueuePool):
+    rotulo = "sync"
+
+
+class AsyncQueuePoolInstrumentado(_PoolInstrumentado, AsyncAdaptedQueuePool):
+    rotulo = "async"
+
+
+# Middleware ASGI: a rota é o template (ex.: /api/v1/praia/{praia_id}), que o
+# FastAPI deixa em scope["route"], para não explodir a cardinalidade.
+class MetricasMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metodo = scope["method"]
+        status = {"codigo": 500}
+
+        async def send_com_status(message):
+            if message["type"] == "http.response.start":
+                status["codigo"] = message["status"]
+            await send(message)
+
+        em_andamento = EM_ANDAMENTO.labels(metodo)
+        em_andamento.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_com_status)
+        finally:
+            em_andamento.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", "nao_encontrada")
+            LATENCIA.labels(metodo, template).observe(time.perf_counter() - inicio)
+            REQUISICOES.labels(metodo, template, status["codigo"]).inc()
+
+
+def gerar_metricas() -> bytes:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+# No modo multiprocesso remove os gauges "live" do worker que está saindo.
+def encerrar_processo():
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,53 @@
+import itertools
+import json
+import logging
+import re
+
+from core.config import settings
+
+logger = logging.getLogger("api.sql")
+
+# Modos: "off", "sampled" (1 a cada SQL_LOG_SAMPLE_EVERY) ou "slow" (apenas
+# acima de SQL_SLOW_MS).
+MODO = settings.SQL_LOG_MODE
+ATIVO = MODO in ("sampled", "slow")
+
+_contador = itertools.count()
+_espacos = re.compile(r"\s+")
+# Listas de binds (IN expandido, VALUES do bulk) viram "(...)" para que
+# consultas iguais com tamanhos diferentes se agrupem.
+_bind = r"(?:%\(\w+\)s|\$\d+|\?)(?:::\w+)?"
+_lista_binds = re.compile(rf"\({_bind}(?:, ?{_bind})+\)")
+
+
+def normalizar(statement: str) -> str:
+    return _lista_binds.sub("(...)", _espacos.sub(" ", statement).strip())
+
+
+def _deve_registrar(duracao_ms: float) -> bool:
+    if MODO == "slow":
+        return duracao_ms >= settings.SQL_SLOW_MS
+    return next(_contador) % max(1, settings.SQL_LOG_SAMPLE_EVERY) == 0
+
+
+def _contar_binds(parameters, executemany: bool) -> int:
+    if not parameters:
+        return 0
+    if executemany:
+        return sum(len(p) for p in parameters)
+    return len(parameters)
+
+
+def registrar(statement, parameters, executemany: bool, duracao_ms: float, rota):
+    if not _deve_registrar(duracao_ms):
+        return
+    logger.info(
+        json.dumps(
+            {
+                "statement": normalizar(statement),
+                "binds": _contar_binds(parameters, executemany),
+                "duracao_ms": round(duracao_ms, 2),
+                "route": rota,
+            }
+        )
+    )
@@ -1,3 +1,6 @@
 from db.session import Base
 from models.praia import Praia
 from models.quiosque import Quiosque
+from models.user import User
+from models.exclusao import Exclusao
+from models.estatistica import Estatistica
@@ -0,0 +1,47 @@
+from sqlalchemy import select
+
+from db.session import engine
+from models.estatistica import (
+    CONTADORES_PRAIA,
+    CONTADORES_QUIOSQUE,
+    Estatistica,
+    recalcular,
+)
+
+# Recalcula do zero a tabela de estatísticas e lista os municípios em que o
+# resumo mantido por deltas divergia do recalculado:
+#   python -m db.recalcular_estatisticas
+
+
+def _ler(connection) -> dict:
+    linhas = connection.execute(select(Estatistica)).mappings()
+    return {
+        (linha["estado"], linha["municipio"]): tuple(
+            linha[nome] for nome in CONTADORES_PRAIA + CONTADORES_QUIOSQUE
+        )
+        for linha in linhas
+        if linha["praias"] or linha["quiosques"]
+    }
+
+
+def main():
+    with engine.begin() as connection:
+        antes = _ler(connection)
+        recalcular(connection)
+        depois = _ler(connection)
+
+    divergentes = sorted(
+        chave
+        for chave in antes.keys() | depois.keys()
+        if antes.get(chave) != depois.get(chave)
+    )
+    for estado, municipio in divergentes:
+        print(
+            f"{estado}/{municipio}: {antes.get((estado, municipio))} -> "
+            f"{depois.get((estado, municipio))}"
+        )
+    print(f"{len(depois)} municípios recalculados, {len(divergentes)} divergentes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,211 @@
-from sqlalchemy import create_engine
+import itertools
+from contextlib import asynccontextmanager
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, declarative_base
+from starlette.concurrency import run_in_threadpool
 from core.config import settings
+from core.metricas import AsyncQueuePoolInstrumentado, QueuePoolInstrumentado
 
-engine = create_engine(settings.DATABASE_URL, echo=True, future=True)
+engine = create_engine(
+    settings.DATABASE_URL,
+    future=True,
+    poolclass=QueuePoolInstrumentado.rotulado("sync_primario"),
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Réplicas de leitura (DATABASE_REPLICA_URLS), usadas em rodízio pelas rotas
+# de leitura; sem elas, tudo vai para o primário.
+replica_engines = [
+    create_engine(
+        url,
+        future=True,
+        poolclass=QueuePoolInstrumentado.rotulado(f"sync_replica_{i}"),
+    )
+    for i, url in enumerate(settings.replica_urls)
+]
+ReplicaSessionLocals = [
+    sessionmaker(autocommit=False, autoflush=False, bind=replica)
+    for replica in replica_engines
+]
+
 Base = declarative_base()
+
+async_engine = None
+AsyncSessionLocal = None
+async_replica_engines = []
+AsyncReplicaSessionLocals = []
+
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        settings.async_database_url,
+        future=True,
+        poolclass=AsyncQueuePoolInstrumentado.rotulado("async_primario"),
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+    async_replica_engines = [
+        create_async_engine(
+            url,
+            future=True,
+            poolclass=AsyncQueuePoolInstrumentado.rotulado(f"async_replica_{i}"),
+        )
+        for i, url in enumerate(settings.async_replica_urls)
+    ]
+    AsyncReplicaSessionLocals = [
+        async_sessionmaker(replica, autoflush=False, expire_on_commit=False)
+        for replica in async_replica_engines
+    ]
+
+_rodizio = itertools.count()
+
+
+def _escolher(fabricas, primario):
+    if not fabricas:
+        return primario
+    return fabricas[next(_rodizio) % len(fabricas)]
+
+
+# Expõe uma Session síncrona com a mesma interface aguardável da AsyncSession.
+# Cada operação de I/O roda no threadpool, então as rotas são escritas uma única
+# vez e funcionam nos dois modos (DB_ASYNC ligado ou desligado).
+class ThreadedSession:
+    def __init__(self, session):
+        self.sync_session = session
+
+    @property
+    def info(self) -> dict:
+        return self.sync_session.info
+
+    async def execute(self, statement, params=None, **kwargs):
+        options = {"prebuffer_rows": True, **kwargs.pop("execution_options", {})}
+        return await run_in_threadpool(
+            self.sync_session.execute,
+            statement,
+            params,
+            execution_options=options,
+            **kwargs,
+        )
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(
+            self.sync_session.scalar, statement, params, **kwargs
+        )
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    def expunge(self, instance):
+        self.sync_session.expunge(instance)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance, attribute_names=None):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
+# Sessões de réplica ficam marcadas em info["replica"] (ver da_replica).
+@asynccontextmanager
+async def session_scope(leitura: bool = False):
+    if AsyncSessionLocal is not None:
+        fabrica = AsyncSessionLocal
+        if leitura:
+            fabrica = _escolher(AsyncReplicaSessionLocals, AsyncSessionLocal)
+        async with fabrica() as db:
+            db.info["replica"] = fabrica is not AsyncSessionLocal
+            yield db
+    else:
+        fabrica = (
+            _escolher(ReplicaSessionLocals, SessionLocal) if leitura else SessionLocal
+        )
+        db = ThreadedSession(fabrica(expire_on_commit=False))
+        db.info["replica"] = fabrica is not SessionLocal
+        try:
+            yield db
+        finally:
+            await db.close()
+
+
+# Uma réplica pode estar atrás da versão de cache atual: logo depois de uma
+# escrita ela ainda devolve os dados anteriores. O que sai dela não vai para os
+# caches versionados nem recebe ETag, senão ficaria servido como atual até a
+# próxima escrita.
+def da_replica(db) -> bool:
+    return db.info.get("replica", False)
+
+
+# Para leituras em vários comandos que precisam ver o mesmo estado (as fontes
+# de mudanças por versão): em READ COMMITTED cada comando vê o que foi
+# confirmado até ele, e uma versão confirmada entre dois comandos fica de fora
+# do primeiro mas abaixo do máximo visto pelo segundo. Tem de ser o primeiro
+# comando da transação.
+async def mesmo_snapshot(db):
+    await db.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY"))
+
+
+# Itera o resultado em lotes a partir de um cursor do lado do servidor
+# (yield_per/stream_results), sem carregar a consulta inteira em memória.
+async def stream_scalars(db, statement, tamanho: int):
+    statement = statement.execution_options(yield_per=tamanho)
+    if isinstance(db, ThreadedSession):
+        result = await run_in_threadpool(db.sync_session.execute, statement)
+        particoes = result.scalars().partitions()
+        while True:
+            particao = await run_in_threadpool(next, particoes, None)
+            if particao is None:
+                break
+            yield particao
+    else:
+        result = await db.stream(statement)
+        async for particao in result.scalars().partitions():
+            yield particao
+
+
+# Read-your-writes: depois de uma escrita o cliente recebe este cookie e, até
+# ele expirar (READ_YOUR_WRITES_SECONDS), suas leituras vão para o primário.
+COOKIE_PRIMARIO = "ler_primario"
+
+
+def ler_da_replica(request: Request) -> bool:
+    return bool(settings.replica_urls) and COOKIE_PRIMARIO not in request.cookies
+
+
+async def get_db(request: Request, response: Response):
+    if settings.replica_urls and request.method not in ("GET", "HEAD", "OPTIONS"):
+        response.set_cookie(
+            COOKIE_PRIMARIO,
+            "1",
+            max_age=settings.READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+    async with session_scope() as db:
+        yield db
+
+
+async def get_db_leitura(request: Request):
+    async with session_scope(leitura=ler_da_replica(request)) as db:
+        yield db
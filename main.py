@@ -1,24 +1,55 @@
 import os
 from fastapi import FastAPI
 from core.config import settings
+from core.instrumentacao import InstrumentacaoMiddleware
+from core.metricas import MetricasMiddleware, encerrar_processo
+from core.logs import configurar_logging, encerrar_logging
+from auth.cryptography import shutdown_executor
 from api.v1 import routes_praia
 from api.v1 import routes_quiosque
 from api.v1 import routes_user
-from db.session import Base, engine
+from api.v1 import routes_cache
+from api.v1 import routes_metrics
+from api.v1 import routes_sync
+from api.v1 import routes_search
+from api.v1 import routes_stats
+from api.v1 import routes_tiles
+from api.v1.catalogo import obter_catalogo
 from seeds.praia import seed as praia_seed
 
-Base.metadata.create_all(bind=engine)
+configurar_logging(settings.LOG_LEVEL)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
 )
+app.add_middleware(
+    InstrumentacaoMiddleware, taxa_amostragem=settings.TIMING_SAMPLE_RATE
+)
+app.add_middleware(MetricasMiddleware)
 
 app.include_router(routes_praia.router, prefix="/api/v1/praia", tags=["praias"])
 app.include_router(
     routes_quiosque.router, prefix="/api/v1/quiosque", tags=["quiosques"]
 )
 app.include_router(routes_user.router, prefix="/user", tags=["users"])
+app.include_router(routes_cache.router, prefix="/api/v1/cache", tags=["cache"])
+app.include_router(routes_sync.router, prefix="/api/v1/sync", tags=["sync"])
+app.include_router(routes_search.router, prefix="/api/v1/search", tags=["search"])
+app.include_router(routes_stats.router, prefix="/api/v1/stats", tags=["stats"])
+app.include_router(routes_tiles.router, prefix="/api/v1/tiles", tags=["tiles"])
+app.include_router(routes_metrics.router, tags=["metrics"])
+
+
+async def carregar_catalogo():
+    if settings.CATALOG_SNAPSHOT:
+        await obter_catalogo()
+
+
+app.add_event_handler("startup", carregar_catalogo)
+app.add_event_handler("shutdown", shutdown_executor)
+app.add_event_handler("shutdown", encerrar_processo)
+app.add_event_handler("shutdown", encerrar_logging)
 
 seed_flag = os.getenv("SEED", "False").lower() in ("1", "true", "yes")
 print(seed_flag)
@@ -0,0 +1,66 @@
+"""esquema inicial (praias, quiosques, users)
+
+Corresponde às tabelas criadas antes pelo Base.metadata.create_all. Bancos
+que já existiam devem ser marcados com `alembic stamp 0001` antes do upgrade.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "praias",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("nome", sa.String(), nullable=False),
+        sa.Column("latitude", sa.Numeric(9, 6), nullable=False),
+        sa.Column("longitude", sa.Numeric(9, 6), nullable=False),
+        sa.Column("estado", sa.String(2), nullable=False),
+        sa.Column("municipio", sa.String(), nullable=False),
+        sa.Column("comprimento", sa.Integer()),
+        sa.Column("largura", sa.Integer()),
+        sa.Column("propria_banho", sa.Boolean()),
+        sa.Column("tem_salvavida", sa.Boolean()),
+        sa.Column("rating", sa.Numeric(2, 1)),
+    )
+    op.create_index("ix_praias_id", "praias", ["id"])
+
+    op.create_table(
+        "quiosques",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("nome", sa.String(), nullable=False),
+        sa.Column("descricao", sa.String()),
+        sa.Column("nota", sa.Numeric(2, 1)),
+        sa.Column("tem_acessibilidade", sa.Boolean()),
+        sa.Column("tem_banheiro", sa.Boolean()),
+        sa.Column("valor", sa.Numeric(1, 0)),
+        sa.Column("ocupacao_maxima", sa.Numeric(5, 0)),
+        sa.Column("latitude", sa.Numeric(9, 6), nullable=False),
+        sa.Column("longitude", sa.Numeric(9, 6), nullable=False),
+        sa.Column("praia_id", sa.Integer(), sa.ForeignKey("praias.id")),
+    )
+    op.create_index("ix_quiosques_id", "quiosques", ["id"])
+
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(50), nullable=False, unique=True),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("refresh_token_hash", sa.String(), nullable=True),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+
+
+def downgrade():
+    op.drop_table("users")
+    op.drop_table("quiosques")
+    op.drop_table("praias")
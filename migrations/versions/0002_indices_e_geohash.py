@@ -0,0 +1,83 @@
+"""geohash e índices dos filtros das listagens
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from core.geo import geohash_encode
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+TABELAS_GEOHASH = ("praias", "quiosques")
+
+
+def upgrade():
+    for tabela in TABELAS_GEOHASH:
+        op.add_column(tabela, sa.Column("geohash", sa.String(12, collation="C")))
+
+    # Preenche o geohash das linhas existentes (calculado em Python).
+    conn = op.get_bind()
+    for tabela in TABELAS_GEOHASH:
+        linhas = conn.execute(
+            sa.text(f"SELECT id, latitude, longitude FROM {tabela}")
+        ).all()
+        if linhas:
+            conn.execute(
+                sa.text(f"UPDATE {tabela} SET geohash = :geohash WHERE id = :id"),
+                [
+                    {"id": id_, "geohash": geohash_encode(lat, lon)}
+                    for id_, lat, lon in linhas
+                ],
+            )
+
+    op.create_index("ix_praias_geohash", "praias", ["geohash"])
+    op.create_index("ix_praias_estado_municipio", "praias", ["estado", "municipio"])
+    op.create_index("ix_praias_estado_rating", "praias", ["estado", "rating"])
+    op.create_index("ix_praias_municipio", "praias", ["municipio"])
+    op.create_index("ix_praias_rating", "praias", ["rating"])
+    op.create_index("ix_praias_tem_salvavida", "praias", ["tem_salvavida"])
+    op.create_index("ix_praias_propria_banho", "praias", ["propria_banho"])
+    op.create_index("ix_praias_latitude_longitude", "praias", ["latitude", "longitude"])
+
+    op.create_index("ix_quiosques_geohash", "quiosques", ["geohash"])
+    op.create_index("ix_quiosques_praia_id", "quiosques", ["praia_id"])
+    op.create_index("ix_quiosques_nome", "quiosques", ["nome"])
+    op.create_index("ix_quiosques_nota", "quiosques", ["nota"])
+    op.create_index("ix_quiosques_valor", "quiosques", ["valor"])
+    op.create_index("ix_quiosques_tem_banheiro", "quiosques", ["tem_banheiro"])
+    op.create_index(
+        "ix_quiosques_latitude_longitude", "quiosques", ["latitude", "longitude"]
+    )
+
+
+def downgrade():
+    for indice in (
+        "ix_quiosques_latitude_longitude",
+        "ix_quiosques_tem_banheiro",
+        "ix_quiosques_valor",
+        "ix_quiosques_nota",
+        "ix_quiosques_nome",
+        "ix_quiosques_praia_id",
+        "ix_quiosques_geohash",
+    ):
+        op.drop_index(indice, table_name="quiosques")
+    for indice in (
+        "ix_praias_latitude_longitude",
+        "ix_praias_propria_banho",
+        "ix_praias_tem_salvavida",
+        "ix_praias_rating",
+        "ix_praias_municipio",
+        "ix_praias_estado_rating",
+        "ix_praias_estado_municipio",
+        "ix_praias_geohash",
+    ):
+        op.drop_index(indice, table_name="praias")
+    for tabela in TABELAS_GEOHASH:
+        op.drop_column(tabela, "geohash")
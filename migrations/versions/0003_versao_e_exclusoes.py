@@ -0,0 +1,49 @@
+"""versão de alteração e tombstones para o sync incremental
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+TABELAS_VERSIONADAS = ("praias", "quiosques")
+
+
+def upgrade():
+    op.execute(sa.schema.CreateSequence(sa.Sequence("catalogo_versao_seq")))
+    proxima = sa.text("nextval('catalogo_versao_seq')")
+
+    # O server_default preenche a versão das linhas existentes.
+    for tabela in TABELAS_VERSIONADAS:
+        op.add_column(
+            tabela,
+            sa.Column(
+                "versao", sa.BigInteger(), server_default=proxima, nullable=False
+            ),
+        )
+        op.create_index(f"ix_{tabela}_versao", tabela, ["versao"])
+
+    op.create_table(
+        "exclusoes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("tabela", sa.String(20), nullable=False),
+        sa.Column("registro_id", sa.Integer(), nullable=False),
+        sa.Column("versao", sa.BigInteger(), server_default=proxima, nullable=False),
+    )
+    op.create_index("ix_exclusoes_versao", "exclusoes", ["versao"])
+
+
+def downgrade():
+    op.drop_index("ix_exclusoes_versao", table_name="exclusoes")
+    op.drop_table("exclusoes")
+    for tabela in TABELAS_VERSIONADAS:
+        op.drop_index(f"ix_{tabela}_versao", table_name=tabela)
+        op.drop_column(tabela, "versao")
+    op.execute(sa.schema.DropSequence(sa.Sequence("catalogo_versao_seq")))
@@ -0,0 +1,68 @@
+"""resumo do catálogo por município para o /stats
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+CONTADORES = (
+    ("praias", sa.Integer()),
+    ("praias_com_rating", sa.Integer()),
+    ("soma_rating", sa.Numeric()),
+    ("praias_com_salvavida", sa.Integer()),
+    ("praias_proprias_banho", sa.Integer()),
+    ("quiosques", sa.Integer()),
+    ("quiosques_com_nota", sa.Integer()),
+    ("soma_nota", sa.Numeric()),
+)
+
+
+def upgrade():
+    op.create_table(
+        "estatisticas",
+        sa.Column("estado", sa.String(2), primary_key=True),
+        sa.Column("municipio", sa.String(), primary_key=True),
+        *[
+            sa.Column(nome, tipo, nullable=False, server_default="0")
+            for nome, tipo in CONTADORES
+        ],
+    )
+
+    # Carga inicial a partir das linhas existentes; depois, só deltas.
+    op.execute("""
+        INSERT INTO estatisticas (estado, municipio, praias, praias_com_rating,
+            soma_rating, praias_com_salvavida, praias_proprias_banho)
+        SELECT estado, municipio, count(*), count(rating),
+            coalesce(sum(rating), 0),
+            count(*) FILTER (WHERE tem_salvavida IS TRUE),
+            count(*) FILTER (WHERE propria_banho IS TRUE)
+        FROM praias
+        GROUP BY estado, municipio
+        """)
+    op.execute("""
+        UPDATE estatisticas e
+        SET quiosques = q.quiosques,
+            quiosques_com_nota = q.quiosques_com_nota,
+            soma_nota = q.soma_nota
+        FROM (
+            SELECT p.estado, p.municipio, count(*) AS quiosques,
+                count(q.nota) AS quiosques_com_nota,
+                coalesce(sum(q.nota), 0) AS soma_nota
+            FROM quiosques q
+            JOIN praias p ON p.id = q.praia_id
+            GROUP BY p.estado, p.municipio
+        ) q
+        WHERE e.estado = q.estado AND e.municipio = q.municipio
+        """)
+
+
+def downgrade():
+    op.drop_table("estatisticas")
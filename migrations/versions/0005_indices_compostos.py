@@ -0,0 +1,48 @@
+"""booleanos e valor dentro de índices compostos
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+# Os índices de coluna booleana ou de domínio pequeno (metade das linhas por
+# valor) nunca eram escolhidos pelo planner. As colunas passam a compor os
+# índices de estado/município e da FK, que cobrem os filtros e as facetas.
+def upgrade():
+    op.create_index(
+        "ix_praias_estado_municipio_salvavida_banho",
+        "praias",
+        ["estado", "municipio", "tem_salvavida", "propria_banho"],
+    )
+    op.drop_index("ix_praias_estado_municipio", table_name="praias")
+    op.drop_index("ix_praias_tem_salvavida", table_name="praias")
+    op.drop_index("ix_praias_propria_banho", table_name="praias")
+
+    op.create_index(
+        "ix_quiosques_praia_id_banheiro_valor",
+        "quiosques",
+        ["praia_id", "tem_banheiro", "valor"],
+    )
+    op.drop_index("ix_quiosques_praia_id", table_name="quiosques")
+    op.drop_index("ix_quiosques_tem_banheiro", table_name="quiosques")
+    op.drop_index("ix_quiosques_valor", table_name="quiosques")
+
+
+def downgrade():
+    op.create_index("ix_quiosques_valor", "quiosques", ["valor"])
+    op.create_index("ix_quiosques_tem_banheiro", "quiosques", ["tem_banheiro"])
+    op.create_index("ix_quiosques_praia_id", "quiosques", ["praia_id"])
+    op.drop_index("ix_quiosques_praia_id_banheiro_valor", table_name="quiosques")
+
+    op.create_index("ix_praias_propria_banho", "praias", ["propria_banho"])
+    op.create_index("ix_praias_tem_salvavida", "praias", ["tem_salvavida"])
+    op.create_index("ix_praias_estado_municipio", "praias", ["estado", "municipio"])
+    op.drop_index("ix_praias_estado_municipio_salvavida_banho", table_name="praias")
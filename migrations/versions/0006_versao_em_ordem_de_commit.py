@@ -0,0 +1,42 @@
+"""versões do catálogo sorteadas sob trava, em ordem de commit
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+TABELAS_VERSIONADAS = ("praias", "quiosques", "exclusoes")
+
+
+# O nextval direto deixava uma transação lenta confirmar uma versão menor do
+# que outra já entregue pelo /sync; a função espera quem sorteou antes.
+def upgrade():
+    op.execute("""
+        CREATE FUNCTION catalogo_nova_versao() RETURNS bigint
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_advisory_xact_lock(hashtext('catalogo_versao'));
+            RETURN nextval('catalogo_versao_seq');
+        END
+        $$
+        """)
+    for tabela in TABELAS_VERSIONADAS:
+        op.alter_column(
+            tabela, "versao", server_default=sa.text("catalogo_nova_versao()")
+        )
+
+
+def downgrade():
+    for tabela in TABELAS_VERSIONADAS:
+        op.alter_column(
+            tabela, "versao", server_default=sa.text("nextval('catalogo_versao_seq')")
+        )
+    op.execute("DROP FUNCTION catalogo_nova_versao()")
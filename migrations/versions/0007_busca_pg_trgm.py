@@ -0,0 +1,51 @@
+"""busca por nome com pg_trgm e unaccent, onde estiverem disponíveis
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+EXTENSOES = ("pg_trgm", "unaccent")
+TABELAS = ("praias", "quiosques")
+
+
+# As duas extensões vêm no contrib (a imagem postgres do docker-compose as
+# traz), mas não em toda instalação. Sem elas a migração não faz nada e a busca
+# fica no índice em memória (api/v1/busca.py), que procura esta função.
+def upgrade():
+    disponiveis = op.get_bind().execute(
+        sa.text("SELECT name FROM pg_available_extensions WHERE name = ANY(:nomes)"),
+        {"nomes": list(EXTENSOES)},
+    )
+    if set(disponiveis.scalars()) != set(EXTENSOES):
+        return
+
+    for extensao in EXTENSOES:
+        op.execute(f"CREATE EXTENSION IF NOT EXISTS {extensao}")
+    # unaccent(texto) não é IMMUTABLE (depende do search_path); com o
+    # dicionário explícito pode entrar num índice de expressão.
+    op.execute("""
+        CREATE FUNCTION catalogo_normalizar(texto text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS $$
+            SELECT lower(public.unaccent('public.unaccent'::regdictionary, texto))
+        $$
+        """)
+    for tabela in TABELAS:
+        op.execute(
+            f"CREATE INDEX ix_{tabela}_nome_trgm ON {tabela} "
+            "USING gin (catalogo_normalizar(nome) gin_trgm_ops)"
+        )
+
+
+def downgrade():
+    for tabela in TABELAS:
+        op.execute(f"DROP INDEX IF EXISTS ix_{tabela}_nome_trgm")
+    op.execute("DROP FUNCTION IF EXISTS catalogo_normalizar(text)")
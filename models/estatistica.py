@@ -0,0 +1,164 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    Numeric,
+    String,
+    delete,
+    event,
+    func,
+    inspect,
+    select,
+)
+from sqlalchemy.dialects.postgresql import insert
+from db.session import Base
+from models.praia import Praia
+from models.quiosque import Quiosque
+
+# Resumo do catálogo por município, mantido por deltas: cada escrita soma ou
+# subtrai a contribuição das linhas afetadas, lidas do próprio banco dentro da
+# mesma transação (antes da alteração para subtrair, depois para somar). O
+# /stats lê só esta tabela, sem varrer praias e quiosques.
+
+
+class Estatistica(Base):
+    __tablename__ = "estatisticas"
+
+    estado = Column(String(2), primary_key=True)
+    municipio = Column(String, primary_key=True)
+    praias = Column(Integer, nullable=False, server_default="0")
+    praias_com_rating = Column(Integer, nullable=False, server_default="0")
+    soma_rating = Column(Numeric, nullable=False, server_default="0")
+    praias_com_salvavida = Column(Integer, nullable=False, server_default="0")
+    praias_proprias_banho = Column(Integer, nullable=False, server_default="0")
+    quiosques = Column(Integer, nullable=False, server_default="0")
+    quiosques_com_nota = Column(Integer, nullable=False, server_default="0")
+    soma_nota = Column(Numeric, nullable=False, server_default="0")
+
+
+CONTADORES_PRAIA = (
+    "praias",
+    "praias_com_rating",
+    "soma_rating",
+    "praias_com_salvavida",
+    "praias_proprias_banho",
+)
+CONTADORES_QUIOSQUE = ("quiosques", "quiosques_com_nota", "soma_nota")
+
+
+def _contribuicao_praias(sinal: int):
+    return select(
+        Praia.estado,
+        Praia.municipio,
+        (sinal * func.count()).label("praias"),
+        (sinal * func.count(Praia.rating)).label("praias_com_rating"),
+        (sinal * func.coalesce(func.sum(Praia.rating), 0)).label("soma_rating"),
+        (sinal * func.count().filter(Praia.tem_salvavida.is_(True))).label(
+            "praias_com_salvavida"
+        ),
+        (sinal * func.count().filter(Praia.propria_banho.is_(True))).label(
+            "praias_proprias_banho"
+        ),
+    ).group_by(Praia.estado, Praia.municipio)
+
+
+def _contribuicao_quiosques(sinal: int):
+    return (
+        select(
+            Praia.estado,
+            Praia.municipio,
+            (sinal * func.count()).label("quiosques"),
+            (sinal * func.count(Quiosque.nota)).label("quiosques_com_nota"),
+            (sinal * func.coalesce(func.sum(Quiosque.nota), 0)).label("soma_nota"),
+        )
+        .select_from(Quiosque)
+        .join(Praia, Quiosque.praia_id == Praia.id)
+        .group_by(Praia.estado, Praia.municipio)
+    )
+
+
+# INSERT ... SELECT com ON CONFLICT somando: aplica o delta num só comando.
+def _somar(contribuicao, contadores):
+    colunas = ["estado", "municipio", *contadores]
+    statement = insert(Estatistica).from_select(colunas, contribuicao)
+    return statement.on_conflict_do_update(
+        index_elements=["estado", "municipio"],
+        set_={
+            nome: getattr(Estatistica, nome) + getattr(statement.excluded, nome)
+            for nome in contadores
+        },
+    )
+
+
+def somar_praias(ids, sinal: int = 1):
+    contribuicao = _contribuicao_praias(sinal).where(Praia.id.in_(ids))
+    return _somar(contribuicao, CONTADORES_PRAIA)
+
+
+def somar_quiosques(ids=None, praia_id=None, sinal: int = 1):
+    contribuicao = _contribuicao_quiosques(sinal)
+    if ids is not None:
+        contribuicao = contribuicao.where(Quiosque.id.in_(ids))
+    if praia_id is not None:
+        contribuicao = contribuicao.where(Quiosque.praia_id == praia_id)
+    return _somar(contribuicao, CONTADORES_QUIOSQUE)
+
+
+# Recalcula a tabela inteira a partir de praias e quiosques.
+def recalcular(connection):
+    connection.execute(delete(Estatistica))
+    connection.execute(_somar(_contribuicao_praias(1), CONTADORES_PRAIA))
+    connection.execute(_somar(_contribuicao_quiosques(1), CONTADORES_QUIOSQUE))
+
+
+# Os eventos do mapper cobrem as escritas pelo ORM (inclusive a exclusão em
+# cascata dos quiosques); os INSERTs em lote chamam somar_* diretamente.
+@event.listens_for(Praia, "after_insert")
+def _praia_inserida(mapper, connection, target):
+    connection.execute(somar_praias([target.id]))
+
+
+def _praia_mudou_de_municipio(target) -> bool:
+    atributos = inspect(target).attrs
+    return (
+        atributos.estado.history.has_changes()
+        or atributos.municipio.history.has_changes()
+    )
+
+
+@event.listens_for(Praia, "before_update")
+def _praia_antes_de_alterar(mapper, connection, target):
+    connection.execute(somar_praias([target.id], sinal=-1))
+    if _praia_mudou_de_municipio(target):
+        connection.execute(somar_quiosques(praia_id=target.id, sinal=-1))
+
+
+@event.listens_for(Praia, "after_update")
+def _praia_alterada(mapper, connection, target):
+    connection.execute(somar_praias([target.id]))
+    if _praia_mudou_de_municipio(target):
+        connection.execute(somar_quiosques(praia_id=target.id))
+
+
+@event.listens_for(Praia, "before_delete")
+def _praia_antes_de_excluir(mapper, connection, target):
+    connection.execute(somar_praias([target.id], sinal=-1))
+
+
+@event.listens_for(Quiosque, "after_insert")
+def _quiosque_inserido(mapper, connection, target):
+    connection.execute(somar_quiosques([target.id]))
+
+
+@event.listens_for(Quiosque, "before_update")
+def _quiosque_antes_de_alterar(mapper, connection, target):
+    connection.execute(somar_quiosques([target.id], sinal=-1))
+
+
+@event.listens_for(Quiosque, "after_update")
+def _quiosque_alterado(mapper, connection, target):
+    connection.execute(somar_quiosques([target.id]))
+
+
+@event.listens_for(Quiosque, "before_delete")
+def _quiosque_antes_de_excluir(mapper, connection, target):
+    connection.execute(somar_quiosques([target.id], sinal=-1))
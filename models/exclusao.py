@@ -0,0 +1,57 @@
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    Index,
+    Integer,
+    Sequence,
+    String,
+    event,
+    func,
+    insert,
+)
+from db.session import Base
+
+# Versão de alteração do catálogo: uma sequência única para praias, quiosques e
+# exclusões, então "since=<versão>" ordena todas as mudanças juntas.
+catalogo_versao = Sequence("catalogo_versao_seq", metadata=Base.metadata)
+
+# A versão é sorteada no comando, mas só fica visível no commit: sem ordem
+# entre os dois, uma transação que sorteou 10 e confirma depois de outra que
+# sorteou 11 aparece abaixo de um "since=11" já entregue, e o sync a perde.
+# catalogo_nova_versao() toma uma trava de transação antes do nextval, então
+# quem sorteia espera o commit (ou rollback) de quem sorteou antes e as versões
+# ficam visíveis em ordem. As escritas no catálogo já se serializam na linha de
+# estatisticas do município; a trava estende isso a municípios diferentes.
+FUNCAO_NOVA_VERSAO = """
+    CREATE OR REPLACE FUNCTION catalogo_nova_versao() RETURNS bigint
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM pg_advisory_xact_lock(hashtext('catalogo_versao'));
+        RETURN nextval('catalogo_versao_seq');
+    END
+    $$
+"""
+nova_versao = func.catalogo_nova_versao
+
+# Para o create_all (os testes que montam um banco próprio); as migrações criam
+# a função na 0006. O default das tabelas a referencia, então vem antes delas.
+event.listen(Base.metadata, "before_create", DDL(FUNCAO_NOVA_VERSAO))
+event.listen(
+    Base.metadata, "after_drop", DDL("DROP FUNCTION IF EXISTS catalogo_nova_versao()")
+)
+
+
+# Tombstone de um registro removido, para o sync avisar os clientes offline.
+class Exclusao(Base):
+    __tablename__ = "exclusoes"
+    __table_args__ = (Index("ix_exclusoes_versao", "versao"),)
+
+    id = Column(Integer, primary_key=True)
+    tabela = Column(String(20), nullable=False)
+    registro_id = Column(Integer, nullable=False)
+    versao = Column(BigInteger, server_default=nova_versao(), nullable=False)
+
+
+def registrar_exclusao(connection, tabela: str, registro_id: int):
+    connection.execute(insert(Exclusao).values(tabela=tabela, registro_id=registro_id))
@@ -1,10 +1,38 @@
-from sqlalchemy import Column, Integer, String, Numeric, Boolean
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Integer,
+    String,
+    Numeric,
+    Boolean,
+    Index,
+    event,
+)
 from sqlalchemy.orm import relationship
 from db.session import Base
+from core.geo import geohash_encode
+from models.exclusao import nova_versao, registrar_exclusao
 
 
 class Praia(Base):
     __tablename__ = "praias"
+    # Índices para os filtros da listagem; criados pelas migrações (alembic).
+    # Os booleanos não têm índice próprio (metade das linhas não compensa o
+    # índice): entram no de estado/município, que cobre também as facetas.
+    __table_args__ = (
+        Index(
+            "ix_praias_estado_municipio_salvavida_banho",
+            "estado",
+            "municipio",
+            "tem_salvavida",
+            "propria_banho",
+        ),
+        Index("ix_praias_estado_rating", "estado", "rating"),
+        Index("ix_praias_municipio", "municipio"),
+        Index("ix_praias_rating", "rating"),
+        Index("ix_praias_latitude_longitude", "latitude", "longitude"),
+        Index("ix_praias_versao", "versao"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String, nullable=False)
@@ -17,6 +45,28 @@ class Praia(Base):
     propria_banho = Column(Boolean, default=True)
     tem_salvavida = Column(Boolean, default=False)
     rating = Column(Numeric(2, 1))
+    # Geohash das coordenadas, com collation "C" para que buscas por prefixo
+    # usem o índice B-tree.
+    geohash = Column(String(12, collation="C"), index=True)
+    # Versão da última alteração (catalogo_nova_versao), usada pelo /sync.
+    versao = Column(BigInteger, server_default=nova_versao(), nullable=False)
     quiosques = relationship(
         "Quiosque", back_populates="praia", cascade="all, delete-orphan"
     )
+
+
+@event.listens_for(Praia, "before_insert")
+@event.listens_for(Praia, "before_update")
+def _atualizar_geohash(mapper, connection, target):
+    target.geohash = geohash_encode(target.latitude, target.longitude)
+
+
+@event.listens_for(Praia, "before_update")
+def _nova_versao(mapper, connection, target):
+    target.versao = nova_versao()
+
+
+# Também cobre as exclusões em cascata (Praia.quiosques com delete-orphan).
+@event.listens_for(Praia, "after_delete")
+def _registrar_exclusao(mapper, connection, target):
+    registrar_exclusao(connection, "praias", target.id)
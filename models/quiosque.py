@@ -1,10 +1,34 @@
-from sqlalchemy import Column, Integer, String, Numeric, Boolean, ForeignKey
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Integer,
+    String,
+    Numeric,
+    Boolean,
+    ForeignKey,
+    Index,
+    event,
+)
 from db.session import Base
 from sqlalchemy.orm import relationship
+from core.geo import geohash_encode
+from models.exclusao import nova_versao, registrar_exclusao
 
 
 class Quiosque(Base):
     __tablename__ = "quiosques"
+    # Índices para os filtros da listagem; criados pelas migrações (alembic).
+    # banheiro e valor (booleano e 1 a 5) não têm índice próprio: vão junto da
+    # FK, que assim cobre as facetas por praia sem ler a tabela.
+    __table_args__ = (
+        Index(
+            "ix_quiosques_praia_id_banheiro_valor", "praia_id", "tem_banheiro", "valor"
+        ),
+        Index("ix_quiosques_nome", "nome"),
+        Index("ix_quiosques_nota", "nota"),
+        Index("ix_quiosques_latitude_longitude", "latitude", "longitude"),
+        Index("ix_quiosques_versao", "versao"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String, nullable=False)
@@ -16,5 +40,25 @@ class Quiosque(Base):
     ocupacao_maxima = Column(Numeric(5, 0))
     latitude = Column(Numeric(9, 6), nullable=False)
     longitude = Column(Numeric(9, 6), nullable=False)
+    geohash = Column(String(12, collation="C"), index=True)
+    # Versão da última alteração (catalogo_nova_versao), usada pelo /sync.
+    versao = Column(BigInteger, server_default=nova_versao(), nullable=False)
     praia_id = Column(Integer, ForeignKey("praias.id"))
     praia = relationship("Praia", back_populates="quiosques")
+
+
+@event.listens_for(Quiosque, "before_insert")
+@event.listens_for(Quiosque, "before_update")
+def _atualizar_geohash(mapper, connection, target):
+    target.geohash = geohash_encode(target.latitude, target.longitude)
+
+
+@event.listens_for(Quiosque, "before_update")
+def _nova_versao(mapper, connection, target):
+    target.versao = nova_versao()
+
+
+# Também cobre as exclusões em cascata (Praia.quiosques com delete-orphan).
+@event.listens_for(Quiosque, "after_delete")
+def _registrar_exclusao(mapper, connection, target):
+    registrar_exclusao(connection, "quiosques", target.id)
@@ -10,9 +10,17 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     refresh_token_hash = Column(String, nullable=True)
 
-    def __init__(self, username: str, password: str, **kwargs):
+    def __init__(
+        self,
+        username: str,
+        password: str = None,
+        hashed_password: str = None,
+        **kwargs,
+    ):
         self.username = username
-        hashed_password = hash_password(password)
+        # Quem já calculou o hash (ex.: no pool de processos) passa hashed_password.
+        if hashed_password is None:
+            hashed_password = hash_password(password)
         self.hashed_password = hashed_password
         for key, value in kwargs.items():
             setattr(self, key, value)
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Any, List, Optional
+
+
+class BulkItemResultado(BaseModel):
+    indice: int
+    status: str
+    id: Optional[int] = None
+    erro: Optional[Any] = None
+
+
+class BulkResultado(BaseModel):
+    criados: int = 0
+    erros: int = 0
+    resultados: List[BulkItemResultado] = []
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class ResultadoBusca(BaseModel):
+    tipo: str
+    id: int
+    nome: str
+    relevancia: float
+
+
+class BuscaList(BaseModel):
+    resultados: List[ResultadoBusca] = []
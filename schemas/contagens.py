@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+from typing import Any
+
+
+class Faceta(BaseModel):
+    valor: Any = None
+    total: int
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class ResumoEstatistica(BaseModel):
+    praias: int
+    quiosques: int
+    rating_medio: Optional[float] = None
+    nota_media: Optional[float] = None
+    quiosques_por_praia: Optional[float] = None
+    taxa_salvavida: Optional[float] = None
+    taxa_propria_banho: Optional[float] = None
+
+
+class EstatisticaEstado(ResumoEstatistica):
+    estado: str
+
+
+class EstatisticaMunicipio(ResumoEstatistica):
+    estado: str
+    municipio: str
+
+
+class Estatisticas(BaseModel):
+    total: ResumoEstatistica
+    estados: List[EstatisticaEstado] = []
+    municipios: List[EstatisticaMunicipio] = []
@@ -1,7 +1,9 @@
 from pydantic import BaseModel, ConfigDict, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from enum import Enum
 
+from schemas.contagens import Faceta
+
 
 class Estado(str, Enum):
     AC = "AC"
@@ -77,5 +79,27 @@ class PraiaOut(PraiaBase):
     quiosques: List[QuiosqueInfo] = []
 
 
+class PraiaProxima(PraiaOut):
+    distancia_km: float
+
+
+class PraiaProximaList(BaseModel):
+    praias: List[PraiaProxima] = []
+
+
+class PraiaBatchItem(BaseModel):
+    id: int
+    status: str
+    praia: Optional[PraiaOut] = None
+
+
+class PraiaBatch(BaseModel):
+    praias: List[PraiaBatchItem] = []
+
+
 class PraiaList(BaseModel):
     praias: List[PraiaOut] = []
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_aproximado: Optional[bool] = None
+    facetas: Optional[Dict[str, List[Faceta]]] = None
@@ -1,5 +1,7 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, Optional, List
+
+from schemas.contagens import Faceta
 
 
 class QuiosqueBase(BaseModel):
@@ -47,9 +49,7 @@ class QuiosquePatch(BaseModel):
 
 class QuiosqueInfo(QuiosqueBase):
     id: int
-
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 from schemas.praia import PraiaInfo
@@ -57,11 +57,31 @@ from schemas.praia import PraiaInfo
 
 class QuiosqueOut(QuiosqueBase):
     id: int
+    model_config = ConfigDict(from_attributes=True)
     praia: PraiaInfo
 
-    class Config:
-        orm_mode = True
+
+class QuiosqueProximo(QuiosqueOut):
+    distancia_km: float
+
+
+class QuiosqueProximoList(BaseModel):
+    quiosques: List[QuiosqueProximo] = []
+
+
+class QuiosqueBatchItem(BaseModel):
+    id: int
+    status: str
+    quiosque: Optional[QuiosqueOut] = None
+
+
+class QuiosqueBatch(BaseModel):
+    quiosques: List[QuiosqueBatchItem] = []
 
 
 class QuiosqueList(BaseModel):
     quiosques: List[QuiosqueOut] = []
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_aproximado: Optional[bool] = None
+    facetas: Optional[Dict[str, List[Faceta]]] = None
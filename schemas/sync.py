@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import List
+
+from schemas.praia import PraiaInfo
+from schemas.quiosque import QuiosqueInfo
+
+
+class PraiaSync(PraiaInfo):
+    versao: int
+
+
+class QuiosqueSync(QuiosqueInfo):
+    versao: int
+
+
+class ExclusoesSync(BaseModel):
+    praias: List[int] = []
+    quiosques: List[int] = []
+
+
+class SyncResultado(BaseModel):
+    versao: int
+    tem_mais: bool = False
+    praias: List[PraiaSync] = []
+    quiosques: List[QuiosqueSync] = []
+    exclusoes: ExclusoesSync = ExclusoesSync()
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class DestaqueCluster(BaseModel):
+    id: int
+    nome: str
+    avaliacao: Optional[float] = None
+
+
+class Cluster(BaseModel):
+    total: int
+    latitude: float
+    longitude: float
+    bbox: List[float]
+    destaque: DestaqueCluster
+
+
+class Tile(BaseModel):
+    z: int
+    x: int
+    y: int
+    praias: List[Cluster] = []
+    quiosques: List[Cluster] = []
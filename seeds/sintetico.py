@@ -0,0 +1,381 @@
+import argparse
+import asyncio
+import io
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from sqlalchemy import inspect, insert, text
+from sqlalchemy.schema import AddConstraint, CreateIndex, DropIndex
+
+from core.cache import cache
+from core.geo import GEOHASH_PRECISAO
+from db.session import engine
+from models.estatistica import recalcular
+from models.praia import Praia
+from models.quiosque import Quiosque
+from schemas.praia import Estado
+
+# Catálogo sintético em escala de produção, determinístico pela semente:
+#   python -m seeds.sintetico --praias 100000 --quiosques 1000000 --seed 42
+# As linhas são geradas em lotes com NumPy (inclusive o geohash) e carregadas
+# com COPY no Postgres; em drivers sem COPY, com executemany em lotes. Tudo numa
+# transação, que também recalcula a tabela de estatísticas.
+
+# A partir deste volume, os índices secundários e a FK da tabela são removidos
+# durante o COPY e recriados no fim: construir um índice de uma vez é bem mais
+# rápido do que mantê-lo linha a linha.
+ADIAR_INDICES_A_PARTIR_DE = 100000
+
+# Centro aproximado (lat, lon) do litoral/capital de cada estado.
+CENTROS = {
+    "AC": (-9.97, -67.81),
+    "AL": (-9.67, -35.74),
+    "AP": (0.03, -51.07),
+    "AM": (-3.12, -60.02),
+    "BA": (-12.97, -38.50),
+    "CE": (-3.73, -38.52),
+    "DF": (-15.79, -47.88),
+    "ES": (-20.32, -40.34),
+    "GO": (-16.68, -49.25),
+    "MA": (-2.53, -44.30),
+    "MT": (-15.60, -56.10),
+    "MS": (-20.44, -54.65),
+    "MG": (-19.92, -43.94),
+    "PA": (-1.46, -48.50),
+    "PB": (-7.12, -34.86),
+    "PR": (-25.52, -48.51),
+    "PE": (-8.05, -34.88),
+    "PI": (-2.90, -41.78),
+    "RJ": (-22.91, -43.17),
+    "RN": (-5.79, -35.21),
+    "RS": (-30.03, -51.23),
+    "RO": (-8.76, -63.90),
+    "RR": (2.82, -60.67),
+    "SC": (-27.60, -48.55),
+    "SP": (-23.96, -46.33),
+    "SE": (-10.91, -37.07),
+    "TO": (-10.18, -48.33),
+}
+ESTADOS = [estado.value for estado in Estado]
+
+RADICAIS = [
+    "Porto",
+    "Barra",
+    "Santa Cruz",
+    "São José",
+    "Vila Nova",
+    "Ponta",
+    "Lagoa",
+    "Ilha",
+    "Canoa",
+    "Itapoã",
+    "Jacumã",
+    "Maragogi",
+    "Tabatinga",
+    "Guaratuba",
+    "Aracati",
+    "Camboinha",
+]
+COMPLEMENTOS = [
+    "",
+    " do Norte",
+    " do Sul",
+    " da Praia",
+    " das Pedras",
+    " dos Coqueiros",
+    " Velha",
+    " Grande",
+]
+MUNICIPIOS_POR_ESTADO = 40
+NOMES_PRAIA = [
+    "Iracema",
+    "Futuro",
+    "Sancho",
+    "Pipa",
+    "Forte",
+    "Coqueiros",
+    "Mansa",
+    "Brava",
+    "Dunas",
+    "Farol",
+    "Pescadores",
+    "Sereia",
+    "Amores",
+    "Conchas",
+    "Tartarugas",
+    "Pedra Furada",
+]
+ARTIGOS = ["de", "do", "da", "dos", "das"]
+NOMES_QUIOSQUE = ["Barraca", "Quiosque", "Cabana", "Bar", "Restaurante"]
+TEMAS_QUIOSQUE = [
+    "Sol",
+    "Mar Azul",
+    "Coqueiral",
+    "Maré Alta",
+    "Jangada",
+    "Siri",
+    "Caranguejo",
+    "Brisa",
+    "Lua Cheia",
+    "Pôr do Sol",
+]
+
+_BASE32 = np.frombuffer(b"0123456789bcdefghjkmnpqrstuvwxyz", dtype=np.uint8)
+
+COLUNAS_PRAIA = [
+    "id",
+    "nome",
+    "estado",
+    "municipio",
+    "latitude",
+    "longitude",
+    "comprimento",
+    "largura",
+    "propria_banho",
+    "tem_salvavida",
+    "rating",
+    "geohash",
+]
+COLUNAS_QUIOSQUE = [
+    "id",
+    "nome",
+    "descricao",
+    "nota",
+    "tem_acessibilidade",
+    "tem_banheiro",
+    "valor",
+    "ocupacao_maxima",
+    "latitude",
+    "longitude",
+    "geohash",
+    "praia_id",
+]
+
+
+def _municipios(estado: str) -> list:
+    indice = ESTADOS.index(estado)
+    return [
+        RADICAIS[(indice + k) % len(RADICAIS)]
+        + COMPLEMENTOS[k // len(RADICAIS) % len(COMPLEMENTOS)]
+        for k in range(MUNICIPIOS_POR_ESTADO)
+    ]
+
+
+MUNICIPIOS = np.array([_municipios(estado) for estado in ESTADOS], dtype=object)
+
+
+# Mesmo resultado de core.geo.geohash_encode, em lote: quantiza lat/lon nos
+# bits de cada eixo e intercala (longitude primeiro).
+def geohash_vetorizado(latitude, longitude, precisao: int = GEOHASH_PRECISAO):
+    bits = precisao * 5
+    bits_lon, bits_lat = (bits + 1) // 2, bits // 2
+    ilon = np.floor((longitude + 180.0) / 360.0 * (1 << bits_lon)).astype(np.int64)
+    ilat = np.floor((latitude + 90.0) / 180.0 * (1 << bits_lat)).astype(np.int64)
+    ilon = ilon.clip(0, (1 << bits_lon) - 1)
+    ilat = ilat.clip(0, (1 << bits_lat) - 1)
+
+    codigo = np.zeros(len(latitude), dtype=np.int64)
+    for i in range(bits):
+        if i % 2 == 0:
+            bit = (ilon >> (bits_lon - 1 - i // 2)) & 1
+        else:
+            bit = (ilat >> (bits_lat - 1 - i // 2)) & 1
+        codigo = (codigo << 1) | bit
+
+    caracteres = np.empty((len(latitude), precisao), dtype=np.uint8)
+    for k in range(precisao):
+        caracteres[:, k] = _BASE32[(codigo >> (5 * (precisao - 1 - k))) & 31]
+    return caracteres.view(f"S{precisao}").ravel().astype(str)
+
+
+def _nulos(rng, valores, fracao: float):
+    valores = valores.astype(object)
+    valores[rng.random(len(valores)) < fracao] = None
+    return valores
+
+
+def gerar_praias(rng, primeiro_id: int, n: int) -> dict:
+    estado = rng.integers(0, len(ESTADOS), n)
+    centros = np.array([CENTROS[e] for e in ESTADOS])
+    latitude = np.round(
+        (centros[estado, 0] + rng.normal(0, 0.8, n)).clip(-33.7, 5.2), 6
+    )
+    longitude = np.round(
+        (centros[estado, 1] + rng.normal(0, 0.8, n)).clip(-73.9, -28.8), 6
+    )
+    nomes = np.char.add(
+        np.char.add(
+            "Praia ",
+            np.char.add(np.array(ARTIGOS)[rng.integers(0, len(ARTIGOS), n)], " "),
+        ),
+        np.array(NOMES_PRAIA)[rng.integers(0, len(NOMES_PRAIA), n)],
+    )
+    return {
+        "id": np.arange(primeiro_id, primeiro_id + n),
+        "nome": nomes,
+        "estado": np.array(ESTADOS)[estado],
+        "municipio": MUNICIPIOS[estado, rng.integers(0, MUNICIPIOS_POR_ESTADO, n)],
+        "latitude": latitude,
+        "longitude": longitude,
+        "comprimento": _nulos(rng, rng.integers(100, 20000, n), 0.1),
+        "largura": _nulos(rng, rng.integers(10, 300, n), 0.1),
+        "propria_banho": rng.random(n) < 0.75,
+        "tem_salvavida": rng.random(n) < 0.4,
+        "rating": _nulos(rng, np.round(rng.uniform(0, 5, n), 1), 0.1),
+        "geohash": geohash_vetorizado(latitude, longitude),
+    }
+
+
+def gerar_quiosques(rng, primeiro_id: int, n: int, praias: dict) -> dict:
+    praia = rng.integers(0, len(praias["id"]), n)
+    latitude = np.round(praias["latitude"][praia] + rng.normal(0, 0.003, n), 6)
+    longitude = np.round(praias["longitude"][praia] + rng.normal(0, 0.003, n), 6)
+    nomes = np.char.add(
+        np.char.add(
+            np.array(NOMES_QUIOSQUE)[rng.integers(0, len(NOMES_QUIOSQUE), n)], " "
+        ),
+        np.array(TEMAS_QUIOSQUE)[rng.integers(0, len(TEMAS_QUIOSQUE), n)],
+    )
+    return {
+        "id": np.arange(primeiro_id, primeiro_id + n),
+        "nome": nomes,
+        "descricao": np.full(n, None, dtype=object),
+        "nota": _nulos(rng, np.round(rng.uniform(0, 5, n), 1), 0.15),
+        "tem_acessibilidade": rng.random(n) < 0.3,
+        "tem_banheiro": rng.random(n) < 0.5,
+        "valor": _nulos(rng, rng.integers(1, 6, n), 0.1),
+        "ocupacao_maxima": rng.integers(10, 500, n),
+        "latitude": latitude,
+        "longitude": longitude,
+        "geohash": geohash_vetorizado(latitude, longitude),
+        "praia_id": praias["id"][praia],
+    }
+
+
+def _lotes(total: int, tamanho: int):
+    for inicio in range(0, total, tamanho):
+        yield inicio, min(tamanho, total - inicio)
+
+
+# Reserva um bloco de ids na sequência da tabela, para os quiosques poderem
+# apontar para as praias geradas sem ler os ids de volta.
+def _reservar_ids(connection, tabela: str, n: int) -> int:
+    ultimo = connection.execute(
+        text(
+            f"SELECT setval(pg_get_serial_sequence('{tabela}', 'id'), "
+            f"nextval(pg_get_serial_sequence('{tabela}', 'id')) + :n - 1)"
+        ),
+        {"n": n},
+    ).scalar()
+    return ultimo - n + 1
+
+
+def _texto(valores) -> list:
+    if valores.dtype == object:
+        return ["\\N" if v is None else str(v) for v in valores.tolist()]
+    if valores.dtype == bool:
+        return np.where(valores, "t", "f").tolist()
+    if valores.dtype.kind == "U":
+        return valores.tolist()
+    return list(map(str, valores.tolist()))
+
+
+# Formato texto do COPY: colunas separadas por tab e \N para nulo.
+def _tsv(colunas: list, dados: dict) -> io.StringIO:
+    valores = [_texto(dados[coluna]) for coluna in colunas]
+    return io.StringIO("\n".join(map("\t".join, zip(*valores))) + "\n")
+
+
+def _suporta_copy(connection) -> bool:
+    return hasattr(connection.connection.driver_connection.cursor(), "copy_expert")
+
+
+@contextmanager
+def _indices_adiados(connection, modelo, n: int):
+    tabela = modelo.__table__
+    if n < ADIAR_INDICES_A_PARTIR_DE or not _suporta_copy(connection):
+        yield
+        return
+    for fk in inspect(connection).get_foreign_keys(tabela.name):
+        connection.execute(
+            text(f'ALTER TABLE {tabela.name} DROP CONSTRAINT "{fk["name"]}"')
+        )
+    for indice in tabela.indexes:
+        connection.execute(DropIndex(indice, if_exists=True))
+    yield
+    connection.execute(text("SET LOCAL maintenance_work_mem = '256MB'"))
+    for indice in tabela.indexes:
+        connection.execute(CreateIndex(indice))
+    for fk in tabela.foreign_key_constraints:
+        connection.execute(AddConstraint(fk))
+
+
+def _carregar(connection, modelo, colunas: list, dados: dict):
+    if _suporta_copy(connection):
+        cursor = connection.connection.driver_connection.cursor()
+        cursor.copy_expert(
+            f"COPY {modelo.__tablename__} ({', '.join(colunas)}) FROM STDIN",
+            _tsv(colunas, dados),
+        )
+    else:
+        linhas = [
+            dict(zip(colunas, linha))
+            for linha in zip(*[dados[coluna].tolist() for coluna in colunas])
+        ]
+        connection.execute(insert(modelo), linhas)
+
+
+# Carrega o catálogo numa transação já aberta, sem confirmá-la (os testes de
+# plano carregam num banco próprio, sem a conexão do app).
+def carregar(connection, n_praias: int, n_quiosques: int, semente: int, tamanho_lote):
+    rng = np.random.default_rng(semente)
+    inicio = time.perf_counter()
+    primeira_praia = _reservar_ids(connection, "praias", n_praias)
+    # Os quiosques sorteiam praias entre todas as geradas, então as colunas
+    # usadas por eles ficam em memória (são só arrays NumPy).
+    praias = {"id": [], "latitude": [], "longitude": []}
+    with _indices_adiados(connection, Praia, n_praias):
+        for deslocamento, n in _lotes(n_praias, tamanho_lote):
+            lote = gerar_praias(rng, primeira_praia + deslocamento, n)
+            _carregar(connection, Praia, COLUNAS_PRAIA, lote)
+            for coluna in praias:
+                praias[coluna].append(lote[coluna])
+    praias = {coluna: np.concatenate(v or [[]]) for coluna, v in praias.items()}
+    print(f"{n_praias} praias em {time.perf_counter() - inicio:.1f}s")
+
+    meio = time.perf_counter()
+    if n_quiosques and n_praias:
+        primeiro_quiosque = _reservar_ids(connection, "quiosques", n_quiosques)
+        with _indices_adiados(connection, Quiosque, n_quiosques):
+            for deslocamento, n in _lotes(n_quiosques, tamanho_lote):
+                lote = gerar_quiosques(rng, primeiro_quiosque + deslocamento, n, praias)
+                _carregar(connection, Quiosque, COLUNAS_QUIOSQUE, lote)
+    print(f"{n_quiosques} quiosques em {time.perf_counter() - meio:.1f}s")
+
+    recalcular(connection)
+
+
+def semear(n_praias: int, n_quiosques: int, semente: int, tamanho_lote: int):
+    inicio = time.perf_counter()
+    with engine.begin() as connection:
+        carregar(connection, n_praias, n_quiosques, semente, tamanho_lote)
+    # Com cache compartilhado (Redis), descarta as listagens dos workers.
+    asyncio.run(cache.incrementar_versao("praias", "quiosques"))
+    total = time.perf_counter() - inicio
+    linhas = n_praias + n_quiosques
+    print(f"{linhas} linhas em {total:.1f}s ({linhas / total:,.0f} linhas/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um catálogo sintético.")
+    parser.add_argument("--praias", type=int, default=1000)
+    parser.add_argument("--quiosques", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--lote", type=int, default=50000)
+    args = parser.parse_args()
+    semear(args.praias, args.quiosques, args.seed, args.lote)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import os
+import uuid
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from db.session import engine
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Os testes de integração usam o Postgres de DATABASE_URL, migrado até a última
+# revisão no início da sessão. Sem banco acessível, eles são pulados.
+@pytest.fixture(scope="session")
+def banco():
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except OperationalError:
+        pytest.skip("Postgres de DATABASE_URL indisponível")
+    config = Config(os.path.join(RAIZ, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(RAIZ, "migrations"))
+    command.upgrade(config, "head")
+    return engine
+
+
+# A aplicação inteira (lifespan incluído) sobre o mesmo banco, sem cache: cada
+# requisição chega às consultas.
+@pytest.fixture(scope="session")
+def cliente(banco):
+    from fastapi.testclient import TestClient
+
+    from core.cache import NullBackend, cache
+    from main import app
+
+    backend, cache.backend = cache.backend, NullBackend()
+    with TestClient(app) as c:
+        yield c
+    cache.backend = backend
+
+
+@pytest.fixture(scope="session")
+def autenticado(cliente) -> dict:
+    credenciais = {"username": "teste_" + uuid.uuid4().hex[:8], "password": "teste"}
+    assert cliente.post("/user/register", json=credenciais).status_code == 201
+    resposta = cliente.post("/user/login", json=credenciais)
+    return {"Authorization": f"Bearer {resposta.json()['access_token']}"}
@@ -0,0 +1,110 @@
+import random
+import string
+
+import pytest
+
+from api.v1 import busca
+from api.v1.busca import SIMILARIDADE_MINIMA, IndiceTrigramas, ordenar, trigramas
+
+# O índice em memória só gera candidatos pelas listas dos trigramas mais raros
+# da busca; tem de achar o mesmo que a contagem sobre o catálogo inteiro.
+PALAVRAS = ["Praia", "do", "da", "Futuro", "Iracema", "Sancho", "Pôr", "Sol", "Mar"]
+PALAVRAS += ["Barraca", "Coqueiro", "Maçã", "Açaí", "Jericoacoara", "Pipa", "Ó"]
+
+
+def _referencia(nomes: dict, texto: str, limit: int, tipo=None) -> list:
+    termos = trigramas(texto)
+    linhas = []
+    for chave, (nome, termos_nome) in nomes.items():
+        if tipo is not None and chave[0] != tipo:
+            continue
+        quantidade = len(termos & termos_nome)
+        if quantidade / len(termos) < SIMILARIDADE_MINIMA:
+            continue
+        similaridade = quantidade / len(termos | termos_nome)
+        linhas.append((quantidade / len(termos), similaridade, chave, nome))
+    return ordenar(linhas, limit)
+
+
+def _errar(rng, texto: str) -> str:
+    i = rng.randrange(len(texto))
+    return texto[:i] + rng.choice(string.ascii_lowercase) + texto[i + 1 :]
+
+
+def test_candidatos_pelos_trigramas_raros():
+    rng = random.Random(5)
+    nomes = {
+        (rng.choice(["praia", "quiosque"]), i): " ".join(
+            rng.choices(PALAVRAS, k=rng.randint(1, 4))
+        )
+        for i in range(3000)
+    }
+    indice = IndiceTrigramas()
+    for chave, nome in nomes.items():
+        indice.adicionar(chave, nome)
+    # Renomeados e removidos saem das listas de trigramas.
+    for chave in rng.sample(sorted(nomes), 300):
+        nomes[chave] = rng.choice(PALAVRAS)
+        indice.adicionar(chave, nomes[chave])
+    for chave in rng.sample(sorted(nomes), 300):
+        del nomes[chave]
+        indice.remover(chave)
+    nomes = {chave: (nome, trigramas(nome)) for chave, nome in nomes.items()}
+
+    for _ in range(300):
+        texto = " ".join(rng.choices(PALAVRAS, k=rng.randint(1, 3)))
+        if rng.random() < 0.5:
+            texto = _errar(rng, texto)
+        limit = rng.choice([5, 100])
+        tipo = rng.choice([None, "praia", "quiosque"])
+        esperado = _referencia(nomes, texto, limit, tipo)
+        assert indice.buscar(texto, limit, tipo) == esperado, texto
+
+
+@pytest.fixture(params=["memoria", "banco"])
+def caminho(request, banco, cliente, monkeypatch):
+    if request.param == "banco":
+        # Detecta pg_trgm/unaccent (migração 0007) como o app faz.
+        monkeypatch.setattr(busca, "_no_banco", None)
+        cliente.get("/api/v1/search", params={"q": "praia"})
+        if not busca._no_banco:
+            pytest.skip("pg_trgm e unaccent não instalados neste Postgres")
+    monkeypatch.setattr(busca, "_no_banco", request.param == "banco")
+
+
+def _buscar(cliente, q: str, **params) -> list:
+    resposta = cliente.get("/api/v1/search", params={"q": q, **params})
+    assert resposta.status_code == 200, resposta.text
+    return [(r["tipo"], r["id"]) for r in resposta.json()["resultados"]]
+
+
+def test_busca_por_nome(cliente, autenticado, caminho):
+    marca = "".join(random.choices(string.ascii_lowercase, k=8))
+    praia = {
+        "nome": f"Praia do Pôr do Sol {marca}",
+        "estado": "CE",
+        "municipio": "Teste " + marca,
+        "latitude": -3.7,
+        "longitude": -38.5,
+    }
+    resposta = cliente.post("/api/v1/praia/", json=praia, headers=autenticado)
+    assert resposta.status_code == 201, resposta.text
+    praia_id = resposta.json()["id"]
+    quiosque = {
+        "nome": f"Barraca Açaí {marca}",
+        "latitude": -3.7,
+        "longitude": -38.5,
+        "praia_id": praia_id,
+    }
+    resposta = cliente.post("/api/v1/quiosque/", json=quiosque, headers=autenticado)
+    assert resposta.status_code == 201, resposta.text
+    quiosque_id = resposta.json()["id"]
+    try:
+        # Sem acento, em maiúsculas e com um erro de digitação.
+        assert _buscar(cliente, f"POR DO SOL {marca}")[0] == ("praia", praia_id)
+        assert _buscar(cliente, f"acai {marca[:-1]}x")[0] == ("quiosque", quiosque_id)
+        assert _buscar(cliente, marca, tipo="quiosque") == [("quiosque", quiosque_id)]
+        assert _buscar(cliente, "!!!") == []
+    finally:
+        cliente.delete(f"/api/v1/praia/{praia_id}", headers=autenticado)
+    assert _buscar(cliente, marca) == []
@@ -0,0 +1,185 @@
+import asyncio
+import random
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from api.v1 import catalogo
+from core.config import settings
+from db.session import SessionLocal
+from models.praia import Praia
+from models.quiosque import Quiosque
+
+# Diferencial do snapshot colunar (CATALOG_SNAPSHOT) contra o SQL do caminho
+# rápido (o mesmo formato, conferido contra o ORM em test_listagem_rapida): os
+# mesmos filtros, sorteados, têm de devolver as mesmas páginas.
+# Os dados têm nulos em todas as colunas opcionais, que o snapshot guarda como
+# NaN/-1.
+ESTADOS = ["CE", "RJ", "BA", "SC"]
+NOMES_QUIOSQUE = ["Sol", "Mar", "Onda"]
+
+
+def _talvez(rng, valor):
+    return None if rng.random() < 0.2 else valor
+
+
+@pytest.fixture(scope="module")
+def municipios(banco):
+    rng = random.Random(7)
+    municipios = [f"Teste {uuid.uuid4().hex[:6]} {i}" for i in range(4)]
+    with SessionLocal() as db:
+        praias = [
+            Praia(
+                nome=f"P{i}",
+                estado=rng.choice(ESTADOS),
+                municipio=rng.choice(municipios),
+                latitude=round(rng.uniform(-30, 0), 6),
+                longitude=round(rng.uniform(-50, -35), 6),
+                comprimento=_talvez(rng, rng.randint(10, 5000)),
+                largura=_talvez(rng, rng.randint(1, 200)),
+                propria_banho=_talvez(rng, rng.random() < 0.5),
+                tem_salvavida=_talvez(rng, rng.random() < 0.5),
+                rating=_talvez(rng, round(rng.uniform(0, 5), 1)),
+            )
+            for i in range(300)
+        ]
+        for praia in rng.sample(praias, 200):
+            praia.quiosques = [
+                Quiosque(
+                    nome=rng.choice(NOMES_QUIOSQUE),
+                    latitude=round(rng.uniform(-30, 0), 6),
+                    longitude=round(rng.uniform(-50, -35), 6),
+                    nota=_talvez(rng, round(rng.uniform(0, 5), 1)),
+                    valor=_talvez(rng, rng.randint(1, 5)),
+                    tem_banheiro=_talvez(rng, rng.random() < 0.5),
+                    tem_acessibilidade=_talvez(rng, rng.random() < 0.5),
+                )
+                for _ in range(rng.randint(1, 5))
+            ]
+        db.add_all(praias)
+        db.commit()
+        ids = [praia.id for praia in praias]
+    yield municipios
+    with SessionLocal() as db:
+        for praia in db.scalars(select(Praia).where(Praia.id.in_(ids))):
+            db.delete(praia)
+        db.commit()
+
+
+def _sortear(rng, opcoes: dict) -> dict:
+    params = {}
+    for nome, valores in opcoes.items():
+        valor = rng.choice([None, *valores])
+        if valor is not None:
+            params[nome] = valor
+    return params
+
+
+def _params_praia(rng, municipios) -> dict:
+    return _sortear(
+        rng,
+        {
+            "municipio": municipios,
+            "estado": [*ESTADOS, "XX"],
+            "min_rating": [1.5, 4.5],
+            "max_rating": [3.0],
+            "tem_quiosque": ["true", "false"],
+            "tem_salvavida": ["true", "false"],
+            "propria_banho": ["true", "false"],
+            "min_latitude": [-20.0],
+            "max_longitude": [-40.0],
+            "min_comprimento": [1000],
+            "max_largura": [100],
+            "skip": [0, 7],
+            "limit": [5, 50],
+            "fields": ["nome,rating"],
+            "include": ["quiosques"],
+        },
+    )
+
+
+def _params_quiosque(rng, municipios) -> dict:
+    return _sortear(
+        rng,
+        {
+            "municipio": municipios,
+            "estado": ESTADOS,
+            "nome": NOMES_QUIOSQUE,
+            "min_nota": [2.0],
+            "max_valor": [3],
+            "tem_banheiro": ["true", "false"],
+            "tem_acessibilidade": ["true"],
+            "min_longitude": [-45.0],
+            "skip": [3],
+            "limit": [5, 100],
+            "fields": ["nome,valor"],
+            "include": ["praia"],
+        },
+    )
+
+
+def _get(cliente, monkeypatch, snapshot: bool, url: str, params: dict) -> dict:
+    monkeypatch.setattr(settings, "CATALOG_SNAPSHOT", snapshot)
+    monkeypatch.setattr(settings, "LIST_FAST_PATH", True)
+    resposta = cliente.get(url, params=params)
+    assert resposta.status_code == 200, resposta.text
+    return resposta.json()
+
+
+@pytest.mark.parametrize(
+    "url, chave, sortear",
+    [
+        ("/api/v1/praia/", "praias", _params_praia),
+        ("/api/v1/quiosque/", "quiosques", _params_quiosque),
+    ],
+)
+def test_snapshot_igual_ao_sql(cliente, monkeypatch, municipios, url, chave, sortear):
+    rng = random.Random(11)
+    linhas = 0
+    for _ in range(200):
+        params = sortear(rng, municipios)
+        sql = _get(cliente, monkeypatch, False, url, params)
+        assert _get(cliente, monkeypatch, True, url, params) == sql, params
+        if sql["next_cursor"]:
+            params = {**params, "cursor": sql["next_cursor"]}
+            sql = _get(cliente, monkeypatch, False, url, params)
+            assert _get(cliente, monkeypatch, True, url, params) == sql, params
+        linhas += len(sql[chave])
+    # Os filtros sorteados não podem ter produzido só páginas vazias.
+    assert linhas > 200
+
+
+def test_snapshot_reflete_escritas(cliente, monkeypatch, municipios, autenticado):
+    params = {"municipio": municipios[0], "limit": 500}
+    praias = _get(cliente, monkeypatch, True, "/api/v1/praia/", params)["praias"]
+    praia = {chave: praias[0][chave] for chave in ["nome", "estado", "municipio"]}
+    praia.update(latitude=-3.7, longitude=-38.5, rating=1.2)
+    resposta = cliente.post("/api/v1/praia/", json=praia, headers=autenticado)
+    assert resposta.status_code == 201, resposta.text
+    nova = resposta.json()["id"]
+    try:
+        depois = _get(cliente, monkeypatch, True, "/api/v1/praia/", params)["praias"]
+        assert [p["id"] for p in depois] == [p["id"] for p in praias] + [nova]
+    finally:
+        cliente.delete(f"/api/v1/praia/{nova}", headers=autenticado)
+    depois = _get(cliente, monkeypatch, True, "/api/v1/praia/", params)["praias"]
+    assert depois == praias
+
+
+def test_snapshot_montado_fora_do_event_loop(cliente, monkeypatch, municipios):
+    montar = catalogo.montar_catalogo
+    chamadas = []
+
+    def montar_registrando(*linhas):
+        try:
+            asyncio.get_running_loop()
+            chamadas.append("event loop")
+        except RuntimeError:
+            chamadas.append("thread")
+        return montar(*linhas)
+
+    monkeypatch.setattr(catalogo, "montar_catalogo", montar_registrando)
+    monkeypatch.setattr(catalogo, "_snapshot", None)
+    _get(cliente, monkeypatch, True, "/api/v1/praia/", {"municipio": municipios[0]})
+    assert chamadas == ["thread"]
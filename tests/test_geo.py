@@ -0,0 +1,55 @@
+import math
+import random
+
+from core.geo import (
+    RAIO_TERRA_KM,
+    geohash_cobertura,
+    geohash_encode,
+    haversine_km,
+    limites_tile,
+    tile_do_ponto,
+)
+
+
+def _ponto_na_borda(rng, latitude, longitude, raio_km):
+    # Ponto logo dentro do círculo, em rumo aleatório (fórmula do destino): é na
+    # borda que uma cobertura apertada demais perde pontos.
+    distancia = raio_km * (1 - 0.001 * rng.random()) / RAIO_TERRA_KM
+    rumo = rng.uniform(0, 2 * math.pi)
+    lat1, lon1 = math.radians(latitude), math.radians(longitude)
+    lat2 = math.asin(
+        math.sin(lat1) * math.cos(distancia)
+        + math.cos(lat1) * math.sin(distancia) * math.cos(rumo)
+    )
+    lon2 = lon1 + math.atan2(
+        math.sin(rumo) * math.sin(distancia) * math.cos(lat1),
+        math.cos(distancia) - math.sin(lat1) * math.sin(lat2),
+    )
+    return math.degrees(lat2), (math.degrees(lon2) + 180.0) % 360.0 - 180.0
+
+
+def test_cobertura_inclui_todo_ponto_dentro_do_raio():
+    rng = random.Random(3)
+    perdidos = []
+    for _ in range(2000):
+        latitude, longitude = rng.uniform(-80, 80), rng.uniform(-180, 180)
+        raio_km = rng.choice([0.05, 0.5, 2, 10, 50, 200, 500])
+        prefixos = tuple(geohash_cobertura(latitude, longitude, raio_km))
+        for _ in range(100):
+            ponto = _ponto_na_borda(rng, latitude, longitude, raio_km)
+            assert haversine_km(latitude, longitude, *ponto) <= raio_km
+            if not geohash_encode(*ponto).startswith(prefixos):
+                perdidos.append((latitude, longitude, raio_km, ponto))
+    assert perdidos == []
+
+
+def test_tile_do_ponto_cai_nos_limites_do_tile():
+    rng = random.Random(5)
+    for _ in range(5000):
+        z = rng.randint(0, 18)
+        latitude, longitude = rng.uniform(-85, 85), rng.uniform(-180, 179.999)
+        oeste, sul, leste, norte = limites_tile(
+            z, *tile_do_ponto(latitude, longitude, z)
+        )
+        assert oeste <= longitude < leste
+        assert sul <= latitude <= norte
@@ -0,0 +1,170 @@
+import json
+import uuid
+
+import pytest
+
+from core.config import settings
+from db.session import SessionLocal
+from models.praia import Praia
+from models.quiosque import Quiosque
+from schemas.praia import PraiaInfo, PraiaList, PraiaOut
+from schemas.quiosque import QuiosqueInfo, QuiosqueList, QuiosqueOut
+
+# O caminho rápido (Core + orjson) contra o contrato: as respostas têm de passar
+# pelos schemas sem mudar nada (nem int virar float) e coincidir com as do
+# caminho ORM + pydantic, inclusive as esparsas (fields/include), que são um
+# recorte da resposta completa.
+
+
+@pytest.fixture(scope="module")
+def municipio(banco):
+    municipio = "Teste " + uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        praias = [
+            Praia(
+                nome="Praia do Futuro",
+                estado="CE",
+                municipio=municipio,
+                latitude=-3.745123,
+                longitude=-38.456789,
+                comprimento=8000,
+                largura=60,
+                tem_salvavida=True,
+                rating=4.5,
+            ),
+            Praia(
+                nome="Sem quiosques",
+                estado="CE",
+                municipio=municipio,
+                latitude=-3.7,
+                longitude=-38.5,
+            ),
+            Praia(
+                nome="Iracema",
+                estado="CE",
+                municipio=municipio,
+                latitude=-3.72,
+                longitude=-38.52,
+                propria_banho=False,
+                rating=3,
+            ),
+        ]
+        praias[0].quiosques = [
+            Quiosque(
+                nome="Barraca do Sol",
+                descricao="Caranguejo",
+                nota=4.8,
+                latitude=-3.745,
+                longitude=-38.456,
+                tem_banheiro=True,
+                valor=3,
+                ocupacao_maxima=120,
+            ),
+            Quiosque(nome="Coco", latitude=-3.746, longitude=-38.457),
+        ]
+        praias[2].quiosques = [
+            Quiosque(nome="Iracema Mar", latitude=-3.721, longitude=-38.521, nota=2)
+        ]
+        db.add_all(praias)
+        db.commit()
+        ids = [praia.id for praia in praias]
+    yield municipio
+    with SessionLocal() as db:
+        for praia_id in ids:
+            db.delete(db.get(Praia, praia_id))
+        db.commit()
+
+
+def _json(dados) -> str:
+    return json.dumps(dados, sort_keys=True)
+
+
+# Validar e serializar de volta não pode alterar a resposta: nenhum campo a
+# mais, a menos ou de outro tipo.
+def validar(schema, dados: dict):
+    validado = schema.model_validate(dados)
+    assert _json(validado.model_dump(mode="json", exclude_unset=True)) == _json(dados)
+
+
+def _get(cliente, monkeypatch, rapido: bool, url: str, **params) -> dict:
+    monkeypatch.setattr(settings, "LIST_FAST_PATH", rapido)
+    resposta = cliente.get(url, params=params)
+    assert resposta.status_code == 200, resposta.text
+    return resposta.json()
+
+
+# O caminho ORM passa pelo response_model, que inclui os opcionais ausentes
+# (total, facetas) como null.
+def iguais(rapido: dict, orm: dict):
+    assert all(orm[chave] is None for chave in orm.keys() - rapido.keys())
+    assert _json(rapido) == _json({chave: orm[chave] for chave in rapido})
+
+
+@pytest.mark.parametrize("contagens", [{}, {"with_total": True, "with_facets": True}])
+def test_listagem_de_praias(cliente, monkeypatch, municipio, contagens):
+    params = dict(municipio=municipio, limit=2, **contagens)
+    orm = _get(cliente, monkeypatch, False, "/api/v1/praia/", **params)
+    rapido = _get(cliente, monkeypatch, True, "/api/v1/praia/", **params)
+    validar(PraiaList, rapido)
+    iguais(rapido, orm)
+    assert len(rapido["praias"]) == 2 and rapido["next_cursor"]
+
+    params["cursor"] = rapido["next_cursor"]
+    orm = _get(cliente, monkeypatch, False, "/api/v1/praia/", **params)
+    rapido = _get(cliente, monkeypatch, True, "/api/v1/praia/", **params)
+    validar(PraiaList, rapido)
+    iguais(rapido, orm)
+
+
+@pytest.mark.parametrize("contagens", [{}, {"with_total": True, "with_facets": True}])
+def test_listagem_de_quiosques(cliente, monkeypatch, municipio, contagens):
+    params = dict(municipio=municipio, **contagens)
+    orm = _get(cliente, monkeypatch, False, "/api/v1/quiosque/", **params)
+    rapido = _get(cliente, monkeypatch, True, "/api/v1/quiosque/", **params)
+    validar(QuiosqueList, rapido)
+    iguais(rapido, orm)
+    assert len(rapido["quiosques"]) == 3
+
+
+# Recorte da resposta completa que fields/include devem produzir.
+def _recorte(item: dict, schema, fields, include, relacao: str) -> dict:
+    nomes = ["id", *fields.split(",")] if fields else list(schema.model_fields)
+    recorte = {nome: item[nome] for nome in nomes}
+    if include == relacao:
+        recorte[relacao] = item[relacao]
+    return recorte
+
+
+ROTAS = {
+    "praias": ("/api/v1/praia/", PraiaInfo, PraiaOut, "quiosques"),
+    "quiosques": ("/api/v1/quiosque/", QuiosqueInfo, QuiosqueOut, "praia"),
+}
+ESPARSOS = [
+    ("praias", dict(fields="nome,rating")),
+    ("praias", dict(fields="latitude", include="quiosques")),
+    ("praias", dict(include="quiosques")),
+    ("praias", dict(include="")),
+    ("quiosques", dict(fields="nome,nota,valor")),
+    ("quiosques", dict(fields="ocupacao_maxima", include="praia")),
+    ("quiosques", dict(include="praia")),
+    ("quiosques", dict(include="")),
+]
+
+
+@pytest.mark.parametrize("chave, esparso", ESPARSOS, ids=str)
+def test_respostas_esparsas(cliente, monkeypatch, municipio, chave, esparso):
+    url, schema, esquema_completo, relacao = ROTAS[chave]
+    fields, include = esparso.get("fields"), esparso.get("include")
+
+    completos = _get(cliente, monkeypatch, False, url, municipio=municipio)[chave]
+    esperados = [_recorte(i, schema, fields, include, relacao) for i in completos]
+    listagem = _get(cliente, monkeypatch, False, url, municipio=municipio, **esparso)
+    assert _json(listagem[chave]) == _json(esperados)
+
+    # Por id: a resposta completa segue o schema e a esparsa é o mesmo recorte.
+    for completo, esperado in zip(completos, esperados):
+        validar(esquema_completo, completo)
+        por_id = _get(cliente, monkeypatch, False, f"{url}{completo['id']}")
+        assert _json(por_id) == _json(completo)
+        por_id = _get(cliente, monkeypatch, False, f"{url}{completo['id']}", **esparso)
+        assert _json(por_id) == _json(esperado)
@@ -0,0 +1,149 @@
+import pytest
+from sqlalchemy import create_engine, select
+
+from api.v1.contagens import ContagensPraia, ContagensQuiosque
+from api.v1.filtros import FiltrosPraia, FiltrosQuiosque
+from db.base import Base
+from models.praia import Praia
+from models.quiosque import Quiosque
+from seeds.sintetico import MUNICIPIOS, ESTADOS, carregar
+
+# Planos (EXPLAIN) das consultas geradas pelas listagens, sobre um catálogo
+# sintético. Nenhuma delas pode varrer praias ou quiosques inteiros (Seq Scan).
+N_PRAIAS = 50000
+N_QUIOSQUES = 300000
+LIMIT = 50
+
+MUNICIPIO_CE = MUNICIPIOS[ESTADOS.index("CE"), 0]
+FORTALEZA = dict(min_latitude=-3.8, max_latitude=-3.6)
+FORTALEZA.update(min_longitude=-38.6, max_longitude=-38.4)
+
+FILTROS_PRAIA = [
+    dict(estado="CE"),
+    dict(estado="CE", municipio=MUNICIPIO_CE),
+    dict(municipio=MUNICIPIO_CE),
+    dict(estado="CE", min_rating=4.5),
+    dict(min_rating=4.8),
+    dict(tem_salvavida=True),
+    dict(propria_banho=False),
+    dict(estado="BA", tem_salvavida=True, propria_banho=False),
+    FORTALEZA,
+    dict(tem_quiosque=True),
+    dict(tem_quiosque=False),
+    dict(estado="CE", tem_quiosque=False),
+    dict(quiosque=5),
+]
+FILTROS_QUIOSQUE = [
+    dict(praia_id=10),
+    dict(praia_id=10, tem_banheiro=True, max_valor=2),
+    dict(min_nota=4.8),
+    dict(max_valor=1),
+    dict(tem_banheiro=True, max_valor=2),
+    dict(estado="CE"),
+    dict(estado="CE", municipio=MUNICIPIO_CE),
+    dict(nome="Barraca do Sol"),
+    FORTALEZA,
+]
+# Filtros seletivos: o total e as facetas leem todo o conjunto filtrado.
+FILTROS_PRAIA_CONTAGEM = [
+    dict(estado="CE"),
+    dict(estado="CE", municipio=MUNICIPIO_CE),
+    dict(estado="CE", tem_salvavida=True),
+    FORTALEZA,
+]
+FILTROS_QUIOSQUE_CONTAGEM = [
+    dict(praia_id=10),
+    dict(estado="CE"),
+    dict(estado="CE", municipio=MUNICIPIO_CE, tem_banheiro=True),
+]
+
+
+def _executar_fora_de_transacao(engine, *comandos):
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for comando in comandos:
+            conn.exec_driver_sql(comando)
+
+
+# Banco próprio, criado e removido pelo teste: depois da carga ele passa por
+# VACUUM ANALYZE (o mapa de visibilidade pesa no custo dos index-only scans), o
+# que não dá para fazer numa transação desfeita no fim.
+@pytest.fixture(scope="module")
+def catalogo(banco):
+    url = banco.url.set(database=banco.url.database + "_planos")
+    remover = f'DROP DATABASE IF EXISTS "{url.database}"'
+    _executar_fora_de_transacao(banco, remover, f'CREATE DATABASE "{url.database}"')
+    engine = create_engine(url)
+    try:
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            carregar(connection, N_PRAIAS, N_QUIOSQUES, semente=9, tamanho_lote=50000)
+        _executar_fora_de_transacao(engine, "VACUUM ANALYZE")
+        with engine.connect() as connection:
+            yield connection
+    finally:
+        engine.dispose()
+        _executar_fora_de_transacao(banco, remover)
+
+
+def _nos(plano):
+    yield plano
+    for filho in plano.get("Plans", []):
+        yield from _nos(filho)
+
+
+def explicar(connection, query) -> list:
+    compilado = query.compile(connection, compile_kwargs={"render_postcompile": True})
+    plano = connection.exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + str(compilado), compilado.params
+    ).scalar()
+    return list(_nos(plano[0]["Plan"]))
+
+
+def sem_seq_scan(nos):
+    varridas = {no["Relation Name"] for no in nos if no["Node Type"] == "Seq Scan"}
+    assert not varridas & {"praias", "quiosques"}, nos
+
+
+def indices(nos) -> set:
+    return {no["Index Name"] for no in nos if "Index Name" in no}
+
+
+@pytest.mark.parametrize("filtros", FILTROS_PRAIA, ids=str)
+def test_listagem_de_praias(catalogo, filtros):
+    query = FiltrosPraia(**filtros).aplicar(select(Praia))
+    sem_seq_scan(explicar(catalogo, query.order_by(Praia.id).limit(LIMIT)))
+
+
+@pytest.mark.parametrize("filtros", FILTROS_QUIOSQUE, ids=str)
+def test_listagem_de_quiosques(catalogo, filtros):
+    query = FiltrosQuiosque(**filtros).aplicar(select(Quiosque).join(Praia))
+    sem_seq_scan(explicar(catalogo, query.order_by(Quiosque.id).limit(LIMIT)))
+
+
+# selectinload(Praia.quiosques) da página de praias.
+def test_quiosques_da_pagina(catalogo):
+    ids = catalogo.execute(select(Praia.id).order_by(Praia.id).limit(LIMIT)).scalars()
+    query = select(Quiosque).where(Quiosque.praia_id.in_(list(ids)))
+    nos = explicar(catalogo, query)
+    sem_seq_scan(nos)
+    assert "ix_quiosques_praia_id_banheiro_valor" in indices(nos)
+
+
+@pytest.mark.parametrize("filtros", FILTROS_PRAIA_CONTAGEM, ids=str)
+def test_contagens_de_praias(catalogo, filtros):
+    contagens = ContagensPraia(with_total=True, with_facets=True)
+    sem_seq_scan(explicar(catalogo, contagens.consulta_total(FiltrosPraia(**filtros))))
+    nos = explicar(catalogo, contagens.consulta_facetas(FiltrosPraia(**filtros)))
+    sem_seq_scan(nos)
+    if "estado" in filtros:
+        assert "ix_praias_estado_municipio_salvavida_banho" in indices(nos)
+
+
+@pytest.mark.parametrize("filtros", FILTROS_QUIOSQUE_CONTAGEM, ids=str)
+def test_contagens_de_quiosques(catalogo, filtros):
+    contagens = ContagensQuiosque(with_total=True, with_facets=True)
+    filtros = FiltrosQuiosque(**filtros)
+    sem_seq_scan(explicar(catalogo, contagens.consulta_total(filtros)))
+    nos = explicar(catalogo, contagens.consulta_facetas(filtros))
+    sem_seq_scan(nos)
+    assert "ix_quiosques_praia_id_banheiro_valor" in indices(nos)
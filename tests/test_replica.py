@@ -0,0 +1,181 @@
+import uuid
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+import db.session
+from core.cache import MemoryBackend, cache
+from core.config import settings
+from core.geo import tile_do_ponto
+from db.base import Base
+
+# Réplica atrasada: um banco vazio no lugar da réplica, como uma que ainda não
+# recebeu nada. Um leitor sem o cookie de leitura do primário lê dela logo
+# depois de uma escrita; o que ele recebe pode estar velho, mas não pode ir
+# para os caches (nem ganhar ETag) e chegar ao escritor, que lê do primário.
+LATITUDE, LONGITUDE = -3.71, -38.51
+
+
+def _executar_fora_de_transacao(engine, *comandos):
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for comando in comandos:
+            conn.exec_driver_sql(comando)
+
+
+@pytest.fixture(scope="module")
+def url_replica(banco):
+    url = banco.url.set(database=banco.url.database + "_testes_replica")
+    remover = f'DROP DATABASE IF EXISTS "{url.database}"'
+    _executar_fora_de_transacao(banco, remover, f'CREATE DATABASE "{url.database}"')
+    engine = create_engine(url)
+    try:
+        Base.metadata.create_all(engine)
+        yield url
+    finally:
+        engine.dispose()
+        _executar_fora_de_transacao(banco, remover)
+
+
+# Sem pool: nenhuma conexão da réplica sobrevive ao teste (nem ao event loop
+# em que foi aberta, no modo assíncrono).
+@pytest.fixture
+def replica(url_replica, monkeypatch):
+    url = url_replica.render_as_string(hide_password=False)
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", url)
+    monkeypatch.setattr(cache, "backend", MemoryBackend(1000, 60))
+    if settings.DB_ASYNC:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        engine = create_async_engine(settings.async_replica_urls[0], poolclass=NullPool)
+        fabrica = async_sessionmaker(engine, expire_on_commit=False)
+        monkeypatch.setattr(db.session, "AsyncReplicaSessionLocals", [fabrica])
+    else:
+        engine = create_engine(url, poolclass=NullPool)
+        fabrica = sessionmaker(autoflush=False, bind=engine)
+        monkeypatch.setattr(db.session, "ReplicaSessionLocals", [fabrica])
+
+
+# O leitor usa o mesmo cliente (e o mesmo event loop do pool assíncrono), mas
+# sem os cookies do escritor.
+def _ler_sem_cookie(cliente, url: str, **kwargs):
+    cookies = list(cliente.cookies.jar)
+    cliente.cookies.clear()
+    try:
+        return cliente.get(url, **kwargs)
+    finally:
+        for cookie in cookies:
+            cliente.cookies.jar.set_cookie(cookie)
+
+
+def _urls(praia_id: int, municipio: str) -> dict:
+    z = 12
+    x, y = tile_do_ponto(LATITUDE, LONGITUDE, z)
+    return {
+        "lista": f"/api/v1/praia/?municipio={municipio}&with_total=true",
+        "quiosques": f"/api/v1/quiosque/?municipio={municipio}",
+        "praia": f"/api/v1/praia/{praia_id}",
+        "esparsa": f"/api/v1/praia/{praia_id}?fields=nome",
+        "stats": "/api/v1/stats",
+        "tile": f"/api/v1/tiles/{z}/{x}/{y}",
+    }
+
+
+def test_leitor_da_replica_nao_alimenta_os_caches(cliente, autenticado, replica):
+    municipio = "Teste " + uuid.uuid4().hex[:8]
+    assert (
+        _ler_sem_cookie(cliente, f"/api/v1/praia/?municipio={municipio}").json()[
+            "praias"
+        ]
+        == []
+    )
+
+    praia = {
+        "nome": "Praia " + municipio,
+        "estado": "CE",
+        "municipio": municipio,
+        "latitude": LATITUDE,
+        "longitude": LONGITUDE,
+    }
+    resposta = cliente.post("/api/v1/praia/", json=praia, headers=autenticado)
+    assert resposta.status_code == 201, resposta.text
+    assert db.session.COOKIE_PRIMARIO in cliente.cookies
+    praia_id = resposta.json()["id"]
+    quiosque = {
+        "nome": "Quiosque",
+        "latitude": LATITUDE,
+        "longitude": LONGITUDE,
+        "praia_id": praia_id,
+    }
+    resposta = cliente.post("/api/v1/quiosque/", json=quiosque, headers=autenticado)
+    assert resposta.status_code == 201, resposta.text
+    urls = _urls(praia_id, municipio)
+
+    try:
+        # O leitor chega primeiro e lê a réplica, que ainda não tem a praia.
+        respostas = {nome: _ler_sem_cookie(cliente, url) for nome, url in urls.items()}
+        assert respostas["lista"].json()["praias"] == []
+        assert respostas["lista"].json()["total"] == 0
+        assert respostas["quiosques"].json()["quiosques"] == []
+        assert respostas["praia"].status_code == 404
+        assert respostas["esparsa"].status_code == 404
+        assert respostas["tile"].json()["praias"] == []
+        for nome in ["lista", "quiosques", "stats"]:
+            assert "etag" not in respostas[nome].headers, nome
+
+        # O escritor lê do primário e não pode receber o que o leitor viu.
+        respostas = {nome: cliente.get(url) for nome, url in urls.items()}
+        lista = respostas["lista"].json()
+        assert [p["id"] for p in lista["praias"]] == [praia_id]
+        assert lista["total"] == 1
+        assert len(respostas["quiosques"].json()["quiosques"]) == 1
+        assert respostas["praia"].json()["id"] == praia_id
+        assert respostas["esparsa"].json() == {"id": praia_id, "nome": praia["nome"]}
+        assert respostas["tile"].json()["praias"]
+        for nome in ["lista", "quiosques", "praia", "stats"]:
+            assert "etag" in respostas[nome].headers, nome
+
+        # Já em cache (vindas do primário), as respostas servem também o leitor.
+        lista = _ler_sem_cookie(cliente, urls["lista"])
+        assert [p["id"] for p in lista.json()["praias"]] == [praia_id]
+        assert lista.headers["etag"] == respostas["lista"].headers["etag"]
+    finally:
+        cliente.delete(f"/api/v1/praia/{praia_id}", headers=autenticado)
+
+
+# Busca e snapshot são reconstruídos a partir do primário, mesmo quando quem
+# encontra as versões novas é um leitor da réplica.
+def test_indices_em_memoria_vem_do_primario(cliente, autenticado, replica, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_SNAPSHOT", True)
+    municipio = "Teste " + uuid.uuid4().hex[:8]
+    praia = {
+        "nome": "Enseada " + municipio,
+        "estado": "CE",
+        "municipio": municipio,
+        "latitude": LATITUDE,
+        "longitude": LONGITUDE,
+    }
+    resposta = cliente.post("/api/v1/praia/", json=praia, headers=autenticado)
+    assert resposta.status_code == 201, resposta.text
+    praia_id = resposta.json()["id"]
+    try:
+        params = {"q": praia["nome"]}
+        busca = _ler_sem_cookie(cliente, "/api/v1/search", params=params).json()
+        assert praia_id in [r["id"] for r in busca["resultados"]]
+        params = {"municipio": municipio}
+        lista = _ler_sem_cookie(cliente, "/api/v1/praia/", params=params).json()
+        assert [p["id"] for p in lista["praias"]] == [praia_id]
+    finally:
+        cliente.delete(f"/api/v1/praia/{praia_id}", headers=autenticado)
+
+
+def test_pools_rotulados_por_engine(banco):
+    with banco.connect():
+        pass
+    assert banco.pool.rotulo == "sync_primario"
+    espera = REGISTRY.get_sample_value(
+        "db_pool_wait_seconds_count", {"engine": "sync_primario"}
+    )
+    assert espera > 0
@@ -0,0 +1,73 @@
+import threading
+import uuid
+
+import pytest
+from sqlalchemy import text, update
+
+from db.session import SessionLocal
+from models.exclusao import nova_versao
+from models.praia import Praia
+
+# Uma transação que sorteia a versão e demora a confirmar não pode aparecer
+# abaixo de um "since" que o /sync já entregou: quem sorteia depois espera.
+
+
+@pytest.fixture
+def praias(banco):
+    with SessionLocal() as db:
+        praias = [
+            Praia(
+                nome=f"Sync {i}",
+                estado="CE",
+                municipio="Teste " + uuid.uuid4().hex[:8],
+                latitude=-3.7,
+                longitude=-38.5,
+            )
+            for i in range(2)
+        ]
+        db.add_all(praias)
+        db.commit()
+        ids = [praia.id for praia in praias]
+    yield ids
+    with SessionLocal() as db:
+        for praia_id in ids:
+            db.delete(db.get(Praia, praia_id))
+        db.commit()
+
+
+def _alterar(connection, praia_id: int):
+    connection.execute(
+        update(Praia).where(Praia.id == praia_id).values(rating=1, versao=nova_versao())
+    )
+
+
+def _sync(cliente, since: int) -> dict:
+    resposta = cliente.get("/api/v1/sync", params={"since": since})
+    assert resposta.status_code == 200, resposta.text
+    return resposta.json()
+
+
+def test_versao_visivel_em_ordem_de_commit(banco, cliente, praias):
+    primeira_id, segunda_id = praias
+    with banco.connect() as conn:
+        since = conn.execute(text("SELECT last_value FROM catalogo_versao_seq"))
+        since = since.scalar_one()
+
+    def segunda_escrita():
+        with banco.begin() as conn:
+            _alterar(conn, segunda_id)
+
+    with banco.connect() as primeira:
+        _alterar(primeira, primeira_id)
+        segunda = threading.Thread(target=segunda_escrita)
+        segunda.start()
+        segunda.join(0.5)
+        # A segunda escrita espera a primeira, que sorteou antes.
+        assert segunda.is_alive()
+        meio = _sync(cliente, since)
+        primeira.commit()
+    segunda.join()
+
+    fim = _sync(cliente, meio["versao"])
+    vistas = [p["id"] for p in meio["praias"] + fim["praias"]]
+    assert vistas == [primeira_id, segunda_id]